@@ -1,16 +1,9 @@
 """Entry point for AutoSwitchTheme application"""
 
-import threading
-from datetime import datetime
-from time import sleep
+import sys
 
-import schedule
-from astral import LocationInfo
-from requests import RequestException, get
-
-from src.core.switch import Switch
-from src.core.tray import TrayApp
 from src.utils.config import configurator
+from src.utils.instance import SingleInstance
 from src.utils.logger import Logger
 from src.utils.path import Paths
 
@@ -20,136 +13,44 @@ logger = Logger(
     Paths.get_log_file(), configurator.getboolean("log", "debug", fallback=False)
 ).setup_logger("app")
 
+layout = Paths.layout()
+logger.info(f"Paths ({layout.mode}): data {layout.data_dir}, user {layout.user_dir}")
 
-# === Main thread === #
-def main_thread(tray_app: TrayApp):
-    """Main application logic running in separate thread"""
-    logger.info("Starting main application thread")
-
-    # Check internet connexion
-    is_connected = None
-    try:
-        get("http://www.msftconnecttest.com/connecttest.txt", timeout=3)
-    except Exception:
-        is_connected = False
-        logger.warning("Internet connection unavailable")
-    else:
-        is_connected = True
-        logger.info("Connected to the internet")
-
-    # Get localisation from IP API
-    if is_connected:
-        try:
-            response = get("https://ipinfo.io/json", timeout=3)
-        except RequestException:
-            logger.error(f"Error fetching location: {response.status_code}")
-        else:
-            data = response.json()
-            latitude, longitude = (e for e in data["loc"].split(","))
-
-            logger.debug("Location fetch from API.")
-
-            # Save location in configuration file
-            configurator.set("location", "city", data["city"])
-            configurator.set("location", "region", data["region"])
-            configurator.set("location", "timezone", data["timezone"])
-            configurator.set("location", "latitude", latitude)
-            configurator.set("location", "longitude", longitude)
-
-            with open(Paths.get_config_file(), "w") as configfile:
-                configurator.write(configfile)
-
-            logger.debug("Location saved into the configuration file.")
-
-    latitude = configurator.getfloat("location", "latitude")
-    longitude = configurator.getfloat("location", "longitude")
-    if latitude == 0.0 and longitude == 0.0:
-        # TODO: Use fixed hours, not a fixed city
-        city = LocationInfo(
-            name="Paris",
-            region="France",
-            timezone="Europe/Paris",
-            latitude=48.8333,
-            longitude=2.33333,
-        )
-
-    else:
-        city = LocationInfo(
-            name=configurator.get("location", "city"),
-            region=configurator.get("location", "region"),
-            timezone=configurator.get("location", "timezone"),
-            latitude=latitude,
-            longitude=longitude,
-        )
-
-    logger.debug("Location loaded.")
-
-    # Initialize sun hours monitor
-    theme_monitor = Switch(city)
-    schedule.every().day.at("00:01").do(theme_monitor.update_sun_hours)
-
-    # Connect monitors to tray app
-    tray_app.theme_monitor = theme_monitor
-
-    # Get sun hours at startup
-    tray_app.theme_monitor.update_sun_hours()
-    logger.debug(f"Sun hours data: {tray_app.theme_monitor.sun_hours}")
-
-    # Update theme at startup
-    datetime_now = datetime.now().time()
-    datetime_sunrise = datetime.strptime(
-        tray_app.theme_monitor.sun_hours["sunrise"], "%H:%M"
-    ).time()
-    datetime_sunset = datetime.strptime(
-        tray_app.theme_monitor.sun_hours["sunset"], "%H:%M"
-    ).time()
-    logger.debug(
-        f"DateTime now: {datetime_now}, DateTime sunrise: {datetime_sunrise}, DateTime sunset: {datetime_sunset}"
-    )
-
-    logger.debug(
-        f"Test(datetime_sunrise <= datetime_now <= datetime_sunset): {datetime_sunrise <= datetime_now <= datetime_sunset}"
-    )
-    if datetime_sunrise <= datetime_now <= datetime_sunset:
-        logger.debug("Switching to light theme...")
-        tray_app.theme_monitor.switch_to_light_theme()
-    else:
-        logger.debug("Switching to dark theme...")
-        tray_app.theme_monitor.switch_to_dark_theme()
-
-    # Run scheduler
-    while tray_app.running:
-        schedule.run_pending()
-        sleep(1)
-
-    logger.info("Main application thread stopped")
+# Structured switch history (JSON lines), for reports across machines
+if configurator.getboolean("logs", "events", fallback=False):
+    Logger(Paths.get_event_log_file()).setup_event_log()
 
 
 # === Main function === #
-def main():
-    """Main entry point - setup tray and start threads"""
+def main() -> int:
+    """Main entry point - start the service, the session agent or the application"""
     logger.info("AutoSwitchTheme starting...")
 
-    # Create tray app
-    logger.debug("Creating tray app...")
-    tray_app = TrayApp()
-    logger.debug("Tray app created.")
-    logger.debug("Setting up tray app...")
-    tray_app.setup_tray()
-    logger.debug("Tray app setup.")
-
-    # Start main logic in separate thread
-    logger.debug("Starting main logic in separate thread...")
-    main_thread_obj = threading.Thread(
-        target=main_thread, args=(tray_app,), daemon=True
-    )
-    main_thread_obj.start()
-    logger.debug("Main logic in separate thread started.")
-
-    # Run tray icon (blocking - this keeps the app running)
-    logger.debug("Running tray app...")
-    tray_app.run_tray()
-    logger.info("Application stopped")
+    # Each mode imports its own side only: a session agent never loads the
+    # location chain, the network stack or the weather
+
+    # One service per machine, pushing the theme to the session agents
+    if "--service" in sys.argv[1:]:
+        from src.app import run_service
+
+        return run_service()
+
+    # Hand off to the running instance before loading the tray or either side
+    instance = SingleInstance()
+    if not instance.acquire():
+        logger.info("AutoSwitchTheme already running, forwarding launch...")
+        response = instance.forward(sys.argv[1:])
+        return 0 if response and response.get("ok") else 1
+
+    # One agent per session, following the service
+    if "--agent" in sys.argv[1:]:
+        from src.agent import run_agent
+
+        return run_agent(instance)
+
+    from src.app import run_app
+
+    return run_app(instance)
 
 
 # === Entry point === #
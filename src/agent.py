@@ -0,0 +1,102 @@
+"""
+Session agent: the service schedules, the agent only writes the registry
+
+Imports the tray, the theme switch and the IPC channel only: the location
+chain, the network stack, the weather and the export are never loaded.
+"""
+
+from astral import LocationInfo
+
+from src.core.actor import ThemeActor
+from src.core.service import service_address
+from src.core.switch import Switch
+from src.core.tray import TrayApp
+from src.session import (
+    elevation_thresholds,
+    hook_runner,
+    run_tray,
+    serve,
+    wallpaper_stage,
+)
+from src.utils.config import configurator
+from src.utils.instance import SingleInstance
+from src.utils.ipc import Subscriber
+from src.utils.logger import Logger
+from src.utils.path import Paths
+from src.utils.state import StateStore
+
+
+logger = Logger.get_logger("app")
+
+
+def saved_location() -> LocationInfo:
+    """
+    Location saved in the configuration, estimated from the timezone if none
+    The agent never locates itself (no network, no provider chain).
+    """
+    latitude = configurator.getfloat("location", "latitude", fallback=0.0)
+    longitude = configurator.getfloat("location", "longitude", fallback=0.0)
+    timezone = configurator.get("location", "timezone", fallback="")
+    if (latitude, longitude) != (0.0, 0.0) and timezone:
+        return LocationInfo(
+            name=configurator.get("location", "city", fallback=""),
+            region=configurator.get("location", "region", fallback=""),
+            timezone=timezone,
+            latitude=latitude,
+            longitude=longitude,
+        )
+
+    # Nothing saved yet: only then is the zone table loaded
+    from src.core.geolocation import estimate_location
+
+    fix = estimate_location(timezone or None)
+    logger.warning(f"No saved location, estimated from the timezone ({fix.timezone})")
+    return LocationInfo(
+        name=fix.city,
+        region=fix.region,
+        timezone=fix.timezone,
+        latitude=fix.latitude,
+        longitude=fix.longitude,
+    )
+
+
+def agent_thread(tray_app: TrayApp):
+    """Session agent: the service schedules, the agent only writes the registry"""
+    logger.info("Starting session agent")
+
+    city = saved_location()
+    light_elevation, dark_elevation = elevation_thresholds()
+    tray_app.theme_monitor = Switch(
+        city,
+        StateStore(Paths.get_state_file()),
+        light_elevation=light_elevation,
+        dark_elevation=dark_elevation,
+    )
+    tray_app.theme_monitor.on_change = tray_app.refresh
+    tray_app.theme_monitor.hooks = hook_runner()
+    tray_app.theme_monitor.wallpaper = wallpaper_stage()
+    tray_app.theme_monitor.actor = actor = ThemeActor()
+    actor.start()
+    tray_app.theme_monitor.restore_override()
+
+    # Theme events pushed by the service (the current state first)
+    subscriber = Subscriber(
+        tray_app.theme_monitor.apply_service_event, service_address()
+    )
+    subscriber.start()
+
+    # Only the override deadlines are scheduled in the session
+    serve(tray_app)
+
+    subscriber.stop()
+    actor.stop()
+    if tray_app.theme_monitor.hooks is not None:
+        tray_app.theme_monitor.hooks.shutdown()
+    if tray_app.theme_monitor.wallpaper is not None:
+        tray_app.theme_monitor.wallpaper.shutdown()
+    logger.info("Session agent stopped")
+
+
+def run_agent(instance: SingleInstance) -> int:
+    """Tray of a session following the system-wide service"""
+    return run_tray(agent_thread, instance)
@@ -0,0 +1,305 @@
+"""Standalone application and system-wide service: location and schedule"""
+
+from datetime import datetime
+from time import sleep
+
+from astral import LocationInfo
+
+from src.core.actor import ThemeActor
+from src.core.geolocation import (
+    CACHED,
+    NETWORK,
+    PINNED,
+    Fix,
+    Provider,
+    estimate_provider,
+    locate,
+    named_providers,
+    settle,
+    static_provider,
+)
+from src.core.scheduler import scheduler
+from src.core.service import ServiceSwitch
+from src.core.switch import Switch
+from src.core.timeline import theme_at
+from src.core.tray import TrayApp
+from src.core.weather import (
+    MAX_SHIFT,
+    THRESHOLD,
+    TTL,
+    CloudForecast,
+    CloudModel,
+    WeatherShift,
+)
+from src.session import (
+    elevation_thresholds,
+    hook_runner,
+    run_tray,
+    serve,
+    wallpaper_stage,
+)
+from src.utils.breaker import CircuitBreaker
+from src.utils.config import configurator
+from src.utils.instance import SingleInstance
+from src.utils.lock import FileLock
+from src.utils.logger import Logger
+from src.utils.memory import NETWORK_MODULES, release_modules, rss_bytes
+from src.utils.path import Paths
+from src.utils.state import StateStore
+
+
+logger = Logger.get_logger("app")
+
+
+# Outbound calls are skipped while the network keeps failing, one circuit per
+# service so a failing forecast never holds the location lookups back
+circuits = StateStore(Paths.get_network_state_file())
+network = CircuitBreaker(circuits)
+forecast_circuit = CircuitBreaker(circuits, "weather")
+
+
+# === Location === #
+def location_providers(online: bool) -> list[Provider]:
+    """
+    Chain of location sources from the configuration
+    A pinned location is used as is; otherwise the saved location and a
+    timezone estimate answer at once while the HTTP providers are queried.
+    """
+    latitude = configurator.getfloat("location", "latitude", fallback=0.0)
+    longitude = configurator.getfloat("location", "longitude", fallback=0.0)
+    timezone = configurator.get("location", "timezone", fallback="")
+    saved = None
+    if (latitude, longitude) != (0.0, 0.0) and timezone:
+        saved = Fix(
+            latitude,
+            longitude,
+            timezone,
+            configurator.get("location", "city", fallback=""),
+            configurator.get("location", "region", fallback=""),
+        )
+
+    if saved and configurator.getboolean("location", "pinned", fallback=False):
+        return [static_provider(saved._replace(source="pinned", quality=PINNED))]
+
+    providers = [estimate_provider(timezone or None)]
+    if saved:
+        providers.append(
+            static_provider(saved._replace(source="cached", quality=CACHED))
+        )
+
+    if not online:
+        return providers
+    if not network.allow():
+        logger.info(f"Network skipped after previous failures ({network.describe()})")
+        return providers
+
+    names = configurator.get("location", "providers", fallback="ipinfo, ipapi")
+    return providers + named_providers(
+        [n.strip() for n in names.split(",") if n.strip()]
+    )
+
+
+def save_location(fix: Fix):
+    """Keep a network answer as the cached location"""
+    configurator.set("location", "city", fix.city)
+    configurator.set("location", "region", fix.region)
+    configurator.set("location", "timezone", fix.timezone)
+    configurator.set("location", "latitude", str(fix.latitude))
+    configurator.set("location", "longitude", str(fix.longitude))
+
+    try:
+        with open(Paths.get_config_file(), "w") as configfile:
+            configurator.write(configfile)
+    except OSError as e:
+        logger.error(f"Error saving location: {e}")
+        return
+
+    logger.debug("Location saved into the configuration file.")
+
+
+def load_location(online: bool = True) -> LocationInfo:
+    """
+    Best location of the provider chain, saved when it comes from the network
+    Args:
+        online: False skips the network (session agents use the saved location)
+    """
+    providers = location_providers(online)
+    fix = locate(providers)
+
+    # The circuit breaker follows the HTTP providers only
+    if any(p.quality == NETWORK for p in providers):
+        if fix is not None and fix.quality == NETWORK:
+            network.record_success()
+        else:
+            network.record_failure()
+
+    if fix is not None and fix.quality == NETWORK:
+        save_location(fix)
+
+    if fix is None:
+        # TODO: Use fixed hours, not a fixed city
+        city = LocationInfo(
+            name="Paris",
+            region="France",
+            timezone="Europe/Paris",
+            latitude=48.8333,
+            longitude=2.33333,
+        )
+    else:
+        city = LocationInfo(
+            name=fix.city,
+            region=fix.region,
+            timezone=fix.timezone,
+            latitude=fix.latitude,
+            longitude=fix.longitude,
+        )
+
+    logger.debug(f"Location loaded ({fix.source if fix else 'default'}).")
+    return city
+
+
+def weather_shift(city: LocationInfo) -> WeatherShift | None:
+    """Cloud cover shift of the [weather] section, None unless enabled"""
+    if not configurator.getboolean("weather", "enabled", fallback=False):
+        return None
+    forecast = CloudForecast(
+        city.latitude,
+        city.longitude,
+        StateStore(Paths.get_weather_file()),
+        forecast_circuit,
+        configurator.getfloat("weather", "ttl_hours", fallback=TTL / 3600) * 3600,
+    )
+    model = CloudModel(
+        configurator.getfloat("weather", "threshold", fallback=THRESHOLD),
+        configurator.getfloat("weather", "max_shift", fallback=MAX_SHIFT),
+    )
+    return WeatherShift(forecast, model)
+
+
+def release_network(weather: WeatherShift | None):
+    """
+    Forget the HTTP stack once the location is known, after the lookups that
+    lost the race are done (they would keep it referenced, or re-import it)
+    Args:
+        weather: cloud shift of the switches, whose forecast refreshes need the
+            stack every few hours: re-importing it each time costs more than
+            keeping it
+    """
+    if weather is not None:
+        logger.debug("Weather enabled, HTTP stack kept for the forecast")
+    elif settle():
+        release_modules(*NETWORK_MODULES)
+    else:
+        logger.debug("Location lookups still running, HTTP stack kept")
+
+
+# === Main thread === #
+def main_thread(tray_app: TrayApp):
+    """Main application logic running in separate thread"""
+    logger.info("Starting main application thread")
+
+    city = load_location()
+
+    # Initialize sun hours monitor
+    light_elevation, dark_elevation = elevation_thresholds()
+    theme_monitor = Switch(
+        city,
+        StateStore(Paths.get_state_file()),
+        light_elevation=light_elevation,
+        dark_elevation=dark_elevation,
+    )
+
+    # Connect monitors to tray app
+    tray_app.theme_monitor = theme_monitor
+    tray_app.network = network
+    theme_monitor.on_change = tray_app.refresh
+    theme_monitor.hooks = hook_runner()
+    theme_monitor.wallpaper = wallpaper_stage()
+    theme_monitor.weather = weather_shift(city)
+    theme_monitor.actor = actor = ThemeActor()
+    actor.start()
+
+    # Get sun hours at startup (also schedules switches and the 00:01 refresh)
+    tray_app.theme_monitor.update_sun_hours()
+
+    # Keep the next days precomputed, so the 00:01 refresh is a lookup
+    tray_app.theme_monitor.window.start()
+    logger.debug(f"Sun hours data: {tray_app.theme_monitor.sun_hours}")
+
+    # Update theme at startup, unless a manual override is still running
+    if tray_app.theme_monitor.restore_override():
+        logger.debug("Override restored, automatic theme skipped.")
+    else:
+        apply_startup_theme(tray_app.theme_monitor)
+
+    # Catch up after suspend/resume or clock changes
+    scheduler.on_clock_jump = tray_app.theme_monitor.catch_up
+
+    # The network is only needed to bootstrap the location (and the weather)
+    release_network(theme_monitor.weather)
+
+    if (rss := rss_bytes()) is not None:
+        logger.debug(f"Memory after startup: {rss // 1024} KiB")
+
+    # Run scheduler
+    serve(tray_app)
+
+    actor.stop()
+    if theme_monitor.hooks is not None:
+        theme_monitor.hooks.shutdown()
+    if theme_monitor.wallpaper is not None:
+        theme_monitor.wallpaper.shutdown()
+    logger.info("Main application thread stopped")
+
+
+def run_service() -> int:
+    """System-wide service: one location, ephemeris and schedule per machine"""
+    lock = FileLock(Paths.get_data_dir() / "service.lock")
+    if not lock.acquire(timeout=0):
+        logger.error("AutoSwitchTheme service already running")
+        return 1
+
+    city = load_location()
+    light_elevation, dark_elevation = elevation_thresholds()
+    service = ServiceSwitch(city, light_elevation, dark_elevation)
+    service.weather = weather_shift(city)
+    service.server.start()
+    logger.info("AutoSwitchTheme service started")
+
+    try:
+        service.update_sun_hours()
+        service.window.start()
+        service.apply_scheduled_theme("startup")
+        scheduler.on_clock_jump = service.catch_up
+        release_network(service.weather)
+
+        while True:
+            scheduler.run_pending()
+            sleep(1)
+    except KeyboardInterrupt:
+        logger.info("Service interrupted")
+    finally:
+        service.window.stop()
+        service.server.stop()
+        lock.release()
+
+    logger.info("AutoSwitchTheme service stopped")
+    return 0
+
+
+def apply_startup_theme(theme_monitor: Switch):
+    """Apply the theme expected now, in the location timezone"""
+    datetime_now = datetime.now(theme_monitor.tz).time()
+    logger.debug(f"DateTime now: {datetime_now}, Sun hours: {theme_monitor.sun_hours}")
+    theme = theme_at(theme_monitor.sun_hours, datetime_now, theme_monitor.day_kind)
+    if theme == "light":
+        logger.debug("Switching to light theme...")
+        theme_monitor.switch_to_light_theme("startup")
+    else:
+        logger.debug("Switching to dark theme...")
+        theme_monitor.switch_to_dark_theme("startup")
+
+
+def run_app(instance: SingleInstance) -> int:
+    """Standalone application: location, schedule and tray in this session"""
+    return run_tray(main_thread, instance)
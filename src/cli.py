@@ -0,0 +1,306 @@
+"""Command-line client for the running AutoSwitchTheme instance"""
+
+import sys
+from argparse import ArgumentParser, Namespace
+from datetime import date
+from functools import partial
+from json import dumps as json_dumps
+from pathlib import Path
+
+from src.utils.ipc import send_request
+from src.utils.path import Paths
+
+
+# Output formats of the offline commands, whose modules (csv, gzip, process
+# pool, ephemeris) are only imported when run, to keep the client fast
+EXPORT_FORMATS = ("csv", "ics")
+BATCH_FORMATS = ("csv", "jsonl")
+
+
+def build_parser() -> ArgumentParser:
+    parser = ArgumentParser(
+        prog="autoswitchtheme",
+        description="Control the running AutoSwitchTheme instance",
+    )
+    parser.add_argument("--json", action="store_true", help="print raw responses")
+    parser.add_argument(
+        "--portable",
+        action="store_true",
+        help="keep every file next to the application (as the instance does)",
+    )
+    parser.add_argument("--data-dir", type=Path, help="machine data folder")
+    parser.add_argument("--user-dir", type=Path, help="user data folder")
+    commands = parser.add_subparsers(dest="cmd", required=True)
+
+    commands.add_parser("status", help="show current theme and sun hours")
+    force = commands.add_parser("force", help="force a theme")
+    force.add_argument("theme", choices=["light", "dark"])
+    until = force.add_mutually_exclusive_group()
+    until.add_argument(
+        "--minutes",
+        type=int,
+        help="keep the theme for N minutes (default: next switch)",
+    )
+    until.add_argument(
+        "--tomorrow", action="store_true", help="keep the theme until midnight"
+    )
+    commands.add_parser("resume", help="go back to the automatic theme")
+    commands.add_parser("next", help="show the next scheduled switch")
+
+    export = commands.add_parser(
+        "export", help="export the upcoming switches as a calendar or CSV"
+    )
+    export.add_argument("--days", type=int, help="number of days (default: 90)")
+    export.add_argument(
+        "--start",
+        type=date.fromisoformat,
+        help="first day as YYYY-MM-DD (default: today)",
+    )
+    export.add_argument(
+        "--format",
+        choices=EXPORT_FORMATS,
+        help="output format (default: from the output file, else ics)",
+    )
+    export.add_argument(
+        "-o", "--output", type=Path, help="output file (default: stdout)"
+    )
+
+    batch = commands.add_parser(
+        "batch", help="compute the schedules of many locations (offline)"
+    )
+    batch.add_argument("locations", type=Path, help="CSV or JSON file of locations")
+    batch.add_argument(
+        "--start",
+        type=date.fromisoformat,
+        help="first day as YYYY-MM-DD (default: today)",
+    )
+    batch.add_argument("--days", type=int, default=365, help="number of days")
+    batch.add_argument(
+        "--format",
+        choices=BATCH_FORMATS,
+        help="output format (default: from the output file, else csv)",
+    )
+    batch.add_argument(
+        "-o", "--output", type=Path, help="output file (default: stdout)"
+    )
+    batch.add_argument(
+        "--workers", type=int, default=1, help="processes computing locations"
+    )
+    batch.add_argument(
+        "--light-elevation", type=float, help="degrees (default: sunrise)"
+    )
+    batch.add_argument("--dark-elevation", type=float, help="degrees (default: sunset)")
+
+    commands.add_parser("paths", help="show the resolved folders (offline)")
+
+    stats = commands.add_parser(
+        "stats", help="summarize the switch history of the event log (offline)"
+    )
+    stats.add_argument(
+        "--log",
+        type=Path,
+        help="event log, rotated backups included (default: logs/events.jsonl)",
+    )
+
+    return parser
+
+
+def format_response(cmd: str, response: dict) -> str:
+    if not response.get("ok"):
+        return f"Error: {response.get('error')}"
+
+    if cmd == "status":
+        return (
+            f"Theme: {response['theme']}\n"
+            f"Sunrise: {response['sunrise']}\n"
+            f"Sunset: {response['sunset']}\n"
+            f"Override: {response['override'] or 'none'}"
+            + (
+                f"\nNetwork: {network['state']}"
+                if (network := response.get("network"))
+                else ""
+            )
+            + (
+                f"\nCommands: {actor['runs']} run, {actor['collapsed']} collapsed, "
+                f"queue {actor['depth']} (max {actor['max_depth']}), "
+                f"latency mean {actor['mean']}s, max {actor['max']}s"
+                if (actor := response.get("actor"))
+                else ""
+            )
+            + "".join(
+                f"\nHook {name}: {m['runs']} runs, mean {m['mean']}s, "
+                f"max {m['max']}s, {m['failures']} failed, {m['timeouts']} timed out"
+                for name, m in (response.get("hooks") or {}).items()
+            )
+        )
+    if cmd == "next":
+        if response["at"] is None:
+            return "No switch scheduled"
+        return f"Next switch to {response['theme']} at {response['at']}"
+
+    return f"Theme: {response['theme']}"
+
+
+def build_request(args: Namespace) -> dict:
+    if args.cmd != "force":
+        return {"cmd": args.cmd, "args": []}
+
+    if args.minutes is not None:
+        return {"cmd": "force", "args": [args.theme, "duration", args.minutes]}
+    if args.tomorrow:
+        return {"cmd": "force", "args": [args.theme, "tomorrow"]}
+    return {"cmd": "force", "args": [args.theme]}
+
+
+def output_format(args: Namespace, writers: dict, default: str) -> str:
+    """Format from --format, else from the output file suffix"""
+    if args.format is not None:
+        return args.format
+    suffix = args.output.suffix.lstrip(".").lower() if args.output else ""
+    return suffix if suffix in writers else default
+
+
+def write_output(args: Namespace, writer, rows) -> int:
+    """Write to --output, or stream to stdout"""
+    if args.output is None:
+        return writer(rows, sys.stdout)
+    with args.output.open("w", encoding="utf-8", newline="") as f:
+        return writer(rows, f)
+
+
+def run_export(args: Namespace) -> int:
+    """Stream the upcoming switches of the running instance's location"""
+    from src.core.cache import location_key
+    from src.core.export import (
+        EXPORT_DAYS,
+        WRITERS,
+        upcoming_transitions,
+        write_ics,
+    )
+
+    response = send_request({"cmd": "location", "args": []})
+    if response is None:
+        print("AutoSwitchTheme is not running")
+        return 2
+    if not response.get("ok"):
+        print(format_response(args.cmd, response))
+        return 1
+
+    transitions = upcoming_transitions(
+        response["latitude"],
+        response["longitude"],
+        response["timezone"],
+        args.start or date.today(),
+        EXPORT_DAYS if args.days is None else args.days,
+        response["light_elevation"],
+        response["dark_elevation"],
+    )
+    name = output_format(args, WRITERS, "ics")
+    writer = WRITERS[name]
+    if name == "ics":
+        # Event UIDs of the plan, distinct for each location and thresholds
+        writer = partial(
+            write_ics,
+            key=location_key(
+                response["latitude"],
+                response["longitude"],
+                response["timezone"],
+                response["light_elevation"],
+                response["dark_elevation"],
+            ),
+        )
+
+    try:
+        count = write_output(args, writer, transitions)
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print(f"{count} transitions exported", file=sys.stderr)
+    return 0
+
+
+def run_batch(args: Namespace) -> int:
+    """Stream the schedules of every location to the output"""
+    from src.core.batch import WRITERS, check_locations, generate, read_locations
+    from src.core.ephemeris import SUNRISE_ELEVATION
+
+    rows = generate(
+        read_locations(args.locations),
+        args.start or date.today(),
+        args.days,
+        SUNRISE_ELEVATION if args.light_elevation is None else args.light_elevation,
+        SUNRISE_ELEVATION if args.dark_elevation is None else args.dark_elevation,
+        args.workers,
+    )
+    writer = WRITERS[output_format(args, WRITERS, "csv")]
+
+    try:
+        # Rows are generated lazily: reject a bad record before the header
+        check_locations(args.locations)
+        count = write_output(args, writer, rows)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print(f"{count} rows written", file=sys.stderr)
+    return 0
+
+
+def run_stats(args: Namespace) -> int:
+    """Stream every event log once and print the summary"""
+    from src.core.stats import format_summary, log_files, read_events, summarize
+
+    path = args.log or Paths.get_event_log_file()
+    files = log_files(path)
+    if not files:
+        print(f"No event log found at {path}", file=sys.stderr)
+        return 1
+
+    try:
+        summary = summarize(read_events(files))
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print(json_dumps(summary) if args.json else format_summary(summary))
+    return 0
+
+
+def run_paths(args: Namespace) -> int:
+    """Print the folders resolved from the options and the environment"""
+    layout = Paths.layout().describe()
+    if args.json:
+        print(json_dumps(layout))
+    else:
+        print("\n".join(f"{name}: {value}" for name, value in layout.items()))
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    # Same folders (and control channel) as an instance started with them
+    if args.portable or args.data_dir or args.user_dir:
+        Paths.configure(sys.argv[1:] if argv is None else argv)
+    if args.cmd == "paths":
+        return run_paths(args)
+    if args.cmd == "batch":
+        return run_batch(args)
+    if args.cmd == "export":
+        return run_export(args)
+    if args.cmd == "stats":
+        return run_stats(args)
+
+    request = build_request(args)
+
+    response = send_request(request)
+    if response is None:
+        print("AutoSwitchTheme is not running")
+        return 2
+
+    print(json_dumps(response) if args.json else format_response(args.cmd, response))
+    return 0 if response.get("ok") else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,184 @@
+"""Single thread owning the theme state, fed by a queue of commands"""
+
+import threading
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future
+from functools import partial, wraps
+from time import monotonic
+from typing import Any, NamedTuple
+
+from src.utils.logger import Logger
+
+
+logger = Logger.get_logger("app")
+
+# Time a command may wait in the queue before it is reported
+SLOW = 1.0
+
+
+class Command(NamedTuple):
+    key: str | None
+    func: Callable[[], Any]
+    future: Future
+    queued: float
+
+
+class ActorMetrics:
+    """Queue depth and latency (queued to done) of the commands"""
+
+    __slots__ = ("collapsed", "max", "max_depth", "runs", "total")
+
+    def __init__(self):
+        self.runs = 0
+        self.collapsed = 0
+        self.max_depth = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, latency: float):
+        self.runs += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+
+    def summary(self, depth: int) -> dict:
+        return {
+            "runs": self.runs,
+            "collapsed": self.collapsed,
+            "depth": depth,
+            "max_depth": self.max_depth,
+            "mean": round(self.total / self.runs, 3) if self.runs else None,
+            "max": round(self.max, 3) if self.runs else None,
+        }
+
+
+class ThemeActor:
+    """
+    Run the commands changing the theme one at a time, on its own thread
+
+    The scheduler, the tray menu, the control channel and the service events
+    all queue their commands here, so the theme state and the registry are
+    only ever touched by this thread. A command queued with the key of one
+    still pending replaces it (only the last target matters): the pending one
+    is dropped and its callers get the result of the new one.
+    """
+
+    def __init__(self, name: str = "theme-actor"):
+        self.name = name
+        self.metrics = ActorMetrics()
+        self._pending: deque[Command] = deque()
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._running = False
+
+    def start(self):
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None):
+        """Stop once the queued commands are run"""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_current(self) -> bool:
+        """True when called from a command, already on the actor thread"""
+        return threading.current_thread() is self._thread
+
+    def submit(self, func: Callable[[], Any], key: str | None = None) -> Future:
+        """
+        Queue a command
+        Args:
+            key: commands of the same key collapse, the last one only runs
+        Raises:
+            RuntimeError: if the actor is stopped
+        """
+        with self._condition:
+            if not self._running:
+                raise RuntimeError("Theme actor stopped")
+
+            future, queued = Future(), monotonic()
+            if key is not None:
+                replaced = next((c for c in self._pending if c.key == key), None)
+                if replaced is not None:
+                    self._pending.remove(replaced)
+                    future, queued = replaced.future, replaced.queued
+                    self.metrics.collapsed += 1
+                    logger.debug(f"Pending {key} command replaced")
+
+            self._pending.append(Command(key, func, future, queued))
+            self.metrics.max_depth = max(self.metrics.max_depth, len(self._pending))
+            self._condition.notify()
+        return future
+
+    def call(self, func: Callable[[], Any], key: str | None = None) -> Any:
+        """
+        Run a command on the actor thread and wait for its result
+        It runs inline from the actor thread itself, or while the actor is
+        not running (startup, shutdown).
+        """
+        if self.is_current() or not self._running:
+            return func()
+        return self.submit(func, key).result()
+
+    def _loop(self):
+        while True:
+            with self._condition:
+                while self._running and not self._pending:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                command = self._pending.popleft()
+
+            if not command.future.set_running_or_notify_cancel():
+                continue
+
+            waited = monotonic() - command.queued
+            if waited > SLOW:
+                logger.warning(f"Theme command waited {waited:.3f}s in the queue")
+            result, error = None, None
+            try:
+                result = command.func()
+            except Exception as e:
+                error = e
+
+            latency = monotonic() - command.queued
+            with self._condition:
+                self.metrics.add(latency)
+            logger.debug(f"Theme command {command.key or '-'} done in {latency:.3f}s")
+            if error is not None:
+                command.future.set_exception(error)
+            else:
+                command.future.set_result(result)
+
+    def status(self) -> dict:
+        """Commands run and collapsed, queue depth and latency"""
+        with self._condition:
+            return self.metrics.summary(len(self._pending))
+
+
+def serialized(key: str | None = None):
+    """
+    Run the decorated method on the actor of its object, if it has one
+    Args:
+        key: collapse key of the command (see ThemeActor.submit)
+    """
+
+    def decorate(method: Callable[..., Any]) -> Callable[..., Any]:
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            actor: ThemeActor | None = getattr(self, "actor", None)
+            if actor is None:
+                return method(self, *args, **kwargs)
+            return actor.call(partial(method, self, *args, **kwargs), key)
+
+        return wrapper
+
+    return decorate
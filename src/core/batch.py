@@ -0,0 +1,168 @@
+"""Transition schedules for many locations, streamed to CSV or JSON Lines"""
+
+import csv
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from datetime import date
+from functools import partial
+from json import dumps as json_dumps, load as json_load
+from pathlib import Path
+from typing import NamedTuple, TextIO
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from src.core.ephemeris import SUNRISE_ELEVATION, range_ephemeris
+
+
+FIELDS = ("location", "date", "kind", "light", "dark")
+
+
+class Location(NamedTuple):
+    name: str
+    latitude: float
+    longitude: float
+    timezone: str
+
+
+def read_locations(path: Path) -> Iterator[Location]:
+    """
+    Locations from a CSV file (with a header) or a JSON list of objects
+    Both need the name, latitude, longitude and timezone fields.
+    """
+    if path.suffix.lower() == ".json":
+        with path.open("r", encoding="utf-8") as f:
+            records = json_load(f)
+        for record in records:
+            yield parse_location(record)
+        return
+
+    with path.open("r", encoding="utf-8", newline="") as f:
+        for record in csv.DictReader(f):
+            yield parse_location(record)
+
+
+def check_locations(path: Path) -> int:
+    """
+    Parse every location once, without keeping them, so that an invalid record
+    fails before any row is written (read_locations then streams them again)
+    Returns:
+        number of locations
+    Raises:
+        ValueError: on the first invalid record
+    """
+    return sum(1 for _ in read_locations(path))
+
+
+def parse_location(record: dict) -> Location:
+    try:
+        location = Location(
+            str(record["name"]),
+            float(record["latitude"]),
+            float(record["longitude"]),
+            str(record["timezone"]),
+        )
+        # Unknown zones fail here, during check_locations, not mid-output
+        ZoneInfo(location.timezone)
+        return location
+    except (KeyError, TypeError, ValueError, ZoneInfoNotFoundError) as e:
+        raise ValueError(f"Invalid location {record!r}: {e}") from None
+
+
+def location_rows(
+    location: Location,
+    start: date,
+    days: int,
+    light_elevation: float = SUNRISE_ELEVATION,
+    dark_elevation: float = SUNRISE_ELEVATION,
+) -> list[dict]:
+    """Schedule of one location, one row per day"""
+    return [
+        {
+            "location": location.name,
+            "date": ephemeris.day.isoformat(),
+            "kind": ephemeris.kind,
+            "light": ephemeris.light.isoformat(timespec="seconds")
+            if ephemeris.light
+            else None,
+            "dark": ephemeris.dark.isoformat(timespec="seconds")
+            if ephemeris.dark
+            else None,
+        }
+        for ephemeris in range_ephemeris(
+            location.latitude,
+            location.longitude,
+            location.timezone,
+            start,
+            days,
+            light_elevation,
+            dark_elevation,
+        )
+    ]
+
+
+def bounded_map(
+    executor: Executor, func, items: Iterable, window: int
+) -> Iterator[list[dict]]:
+    """
+    Like executor.map, in order, but with at most window tasks in flight, so
+    neither the input nor the results are ever held in memory all at once
+    """
+    pending: deque[Future] = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def generate(
+    locations: Iterable[Location],
+    start: date,
+    days: int,
+    light_elevation: float = SUNRISE_ELEVATION,
+    dark_elevation: float = SUNRISE_ELEVATION,
+    workers: int = 1,
+) -> Iterator[dict]:
+    """
+    Rows of every location, location after location
+    Args:
+        workers: above 1, locations are computed in that many processes
+    """
+    compute = partial(
+        location_rows,
+        start=start,
+        days=days,
+        light_elevation=light_elevation,
+        dark_elevation=dark_elevation,
+    )
+
+    if workers <= 1:
+        for location in locations:
+            yield from compute(location)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for rows in bounded_map(executor, compute, locations, workers * 2):
+            yield from rows
+
+
+def write_csv(rows: Iterable[dict], output: TextIO) -> int:
+    writer = csv.DictWriter(output, FIELDS, lineterminator="\n")
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_jsonl(rows: Iterable[dict], output: TextIO) -> int:
+    count = 0
+    for row in rows:
+        output.write(json_dumps(row, separators=(",", ":")) + "\n")
+        count += 1
+    return count
+
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl}
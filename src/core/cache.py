@@ -0,0 +1,189 @@
+import os
+from collections.abc import Callable
+from contextlib import suppress
+from datetime import date, datetime, timedelta
+from json import JSONDecodeError, dump as json_dump, load as json_load
+from pathlib import Path
+from time import sleep
+
+from src.core.ephemeris import DayEphemeris
+from src.utils.lock import FileLock
+from src.utils.logger import Logger
+
+
+logger = Logger.get_logger("app")
+
+VERSION = 1
+
+# Waiting longer than this for another session means something is stuck:
+# compute without sharing rather than block the caller
+LOCK_TIMEOUT = 5.0
+
+
+def location_key(
+    latitude: float,
+    longitude: float,
+    timezone: str,
+    light_elevation: float,
+    dark_elevation: float,
+) -> str:
+    """Identify the location and thresholds a range of days belongs to"""
+    return f"{latitude},{longitude},{timezone},{light_elevation},{dark_elevation}"
+
+
+def encode_day(ephemeris: DayEphemeris) -> dict:
+    return {
+        "light": ephemeris.light.isoformat() if ephemeris.light else None,
+        "dark": ephemeris.dark.isoformat() if ephemeris.dark else None,
+        "kind": ephemeris.kind,
+    }
+
+
+def decode_day(day: date, data: dict) -> DayEphemeris:
+    return DayEphemeris(
+        day,
+        datetime.fromisoformat(data["light"]) if data["light"] else None,
+        datetime.fromisoformat(data["dark"]) if data["dark"] else None,
+        data["kind"],
+    )
+
+
+class EphemerisCache:
+    """
+    Ephemeris shared by every session of the machine
+
+    One JSON file maps a location key (coordinates, timezone, thresholds) to the
+    days already computed. Reads take no lock: writers replace the whole file
+    atomically, so a reader sees either the old or the new version. Writers
+    serialize on an advisory lock and re-read before computing, so each day of
+    a location is computed once however many sessions start together.
+
+    The file and its lock belong to the account that created them, so with
+    several users the days are only shared when the service (--service)
+    computes them: standalone sessions of the other users can still read the
+    file, but fail to open the lock and compute on their own.
+    """
+
+    __slots__ = ("lock", "path")
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = FileLock(path.with_name(path.name + ".lock"))
+
+    def _read(self) -> dict[str, dict[str, dict]]:
+        try:
+            with self.path.open("r") as f:
+                data = json_load(f)
+        except (OSError, JSONDecodeError):
+            return {}
+        # Any other layout (e.g. the former single-day cache) counts as empty
+        if not isinstance(data, dict) or data.get("version") != VERSION:
+            return {}
+        entries = data.get("entries")
+        if not isinstance(entries, dict):
+            return {}
+        return {key: entry for key, entry in entries.items() if isinstance(entry, dict)}
+
+    def _write(self, entries: dict[str, dict[str, dict]]):
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with tmp_path.open("w") as f:
+            json_dump({"version": VERSION, "entries": entries}, f)
+
+        # A reader holding the file open makes the replace fail on Windows
+        for _ in range(10):
+            try:
+                os.replace(tmp_path, self.path)
+                return
+            except PermissionError:
+                sleep(0.05)
+        with suppress(OSError):
+            tmp_path.unlink()
+        raise PermissionError(f"Could not replace {self.path}")
+
+    def get(self, key: str, start: date, days: int = 1) -> list[DayEphemeris] | None:
+        """
+        Cached days from start, without locking
+        Returns:
+            None unless every day of the range is cached
+        """
+        return self._lookup(self._read().get(key, {}), start, days)
+
+    @staticmethod
+    def _decode(entry: dict, day: date) -> DayEphemeris | None:
+        """Cached day, None if missing or malformed (then computed again)"""
+        if (data := entry.get(day.isoformat())) is None:
+            return None
+        try:
+            return decode_day(day, data)
+        except (KeyError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring malformed ephemeris cache entry {day}: {e}")
+            return None
+
+    @classmethod
+    def _lookup(cls, entry: dict, start: date, days: int) -> list[DayEphemeris] | None:
+        result = []
+        for offset in range(days):
+            if (
+                ephemeris := cls._decode(entry, start + timedelta(days=offset))
+            ) is None:
+                return None
+            result.append(ephemeris)
+        return result
+
+    def get_or_compute(
+        self,
+        key: str,
+        start: date,
+        days: int,
+        compute: Callable[[date], DayEphemeris],
+    ) -> list[DayEphemeris]:
+        """
+        Days from start, computing and sharing the missing ones
+        Past days are dropped on write, so the file only holds the current
+        range of each location.
+        Args:
+            compute: ephemeris of a single day
+        """
+        if (cached := self.get(key, start, days)) is not None:
+            return cached
+
+        try:
+            locked = self.lock.acquire(timeout=LOCK_TIMEOUT)
+        except OSError as e:
+            # e.g. lock file owned by another user, or a folder in its place
+            logger.error(f"Error opening ephemeris cache lock: {e}")
+            locked = False
+        if not locked:
+            logger.warning("Ephemeris cache is locked, computing without it")
+            return [compute(start + timedelta(days=k)) for k in range(days)]
+
+        try:
+            # Another session may have filled the range while we waited
+            entries = self._read()
+            entry = entries.get(key, {})
+            if (cached := self._lookup(entry, start, days)) is not None:
+                return cached
+
+            result = []
+            for offset in range(days):
+                day = start + timedelta(days=offset)
+                result.append(self._decode(entry, day) or compute(day))
+
+            # Drop the past days (one day of slack for zones ahead of the host)
+            oldest = (date.today() - timedelta(days=1)).isoformat()
+            entry = {d: v for d, v in entry.items() if d >= oldest}
+            entry.update(
+                {
+                    (start + timedelta(days=offset)).isoformat(): encode_day(e)
+                    for offset, e in enumerate(result)
+                }
+            )
+            entries[key] = entry
+
+            try:
+                self._write(entries)
+            except OSError as e:
+                logger.error(f"Error writing ephemeris cache: {e}")
+            return result
+        finally:
+            self.lock.release()
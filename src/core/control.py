@@ -0,0 +1,101 @@
+from src.core.timeline import next_transition
+from src.utils.logger import Logger
+
+
+logger = Logger.get_logger("app")
+
+
+class Controller:
+    """Execute requests received on the local control channel"""
+
+    def __init__(self, tray_app):
+        self.tray_app = tray_app
+
+    def handle(self, request: dict) -> dict:
+        """
+        Dispatch a request to its command
+        Args:
+            request: {"cmd": str, "args": list}
+        """
+        command = getattr(self, f"cmd_{request.get('cmd')}", None)
+        if command is None:
+            return {"ok": False, "error": f"Unknown command: {request.get('cmd')}"}
+
+        return command(*request.get("args", []))
+
+    @property
+    def monitor(self):
+        return self.tray_app.theme_monitor
+
+    def _not_ready(self) -> dict:
+        return {"ok": False, "error": "Theme monitor not ready"}
+
+    def cmd_activate(self, *args) -> dict:
+        logger.info(f"Launch forwarded by another instance: {list(args)}")
+        return {"ok": True, "running": self.tray_app.running}
+
+    def cmd_status(self) -> dict:
+        if self.monitor is None:
+            return self._not_ready()
+
+        override = self.monitor.override
+        return {
+            "ok": True,
+            "theme": self.monitor.theme,
+            "sunrise": self.monitor.sun_hours["sunrise"],
+            "sunset": self.monitor.sun_hours["sunset"],
+            "override": override.describe() if override.is_active() else None,
+            "network": network.status() if (network := self.tray_app.network) else None,
+            "hooks": hooks.status() if (hooks := self.monitor.hooks) else None,
+            "actor": actor.status() if (actor := self.monitor.actor) else None,
+        }
+
+    def cmd_force(
+        self, theme: str = "", mode: str = "next", minutes: int | None = None
+    ) -> dict:
+        if self.monitor is None:
+            return self._not_ready()
+
+        if theme not in ("light", "dark"):
+            return {"ok": False, "error": "Theme must be 'light' or 'dark'"}
+
+        try:
+            self.monitor.set_override(theme, mode, minutes)
+        except ValueError as e:
+            return {"ok": False, "error": str(e)}
+
+        logger.info(f"Forced {theme} theme ({mode}) from command line")
+        return {"ok": True, "theme": theme}
+
+    def cmd_resume(self) -> dict:
+        if self.monitor is None:
+            return self._not_ready()
+
+        self.monitor.end_override()
+        logger.info("Automatic theme resumed from command line")
+        return {"ok": True, "theme": self.monitor.theme}
+
+    def cmd_next(self) -> dict:
+        if self.monitor is None:
+            return self._not_ready()
+
+        transition = next_transition(self.monitor.sun_hours, self.monitor.now())
+        if transition is None:
+            return {"ok": True, "at": None, "theme": None}
+
+        at, theme = transition
+        return {"ok": True, "at": at.isoformat(timespec="minutes"), "theme": theme}
+
+    def cmd_location(self) -> dict:
+        if self.monitor is None:
+            return self._not_ready()
+
+        city = self.monitor.city
+        return {
+            "ok": True,
+            "latitude": city.latitude,
+            "longitude": city.longitude,
+            "timezone": city.timezone,
+            "light_elevation": self.monitor.light_elevation,
+            "dark_elevation": self.monitor.dark_elevation,
+        }
@@ -0,0 +1,312 @@
+from collections.abc import Callable, Iterator, Sequence
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from math import acos, asin, ceil, cos, degrees, radians, sin, tan
+from typing import NamedTuple
+from zoneinfo import ZoneInfo
+
+from src.core.timeline import NORMAL, POLAR_DAY, POLAR_NIGHT, localize
+
+
+# Geometric elevation of the sun centre at standard sunrise/sunset (refraction
+# and solar radius), the same convention as astral
+SUNRISE_ELEVATION = -0.833
+
+# Sampling step of the elevation curve before refining each crossing
+SAMPLE_STEP = 600.0
+
+# Shorter light (or dark) periods are merged into the surrounding night (or
+# day), to avoid two switches minutes apart when the sun grazes the threshold
+MIN_PERIOD = timedelta(minutes=20)
+
+# Days whose elevations are computed in one pass by range_ephemeris
+BATCH_DAYS = 32
+
+
+class DayEphemeris(NamedTuple):
+    """Switch instants of a local day (None when the threshold is never crossed)"""
+
+    day: date
+    light: datetime | None
+    dark: datetime | None
+    kind: str = NORMAL
+
+
+def solar_elevations(
+    latitude: float, longitude: float, timestamps: Sequence[float]
+) -> list[float]:
+    """
+    Geometric solar elevation (degrees) for a batch of instants
+    NOAA solar position algorithm, accurate to about one minute of time.
+    Args:
+        timestamps: POSIX timestamps (UTC seconds)
+    """
+    lat = radians(latitude)
+    sin_lat, cos_lat = sin(lat), cos(lat)
+    elevations = []
+
+    for ts in timestamps:
+        t = (ts / 86400.0 + 2440587.5 - 2451545.0) / 36525.0
+
+        l0 = radians((280.46646 + t * (36000.76983 + t * 0.0003032)) % 360)
+        m = radians(357.52911 + t * (35999.05029 - 0.0001537 * t))
+        e = 0.016708634 - t * (0.000042037 + 0.0000001267 * t)
+        c = (
+            sin(m) * (1.914602 - t * (0.004817 + 0.000014 * t))
+            + sin(2 * m) * (0.019993 - 0.000101 * t)
+            + sin(3 * m) * 0.000289
+        )
+        omega = radians(125.04 - 1934.136 * t)
+        apparent_long = radians(degrees(l0) + c - 0.00569 - 0.00478 * sin(omega))
+        obliquity = radians(
+            23
+            + (26 + (21.448 - t * (46.815 + t * (0.00059 - t * 0.001813))) / 60) / 60
+            + 0.00256 * cos(omega)
+        )
+        declination = asin(sin(obliquity) * sin(apparent_long))
+
+        y = tan(obliquity / 2) ** 2
+        equation_of_time = 4 * degrees(
+            y * sin(2 * l0)
+            - 2 * e * sin(m)
+            + 4 * e * y * sin(m) * cos(2 * l0)
+            - 0.5 * y * y * sin(4 * l0)
+            - 1.25 * e * e * sin(2 * m)
+        )
+
+        solar_minutes = (ts % 86400.0) / 60.0 + equation_of_time + 4 * longitude
+        hour_angle = radians(solar_minutes / 4 - 180)
+
+        cos_zenith = sin_lat * sin(declination) + cos_lat * cos(declination) * cos(
+            hour_angle
+        )
+        elevations.append(90 - degrees(acos(max(-1.0, min(1.0, cos_zenith)))))
+
+    return elevations
+
+
+def solve_bracket(
+    f: Callable[[float], float],
+    a: float,
+    b: float,
+    fa: float,
+    fb: float,
+    tolerance: float = 1.0,
+) -> float:
+    """
+    Root of f in [a, b] where f(a) and f(b) have opposite signs
+    Illinois variant of regula falsi: superlinear on smooth curves and never
+    leaves the bracket.
+    """
+    side = 0
+    while b - a > tolerance:
+        x = b - fb * (b - a) / (fb - fa)
+        fx = f(x)
+        if fx == 0:
+            return x
+        if (fx > 0) == (fb > 0):
+            b, fb = x, fx
+            if side == -1:
+                fa /= 2
+            side = -1
+        else:
+            a, fa = x, fx
+            if side == 1:
+                fb /= 2
+            side = 1
+    return (a + b) / 2
+
+
+def sample_grid(start: float, end: float) -> list[float]:
+    """Instants from start to end (both included) every SAMPLE_STEP"""
+    steps = ceil((end - start) / SAMPLE_STEP)
+    return [min(start + k * SAMPLE_STEP, end) for k in range(steps + 1)]
+
+
+def find_crossings(
+    latitude: float,
+    longitude: float,
+    start: float,
+    end: float,
+    threshold: float,
+    rising: bool,
+    samples: Sequence[float] | None = None,
+) -> list[float]:
+    """
+    Instants in [start, end] where the elevation crosses threshold
+    Args:
+        rising: look for upward (True) or downward (False) crossings
+        samples: elevations at start + k * SAMPLE_STEP, if already computed
+    """
+    grid = sample_grid(start, end)
+    if samples is None:
+        samples = solar_elevations(latitude, longitude, grid)
+
+    def f(ts: float) -> float:
+        return solar_elevations(latitude, longitude, (ts,))[0] - threshold
+
+    crossings = []
+    for k in range(len(grid) - 1):
+        fa, fb = samples[k] - threshold, samples[k + 1] - threshold
+        if (fa < 0 <= fb) if rising else (fa >= 0 > fb):
+            crossings.append(solve_bracket(f, grid[k], grid[k + 1], fa, fb))
+    return crossings
+
+
+def day_ephemeris(
+    latitude: float,
+    longitude: float,
+    timezone: str,
+    day: date,
+    light_elevation: float = SUNRISE_ELEVATION,
+    dark_elevation: float = SUNRISE_ELEVATION,
+) -> DayEphemeris:
+    """
+    Switch instants of a local day, cached per (location, thresholds, date)
+    Args:
+        light_elevation: switch to light when the rising sun crosses it
+        dark_elevation: switch to dark when the setting sun crosses it
+    """
+    # Always pass every argument positionally so they share one cache entry
+    return _day_ephemeris(
+        float(latitude),
+        float(longitude),
+        timezone,
+        day,
+        float(light_elevation),
+        float(dark_elevation),
+    )
+
+
+@lru_cache(maxsize=1024)
+def _day_ephemeris(
+    latitude: float,
+    longitude: float,
+    timezone: str,
+    day: date,
+    light_elevation: float,
+    dark_elevation: float,
+) -> DayEphemeris:
+    tz = ZoneInfo(timezone)
+    start, end = day_bounds(day, tz)
+    samples = solar_elevations(latitude, longitude, sample_grid(start, end))
+    return classify_day(
+        latitude,
+        longitude,
+        day,
+        tz,
+        samples,
+        light_elevation,
+        dark_elevation,
+    )
+
+
+def day_bounds(day: date, tz: ZoneInfo) -> tuple[float, float]:
+    """Timestamps of the local midnights that start and end a day"""
+    return (
+        localize(day, time.min, tz).timestamp(),
+        localize(day + timedelta(days=1), time.min, tz).timestamp(),
+    )
+
+
+def classify_day(
+    latitude: float,
+    longitude: float,
+    day: date,
+    tz: ZoneInfo,
+    samples: Sequence[float],
+    light_elevation: float,
+    dark_elevation: float,
+) -> DayEphemeris:
+    """
+    Switch instants and kind of a day from its elevation samples
+    Args:
+        samples: elevations on sample_grid(*day_bounds(day, tz))
+    """
+    start, end = day_bounds(day, tz)
+    light = find_crossings(
+        latitude, longitude, start, end, light_elevation, True, samples
+    )
+    dark = find_crossings(
+        latitude, longitude, start, end, dark_elevation, False, samples
+    )
+
+    if not light and not dark:
+        # Never crossed: the sun stays on one side of the thresholds all day
+        middle = (light_elevation + dark_elevation) / 2
+        kind = POLAR_DAY if samples[0] >= middle else POLAR_NIGHT
+        return DayEphemeris(day, None, None, kind)
+
+    if light and dark and abs(dark[-1] - light[0]) < MIN_PERIOD.total_seconds():
+        # Grazing the threshold: merge the short period into the long one
+        kind = POLAR_NIGHT if light[0] < dark[-1] else POLAR_DAY
+        return DayEphemeris(day, None, None, kind)
+
+    return DayEphemeris(
+        day,
+        datetime.fromtimestamp(light[0], tz) if light else None,
+        datetime.fromtimestamp(dark[-1], tz) if dark else None,
+        NORMAL,
+    )
+
+
+def range_ephemeris(
+    latitude: float,
+    longitude: float,
+    timezone: str,
+    start: date,
+    days: int,
+    light_elevation: float = SUNRISE_ELEVATION,
+    dark_elevation: float = SUNRISE_ELEVATION,
+) -> Iterator[DayEphemeris]:
+    """
+    Consecutive days computed in batches, without going through the cache
+    The elevations of BATCH_DAYS days are computed in a single pass, and days
+    are yielded as they are classified, so long ranges stay in bounded memory.
+    """
+    tz = ZoneInfo(timezone)
+    for first in range(0, days, BATCH_DAYS):
+        batch = [
+            start + timedelta(days=offset)
+            for offset in range(first, min(first + BATCH_DAYS, days))
+        ]
+        grids = [sample_grid(*day_bounds(day, tz)) for day in batch]
+        samples = solar_elevations(
+            latitude, longitude, [ts for grid in grids for ts in grid]
+        )
+
+        offset = 0
+        for day, grid in zip(batch, grids, strict=True):
+            yield classify_day(
+                latitude,
+                longitude,
+                day,
+                tz,
+                samples[offset : offset + len(grid)],
+                light_elevation,
+                dark_elevation,
+            )
+            offset += len(grid)
+
+
+def precompute(
+    latitude: float,
+    longitude: float,
+    timezone: str,
+    start: date,
+    days: int,
+    light_elevation: float = SUNRISE_ELEVATION,
+    dark_elevation: float = SUNRISE_ELEVATION,
+) -> list[DayEphemeris]:
+    """Fill the cache for a window of days and return it"""
+    return [
+        day_ephemeris(
+            latitude,
+            longitude,
+            timezone,
+            start + timedelta(days=offset),
+            light_elevation,
+            dark_elevation,
+        )
+        for offset in range(days)
+    ]
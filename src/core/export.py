@@ -0,0 +1,141 @@
+"""Upcoming transitions as an iCalendar file or CSV, streamed day after day"""
+
+from collections.abc import Iterable, Iterator
+from datetime import UTC, date, datetime, timedelta
+from hashlib import sha256
+from typing import NamedTuple, TextIO
+
+from src.core.ephemeris import SUNRISE_ELEVATION, DayEphemeris, range_ephemeris
+from src.core.timeline import NORMAL, POLAR_DAY
+
+
+# Default length of the exported plan
+EXPORT_DAYS = 90
+
+
+class Transition(NamedTuple):
+    """A switch, or a theme held all day (at is None) on polar days"""
+
+    day: date
+    at: datetime | None
+    theme: str
+    kind: str
+
+
+def upcoming_transitions(
+    latitude: float,
+    longitude: float,
+    timezone: str,
+    start: date,
+    days: int = EXPORT_DAYS,
+    light_elevation: float = SUNRISE_ELEVATION,
+    dark_elevation: float = SUNRISE_ELEVATION,
+) -> Iterator[Transition]:
+    """Transitions of the coming days, in chronological order"""
+    return day_transitions(
+        range_ephemeris(
+            latitude,
+            longitude,
+            timezone,
+            start,
+            days,
+            light_elevation,
+            dark_elevation,
+        )
+    )
+
+
+def day_transitions(ephemerides: Iterable[DayEphemeris]) -> Iterator[Transition]:
+    """Transitions of consecutive days, e.g. precomputed ones followed by new ones"""
+    for ephemeris in ephemerides:
+        if ephemeris.kind != NORMAL:
+            theme = "light" if ephemeris.kind == POLAR_DAY else "dark"
+            yield Transition(ephemeris.day, None, theme, ephemeris.kind)
+            continue
+
+        switches = [(ephemeris.light, "light"), (ephemeris.dark, "dark")]
+        for at, theme in sorted((at, theme) for at, theme in switches if at):
+            yield Transition(ephemeris.day, at, theme, NORMAL)
+
+
+def _ics_time(at: datetime) -> str:
+    return at.astimezone(UTC).strftime("%Y%m%dT%H%M%SZ")
+
+
+def ics_lines(
+    transitions: Iterable[Transition], now: datetime | None = None, key: str = ""
+) -> Iterator[str]:
+    """
+    Lines of an iCalendar (RFC 5545) calendar, one event per transition
+    Args:
+        key: location and thresholds of the plan (see location_key), hashed in
+            the event UIDs so that plans of other locations do not collide
+    """
+    stamp = _ics_time(now or datetime.now(UTC))
+    plan = f"-{sha256(key.encode()).hexdigest()[:12]}" if key else ""
+
+    yield "BEGIN:VCALENDAR"
+    yield "VERSION:2.0"
+    yield "PRODID:-//AutoSwitchTheme//Transition plan//EN"
+    yield "CALSCALE:GREGORIAN"
+    yield "X-WR-CALNAME:AutoSwitchTheme"
+
+    for transition in transitions:
+        yield "BEGIN:VEVENT"
+        yield (
+            f"UID:{transition.day.isoformat()}-{transition.theme}{plan}@autoswitchtheme"
+        )
+        yield f"DTSTAMP:{stamp}"
+        if transition.at is None:
+            # Polar day or night: an all-day event
+            day_after = transition.day + timedelta(days=1)
+            yield f"DTSTART;VALUE=DATE:{transition.day.strftime('%Y%m%d')}"
+            yield f"DTEND;VALUE=DATE:{day_after.strftime('%Y%m%d')}"
+            yield f"SUMMARY:{transition.theme.capitalize()} theme all day"
+        else:
+            yield f"DTSTART:{_ics_time(transition.at)}"
+            yield f"DTEND:{_ics_time(transition.at)}"
+            yield f"SUMMARY:Switch to {transition.theme} theme"
+        yield "TRANSP:TRANSPARENT"
+        yield "END:VEVENT"
+
+    yield "END:VCALENDAR"
+
+
+def write_ics(transitions: Iterable[Transition], output: TextIO, key: str = "") -> int:
+    """
+    Write an iCalendar file
+    Args:
+        key: location and thresholds of the plan, for the event UIDs
+    Returns:
+        number of events written
+    """
+    count = 0
+    for line in ics_lines(transitions, key=key):
+        output.write(line + "\r\n")
+        count += line == "BEGIN:VEVENT"
+    return count
+
+
+def write_csv(transitions: Iterable[Transition], output: TextIO) -> int:
+    """
+    Write one row per transition: date, time (empty all day), theme, kind
+    Returns:
+        number of rows written
+    """
+    # Imported here only, so the tray and the agent do not load it
+    import csv
+
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(("date", "time", "theme", "kind"))
+    count = 0
+    for transition in transitions:
+        time = transition.at.strftime("%H:%M") if transition.at else ""
+        writer.writerow(
+            (transition.day.isoformat(), time, transition.theme, transition.kind)
+        )
+        count += 1
+    return count
+
+
+WRITERS = {"ics": write_ics, "csv": write_csv}
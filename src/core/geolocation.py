@@ -0,0 +1,270 @@
+"""Location of the device from a chain of providers queried concurrently"""
+
+import re
+from collections.abc import Callable, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import suppress
+from functools import lru_cache
+from importlib.resources import files
+from pathlib import Path
+from time import monotonic, timezone as local_offset
+from typing import NamedTuple
+from zoneinfo import TZPATH
+
+from src.utils.logger import Logger
+
+
+logger = Logger.get_logger("app")
+
+# Quality of each kind of answer: an explicit user choice beats a fresh network
+# answer, which beats the last saved one, which beats a guess from the timezone
+PINNED = 100
+NETWORK = 60
+CACHED = 40
+ESTIMATE = 10
+
+# Time allowed to each HTTP provider, and to the whole chain
+HTTP_TIMEOUT = 3.0
+LOCATE_TIMEOUT = 5.0
+
+# Latitude assumed when only the UTC offset is known
+ESTIMATE_LATITUDE = 45.0
+
+ZONE_COORDINATES = re.compile(
+    r"([+-])(\d{2})(\d{2})(\d{2})?([+-])(\d{3})(\d{2})(\d{2})?"
+)
+
+
+class Fix(NamedTuple):
+    latitude: float
+    longitude: float
+    timezone: str
+    city: str = ""
+    region: str = ""
+    source: str = ""
+    quality: int = 0
+
+
+class Provider(NamedTuple):
+    """
+    A source of location
+    fetch(timeout) returns a Fix or None, and may raise on failure.
+    """
+
+    name: str
+    quality: int
+    fetch: Callable[[float], Fix | None]
+    timeout: float = HTTP_TIMEOUT
+
+
+def static_provider(fix: Fix) -> Provider:
+    """Known answer: pinned or cached in the configuration"""
+    return Provider(fix.source, fix.quality, lambda timeout: fix, 0.0)
+
+
+# === Offline estimate === #
+@lru_cache(maxsize=1)
+def zone_table() -> dict[str, tuple[float, float]]:
+    """Coordinates of the main city of each IANA zone (zone1970.tab)"""
+    text = None
+    with suppress(ModuleNotFoundError, OSError):
+        text = files("tzdata").joinpath("zoneinfo", "zone1970.tab").read_text("utf-8")
+    for base in TZPATH:
+        if text is not None:
+            break
+        with suppress(OSError):
+            text = (Path(base) / "zone1970.tab").read_text("utf-8")
+
+    table = {}
+    for line in (text or "").splitlines():
+        if line.startswith("#"):
+            continue
+        fields = line.split("\t")
+        if len(fields) >= 3 and (match := ZONE_COORDINATES.fullmatch(fields[1])):
+            sign, dd, mm, ss, lon_sign, ddd, lon_mm, lon_ss = match.groups()
+            latitude = int(dd) + int(mm) / 60 + int(ss or 0) / 3600
+            longitude = int(ddd) + int(lon_mm) / 60 + int(lon_ss or 0) / 3600
+            table[fields[2]] = (
+                -latitude if sign == "-" else latitude,
+                -longitude if lon_sign == "-" else longitude,
+            )
+    return table
+
+
+def estimate_location(timezone: str | None) -> Fix:
+    """
+    Rough location from the timezone alone, without any network
+    The main city of an IANA zone, else the meridian of the UTC offset.
+    """
+    if timezone and (coordinates := zone_table().get(timezone)):
+        city = timezone.rsplit("/", 1)[-1].replace("_", " ")
+        return Fix(*coordinates, timezone, city, "", "estimate", ESTIMATE)
+
+    # time.timezone is the standard offset in seconds west of UTC
+    hours = round(-local_offset / 3600)
+    name = f"Etc/GMT{-hours:+d}" if hours else "Etc/GMT"
+    return Fix(ESTIMATE_LATITUDE, hours * 15.0, name, "", "", "estimate", ESTIMATE)
+
+
+def estimate_provider(timezone: str | None) -> Provider:
+    return Provider("estimate", ESTIMATE, lambda timeout: estimate_location(timezone))
+
+
+# === HTTP providers === #
+def parse_ipinfo(data: dict) -> Fix:
+    latitude, longitude = data["loc"].split(",")
+    return Fix(
+        float(latitude),
+        float(longitude),
+        data["timezone"],
+        data.get("city", ""),
+        data.get("region", ""),
+    )
+
+
+def parse_ipapi(data: dict) -> Fix:
+    return Fix(
+        float(data["latitude"]),
+        float(data["longitude"]),
+        data["timezone"],
+        data.get("city", ""),
+        data.get("region", ""),
+    )
+
+
+def parse_ip_api(data: dict) -> Fix:
+    if data.get("status") != "success":
+        raise ValueError(data.get("message", "lookup failed"))
+    return Fix(
+        float(data["lat"]),
+        float(data["lon"]),
+        data["timezone"],
+        data.get("city", ""),
+        data.get("regionName", ""),
+    )
+
+
+# Known services: name -> (URL, parser of the JSON response)
+HTTP_PROVIDERS: dict[str, tuple[str, Callable[[dict], Fix]]] = {
+    "ipinfo": ("https://ipinfo.io/json", parse_ipinfo),
+    "ipapi": ("https://ipapi.co/json/", parse_ipapi),
+    "ip-api": ("http://ip-api.com/json", parse_ip_api),
+}
+
+
+def http_provider(
+    name: str,
+    url: str,
+    parse: Callable[[dict], Fix],
+    timeout: float = HTTP_TIMEOUT,
+) -> Provider:
+    """IP geolocation service answering a JSON object"""
+
+    def fetch(timeout: float) -> Fix:
+        # Imported here only, so it can be released once started
+        from requests import get
+
+        response = get(url, timeout=timeout)
+        try:
+            response.raise_for_status()
+            data = response.json()
+        finally:
+            response.close()
+        return parse(data)._replace(source=name, quality=NETWORK)
+
+    return Provider(name, NETWORK, fetch, timeout)
+
+
+def named_providers(names: Sequence[str]) -> list[Provider]:
+    """HTTP providers from their names, unknown names are logged and skipped"""
+    providers = []
+    for name in names:
+        if name in HTTP_PROVIDERS:
+            providers.append(http_provider(name, *HTTP_PROVIDERS[name]))
+        else:
+            logger.warning(f"Unknown location provider: {name}")
+    return providers
+
+
+# === Chain === #
+# Lookups still running when locate() returned, having lost the race
+_stragglers: set[Future] = set()
+
+
+def settle(timeout: float = HTTP_TIMEOUT) -> bool:
+    """
+    Wait for the lookups that lost the race (each bounded by its timeout)
+    Returns:
+        False if some are still running, and still use the HTTP modules
+    """
+    _, running = wait(_stragglers, timeout)
+    _stragglers.intersection_update(running)
+    return not running
+
+
+def locate(
+    providers: Sequence[Provider], deadline: float = LOCATE_TIMEOUT
+) -> Fix | None:
+    """
+    Best answer of the providers, queried concurrently
+    Returns as soon as no pending provider can give a better answer, or at the
+    deadline with the best answer so far. A provider that fails, answers None
+    or exceeds its own timeout is ignored.
+    """
+    if not providers:
+        return None
+
+    start = monotonic()
+    executor = ThreadPoolExecutor(len(providers), thread_name_prefix="geolocate")
+    futures: dict[Future, Provider] = {
+        executor.submit(provider.fetch, provider.timeout): provider
+        for provider in providers
+    }
+    pending = set(futures)
+    best: Fix | None = None
+
+    try:
+        while pending:
+            now = monotonic()
+            if now >= start + deadline:
+                break
+            # Providers past their own timeout are no longer waited for
+            pending = {
+                f
+                for f in pending
+                if f.done()
+                or not futures[f].timeout
+                or now < start + futures[f].timeout
+            }
+            if not pending:
+                break
+            if best and best.quality >= max(futures[f].quality for f in pending):
+                break
+
+            limits = [start + deadline]
+            limits += [
+                start + futures[f].timeout
+                for f in pending
+                if futures[f].timeout and not f.done()
+            ]
+            remaining = min(limits) - now
+
+            done, pending = wait(
+                pending, timeout=remaining, return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                provider = futures[future]
+                try:
+                    fix = future.result()
+                except Exception as e:
+                    logger.warning(f"Location provider {provider.name} failed: {e}")
+                    continue
+                if fix is not None and (best is None or fix.quality > best.quality):
+                    best = fix._replace(source=fix.source or provider.name)
+    finally:
+        _stragglers.update(f for f in futures if not f.done())
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if best is not None:
+        logger.info(f"Location from {best.source} ({monotonic() - start:.2f}s)")
+    return best
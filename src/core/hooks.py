@@ -0,0 +1,248 @@
+"""Actions run after each theme switch, configured in settings.ini"""
+
+import os
+import shlex
+import subprocess
+import threading
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from configparser import ConfigParser
+from importlib import import_module
+from time import monotonic
+from typing import Any, NamedTuple
+
+from src.utils.logger import Logger, log_event
+
+
+logger = Logger.get_logger("app")
+
+# Hooks running at the same time, and the default time allowed to each
+WORKERS = 2
+TIMEOUT = 30.0
+
+# A hook is configured in a [hook:<name>] section
+SECTION_PREFIX = "hook:"
+
+OK = "ok"
+FAILED = "failed"
+TIMED_OUT = "timeout"
+
+
+class Hook(NamedTuple):
+    """
+    A command line or a Python entry point ('package.module:function')
+    Commands get the theme in {theme} and in the AUTOSWITCHTHEME_THEME and
+    AUTOSWITCHTHEME_SOURCE variables; functions are called with
+    (theme, source).
+    """
+
+    name: str
+    command: str = ""
+    entry_point: str = ""
+    timeout: float = TIMEOUT
+    # Themes that trigger the hook, all if empty
+    themes: tuple[str, ...] = ()
+
+
+def load_hooks(config: ConfigParser) -> list[Hook]:
+    """Hooks of the [hook:<name>] sections, invalid ones are logged and skipped"""
+    timeout = config.getfloat("hooks", "timeout", fallback=TIMEOUT)
+    hooks = []
+    for section in config.sections():
+        if not section.startswith(SECTION_PREFIX):
+            continue
+        name = section[len(SECTION_PREFIX) :]
+        command = config.get(section, "command", fallback="").strip()
+        entry_point = config.get(section, "entry_point", fallback="").strip()
+        if bool(command) == bool(entry_point):
+            logger.error(f"Hook {name} needs either a command or an entry_point")
+            continue
+        if entry_point and ":" not in entry_point:
+            logger.error(f"Hook {name}: entry_point must be 'module:function'")
+            continue
+        themes = config.get(section, "themes", fallback="")
+        hooks.append(
+            Hook(
+                name,
+                command,
+                entry_point,
+                config.getfloat(section, "timeout", fallback=timeout),
+                tuple(t.strip() for t in themes.split(",") if t.strip()),
+            )
+        )
+    return hooks
+
+
+def resolve(entry_point: str) -> Callable[[str, str], object]:
+    """Function of a 'package.module:function' entry point"""
+    module, _, attributes = entry_point.partition(":")
+    target: Any = import_module(module.strip())
+    for attribute in attributes.strip().split("."):
+        target = getattr(target, attribute)
+    return target
+
+
+def run_command(hook: Hook, theme: str, source: str):
+    """
+    Run the command of a hook, killed past its timeout
+    Raises:
+        subprocess.TimeoutExpired, subprocess.CalledProcessError, OSError
+    """
+    command = hook.command.replace("{theme}", theme)
+    env = {
+        **os.environ,
+        "AUTOSWITCHTHEME_THEME": theme,
+        "AUTOSWITCHTHEME_SOURCE": source,
+    }
+    # Windows parses the command line itself
+    subprocess.run(
+        command if os.name == "nt" else shlex.split(command),
+        env=env,
+        timeout=hook.timeout,
+        check=True,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+    )
+
+
+def run_entry_point(hook: Hook, theme: str, source: str):
+    """
+    Call the function of a hook on its own thread
+    A function cannot be interrupted: past the timeout it is left running in
+    the background and its worker is released.
+    Raises:
+        TimeoutError: past the timeout of the hook
+    """
+    errors: list[BaseException] = []
+
+    def call():
+        try:
+            resolve(hook.entry_point)(theme, source)
+        except BaseException as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=call, name=f"hook-{hook.name}", daemon=True)
+    thread.start()
+    thread.join(hook.timeout)
+    if thread.is_alive():
+        raise TimeoutError(f"still running after {hook.timeout:g}s")
+    if errors:
+        raise errors[0]
+
+
+class HookMetrics:
+    """Runs and durations of a hook"""
+
+    __slots__ = ("failures", "last", "max", "runs", "skipped", "timeouts", "total")
+
+    def __init__(self):
+        self.runs = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.skipped = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last: float | None = None
+
+    def add(self, duration: float, outcome: str):
+        self.runs += 1
+        self.failures += outcome == FAILED
+        self.timeouts += outcome == TIMED_OUT
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.last = duration
+
+    def summary(self) -> dict:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "skipped": self.skipped,
+            "mean": round(self.total / self.runs, 3) if self.runs else None,
+            "max": round(self.max, 3) if self.runs else None,
+            "last": round(self.last, 3) if self.last is not None else None,
+        }
+
+
+class HookRunner:
+    """
+    Run the hooks of each switch on a bounded pool of workers
+
+    run() only queues the hooks, so the switch and the scheduler never wait
+    for them. A hook still queued or running when the next switch comes is
+    skipped for that switch, so a slow hook never piles up.
+    """
+
+    def __init__(self, hooks: Sequence[Hook], workers: int = WORKERS):
+        self.hooks = list(hooks)
+        self.metrics = {hook.name: HookMetrics() for hook in self.hooks}
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max(workers, 1), thread_name_prefix="hook")
+
+    def run(self, theme: str, source: str = "auto"):
+        """Queue the hooks triggered by a switch to theme"""
+        for hook in self.hooks:
+            if hook.themes and theme not in hook.themes:
+                continue
+            with self._lock:
+                if hook.name in self._pending:
+                    self.metrics[hook.name].skipped += 1
+                    logger.warning(f"Hook {hook.name} still running, skipped")
+                    continue
+                self._pending.add(hook.name)
+            try:
+                self._executor.submit(self._run, hook, theme, source)
+            except RuntimeError:
+                # Shut down
+                with self._lock:
+                    self._pending.discard(hook.name)
+
+    def _run(self, hook: Hook, theme: str, source: str):
+        start = monotonic()
+        outcome = OK
+        try:
+            if hook.command:
+                run_command(hook, theme, source)
+            else:
+                run_entry_point(hook, theme, source)
+        except (subprocess.TimeoutExpired, TimeoutError):
+            outcome = TIMED_OUT
+            logger.error(f"Hook {hook.name} timed out after {hook.timeout:g}s")
+        except subprocess.CalledProcessError as e:
+            outcome = FAILED
+            stderr = (e.stderr or b"").decode(errors="replace").strip()
+            logger.error(f"Hook {hook.name} exited with {e.returncode}: {stderr}")
+        except Exception as e:
+            outcome = FAILED
+            logger.error(f"Hook {hook.name} failed: {e}")
+        finally:
+            duration = monotonic() - start
+            with self._lock:
+                self._pending.discard(hook.name)
+                self.metrics[hook.name].add(duration, outcome)
+
+        logger.debug(f"Hook {hook.name} {outcome} in {duration:.3f}s")
+        log_event(
+            "hook",
+            name=hook.name,
+            theme=theme,
+            source=source,
+            outcome=outcome,
+            duration=round(duration, 3),
+        )
+
+    def status(self) -> dict:
+        """Metrics of each hook"""
+        with self._lock:
+            return {name: m.summary() for name, m in self.metrics.items()}
+
+    def shutdown(self, wait: bool = False):
+        """
+        Stop accepting hooks
+        Args:
+            wait: run the queued hooks and wait for them, else drop them
+        """
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
@@ -0,0 +1,156 @@
+import os
+import struct
+import sys
+from contextlib import suppress
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageOps
+from PIL.IcoImagePlugin import IcoImageFile
+
+from src.utils.logger import Logger
+
+
+logger = Logger.get_logger("app")
+
+# Fallback edge of the tray icon, when the system metrics are unavailable
+ICON_SIZE = 32
+
+# Win32 GetSystemMetrics index of the small icon width (notification area)
+SM_CXSMICON = 49
+
+# Variants rendered once, in the order they are persisted
+VARIANTS = ("light", "dark", "override")
+
+# Colour of the badge marking a manual override
+BADGE_COLOR = (255, 140, 0, 255)
+
+# Magic, source mtime (ns), source size, icon edge
+HEADER = struct.Struct("<4sqqH")
+MAGIC = b"ASTI"
+
+
+def tray_icon_size() -> int:
+    """Edge in pixels of the icons drawn in the notification area"""
+    if sys.platform == "win32":
+        from ctypes import windll
+
+        with suppress(OSError):
+            if size := windll.user32.GetSystemMetrics(SM_CXSMICON):
+                return size
+    return ICON_SIZE
+
+
+def decode(source: Path, size: int) -> Image.Image:
+    """
+    Decode a single resolution of the source icon, as RGBA
+    Only the closest entry of a multi-resolution .ico is read.
+    """
+    image = Image.open(source)
+    if isinstance(image, IcoImageFile):
+        sizes = image.info["sizes"]
+        larger = [s for s in sizes if s[0] >= size]
+        image.size = min(larger) if larger else max(sizes)
+    image = image.convert("RGBA")
+    if image.size != (size, size):
+        image = image.resize((size, size), Image.Resampling.LANCZOS)
+    return image
+
+
+def render(base: Image.Image, variant: str) -> Image.Image:
+    """Variant of the base icon: as is, inverted for dark, or badged for override"""
+    if variant == "dark":
+        *rgb, alpha = base.split()
+        image = ImageOps.invert(Image.merge("RGB", rgb))
+        image.putalpha(alpha)
+        return image
+
+    image = base.copy()
+    if variant == "override":
+        edge = base.width
+        badge = max(edge * 3 // 8, 4)
+        ImageDraw.Draw(image).ellipse(
+            (edge - badge, edge - badge, edge - 1, edge - 1), fill=BADGE_COLOR
+        )
+    return image
+
+
+class IconCache:
+    """
+    Tray icons rendered once per source and size
+
+    The source is decoded lazily, at its closest resolution only, and every
+    variant is rendered at once. The raw RGBA pixels are persisted next to the
+    data, keyed by the source mtime and size, so later starts skip decoding.
+    """
+
+    __slots__ = ("_images", "cache_path", "size", "source")
+
+    def __init__(self, source: Path, cache_dir: Path, size: int | None = None):
+        self.source = source
+        self.size = size or tray_icon_size()
+        self.cache_path = cache_dir / f"icons-{self.size}.bin"
+        self._images: dict[str, Image.Image] = {}
+
+    def get(self, variant: str = "light") -> Image.Image | None:
+        """
+        Rendered variant, decoding the source on first use
+        Returns:
+            None if the source icon is missing or unreadable
+        """
+        if not self._images:
+            self._images = self._load()
+        return self._images.get(variant)
+
+    def _load(self) -> dict[str, Image.Image]:
+        try:
+            stat = self.source.stat()
+        except OSError:
+            logger.error(f"Icon not found (Path:{self.source})")
+            return {}
+
+        key = (MAGIC, stat.st_mtime_ns, stat.st_size, self.size)
+        if images := self._read(key):
+            return images
+
+        try:
+            base = decode(self.source, self.size)
+        except OSError as e:
+            logger.error(f"Error decoding icon: {e}")
+            return {}
+
+        images = {variant: render(base, variant) for variant in VARIANTS}
+        try:
+            self._write(key, images)
+        except OSError as e:
+            logger.error(f"Error writing icon cache: {e}")
+        return images
+
+    def _read(self, key: tuple) -> dict[str, Image.Image]:
+        length = self.size * self.size * 4
+        try:
+            data = self.cache_path.read_bytes()
+        except OSError:
+            return {}
+        if (
+            len(data) != HEADER.size + length * len(VARIANTS)
+            or HEADER.unpack_from(data) != key
+        ):
+            return {}
+
+        images = {}
+        for index, variant in enumerate(VARIANTS):
+            offset = HEADER.size + index * length
+            images[variant] = Image.frombytes(
+                "RGBA", (self.size, self.size), data[offset : offset + length]
+            )
+        return images
+
+    def _write(self, key: tuple, images: dict[str, Image.Image]):
+        tmp_path = self.cache_path.with_name(
+            f"{self.cache_path.name}.{os.getpid()}.tmp"
+        )
+        with tmp_path.open("wb") as f:
+            f.write(HEADER.pack(*key))
+            for variant in VARIANTS:
+                f.write(images[variant].tobytes())
+        os.replace(tmp_path, self.cache_path)
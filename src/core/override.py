@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+from math import ceil
+
+from src.core.timeline import next_midnight, next_transition
+from src.utils.logger import Logger
+from src.utils.state import StateStore
+
+
+logger = Logger.get_logger("app")
+
+MODES = ("next", "duration", "tomorrow")
+
+
+def override_deadline(
+    mode: str, now: datetime, sun_hours: dict, minutes: int | None = None
+) -> datetime:
+    """
+    Instant at which a manual override ends
+    Args:
+        mode: 'next' (next transition), 'duration' (minutes) or 'tomorrow'
+        now: aware datetime in the location timezone
+    """
+    if mode == "duration":
+        if not minutes or minutes <= 0:
+            raise ValueError("Duration override needs a positive number of minutes")
+        return now + timedelta(minutes=minutes)
+
+    if mode == "next" and (transition := next_transition(sun_hours, now)):
+        return transition[0]
+
+    if mode in MODES:
+        return next_midnight(now)
+
+    raise ValueError(f"Override mode must be one of {MODES}")
+
+
+class Override:
+    """Manual theme override with an expiry, optionally persisted"""
+
+    __slots__ = ("mode", "store", "theme", "until")
+
+    def __init__(self, store: StateStore | None = None):
+        self.store = store
+        self.theme: str | None = None
+        self.mode: str | None = None
+        self.until: datetime | None = None
+        self.load()
+
+    def load(self):
+        data = self.store.get("override") if self.store else None
+        if data:
+            self.theme = data["theme"]
+            self.mode = data["mode"]
+            self.until = datetime.fromisoformat(data["until"])
+
+    def save(self):
+        """Persist the override; on a write error it is kept in memory only"""
+        if self.store is None:
+            return
+
+        try:
+            if self.theme is None or self.until is None:
+                self.store.set("override", None)
+            else:
+                self.store.set(
+                    "override",
+                    {
+                        "theme": self.theme,
+                        "mode": self.mode,
+                        "until": self.until.isoformat(),
+                    },
+                )
+        except OSError as e:
+            logger.error(f"Error saving override: {e}")
+
+    def activate(self, theme: str, mode: str, until: datetime):
+        self.theme = theme
+        self.mode = mode
+        self.until = until
+        self.save()
+
+    def clear(self):
+        self.theme = None
+        self.mode = None
+        self.until = None
+        self.save()
+
+    def is_active(self, now: datetime | None = None) -> bool:
+        if self.until is None:
+            return False
+        return (now or datetime.now(self.until.tzinfo)) < self.until
+
+    def remaining(self, now: datetime | None = None) -> timedelta | None:
+        if not self.is_active(now) or self.until is None:
+            return None
+        return self.until - (now or datetime.now(self.until.tzinfo))
+
+    def describe(self, now: datetime | None = None) -> str:
+        """Human readable summary, e.g. 'Dark for 1h 05m'"""
+        remaining = self.remaining(now)
+        if remaining is None or self.theme is None:
+            return "No override"
+
+        minutes = ceil(remaining.total_seconds() / 60)
+        return f"{self.theme.capitalize()} for {minutes // 60}h {minutes % 60:02d}m"
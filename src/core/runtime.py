@@ -0,0 +1,147 @@
+"""Optional asyncio runtime hosting the scheduler and the tray actions"""
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from functools import partial
+from time import time
+from typing import Any
+
+from src.core.scheduler import Scheduler, scheduler
+from src.utils.logger import Logger
+
+
+logger = Logger.get_logger("app")
+
+# Longest sleep of the loop: below the scheduler jump threshold, so a
+# suspend/resume or a clock change is still caught without any job due
+TICK = 30.0
+
+# Threads running the blocking work: the scheduled jobs, the posted actions
+WORKERS = 2
+
+
+class AsyncRuntime:
+    """
+    Event loop replacing the one-second polling of the scheduler
+
+    The loop sleeps until the next job (loop.call_at), TICK at most, and is
+    woken when an earlier job is scheduled from any thread. Jobs, posted
+    actions and other blocking calls (network, files, registry) run on a
+    small executor, so the loop itself never blocks and a new task does not
+    need a new thread. Tray callbacks are posted from the tray thread and run
+    one at a time, in order.
+    """
+
+    def __init__(
+        self,
+        jobs: Scheduler = scheduler,
+        workers: int = WORKERS,
+        tick: float = TICK,
+    ):
+        self.scheduler = jobs
+        self.tick = tick
+        # Called after each wake-up, from the executor (e.g. tray menu texts)
+        self.on_tick: Callable[[], object] | None = None
+        self.loop = asyncio.new_event_loop()
+        self._executor = ThreadPoolExecutor(
+            max(workers, 1), thread_name_prefix="runtime"
+        )
+        self._actions = asyncio.Lock()
+        self._timer: asyncio.TimerHandle | None = None
+        self._busy = False
+
+    def run(self):
+        """Serve on the calling thread until stop()"""
+        asyncio.set_event_loop(self.loop)
+        self.scheduler.on_schedule = self.wake
+        self.loop.call_soon(self._arm)
+        logger.debug("Asyncio runtime started")
+        try:
+            self.loop.run_forever()
+        finally:
+            self.scheduler.on_schedule = None
+            if self._timer is not None:
+                self._timer.cancel()
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self.loop.close()
+            logger.debug("Asyncio runtime stopped")
+
+    def stop(self):
+        """Stop the loop (thread-safe)"""
+        with suppress(RuntimeError):
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def wake(self):
+        """Re-arm the timer for the earliest job (thread-safe)"""
+        with suppress(RuntimeError):
+            self.loop.call_soon_threadsafe(self._arm)
+
+    def post(self, func: Callable[..., Any], *args):
+        """
+        Run func(*args) on the executor, after the actions posted before it
+        Safe to call from any thread; errors are logged.
+        """
+        try:
+            self.loop.call_soon_threadsafe(self._start_action, func, args)
+        except RuntimeError:
+            logger.warning("Runtime stopped, posted action dropped")
+
+    async def offload(
+        self, func: Callable[..., Any], *args, timeout: float | None = None
+    ) -> Any:
+        """
+        Await a blocking call run on the executor
+        Raises:
+            TimeoutError: after timeout seconds (the call itself keeps running)
+        """
+        future = self.loop.run_in_executor(self._executor, partial(func, *args))
+        return await asyncio.wait_for(future, timeout)
+
+    def _start_action(self, func: Callable[..., Any], args: tuple):
+        self.loop.create_task(self._run_action(func, args))
+
+    async def _run_action(self, func: Callable[..., Any], args: tuple):
+        async with self._actions:
+            try:
+                await self.offload(func, *args)
+            except Exception as e:
+                logger.error(f"Error running posted action: {e}")
+
+    def _arm(self):
+        if self._busy:
+            # Re-armed once the running jobs are done
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+
+        delay = self.tick
+        if (next_run := self.scheduler.next_run()) is not None:
+            delay = min(delay, max(next_run.timestamp() - time(), 0.0))
+        self._timer = self.loop.call_at(self.loop.time() + delay, self._wake_up)
+
+    def _wake_up(self):
+        self._timer = None
+        self._busy = True
+        future = self.loop.run_in_executor(self._executor, self._run_jobs)
+        future.add_done_callback(self._jobs_done)
+
+    def _run_jobs(self):
+        self.scheduler.run_pending()
+        if self.on_tick is not None:
+            try:
+                self.on_tick()
+            except Exception as e:
+                logger.error(f"Error refreshing after a tick: {e}")
+
+    def _jobs_done(self, future: asyncio.Future):
+        self._busy = False
+        if not future.cancelled() and (error := future.exception()) is not None:
+            logger.error(f"Error running scheduled jobs: {error}")
+        if not self.loop.is_closed():
+            self._arm()
@@ -0,0 +1,137 @@
+import heapq
+import threading
+from collections.abc import Callable
+from datetime import datetime
+from itertools import count
+from time import monotonic, time
+
+from src.utils.logger import Logger
+
+
+logger = Logger.get_logger("app")
+
+
+class Job:
+    """One-shot job due at an absolute instant"""
+
+    __slots__ = ("at", "cancelled", "func", "tag")
+
+    def __init__(self, at: datetime, func: Callable[[], object], tag: str | None):
+        self.at = at
+        self.func = func
+        self.tag = tag
+        self.cancelled = False
+
+    def __repr__(self) -> str:
+        return f"Job(at={self.at.isoformat()}, tag={self.tag!r})"
+
+
+class Scheduler:
+    """
+    Deadline scheduler: each job is a single entry fired once at its instant
+
+    Every tick also compares the wall clock with the monotonic clock. A gap
+    between two ticks larger than jump_threshold means the machine was
+    suspended or the clock was changed, and on_clock_jump is called with the
+    wall clock shift (in seconds) before any overdue job runs.
+    """
+
+    def __init__(self, jump_threshold: float = 60.0):
+        self._queue: list[tuple[float, int, Job]] = []
+        self._counter = count()
+        self._lock = threading.Lock()
+        self.jump_threshold = jump_threshold
+        self.on_clock_jump: Callable[[float], object] | None = None
+        # Called when a job becomes the earliest one (e.g. to re-arm a timer)
+        self.on_schedule: Callable[[], object] | None = None
+        self._last_tick: tuple[float, float] | None = None
+
+    def at(
+        self, instant: datetime, func: Callable[[], object], tag: str | None = None
+    ) -> Job:
+        """
+        Schedule func at instant
+        Args:
+            instant: aware datetime, or naive datetime in host local time
+        """
+        job = Job(instant, func, tag)
+        with self._lock:
+            heapq.heappush(self._queue, (instant.timestamp(), next(self._counter), job))
+            earliest = self._queue[0][2] is job
+        if earliest and self.on_schedule is not None:
+            self.on_schedule()
+        return job
+
+    def clear(self, tag: str | None = None):
+        """Cancel every job, or only those with the given tag"""
+        with self._lock:
+            for _, _, job in self._queue:
+                if tag is None or job.tag == tag:
+                    job.cancelled = True
+            self._queue = [entry for entry in self._queue if not entry[2].cancelled]
+            heapq.heapify(self._queue)
+
+    def get_jobs(self, tag: str | None = None) -> list[Job]:
+        with self._lock:
+            return [
+                job
+                for _, _, job in sorted(self._queue)
+                if not job.cancelled and (tag is None or job.tag == tag)
+            ]
+
+    def next_run(self) -> datetime | None:
+        jobs = self.get_jobs()
+        return jobs[0].at if jobs else None
+
+    def detect_clock_jump(self, now: float, mono: float) -> float | None:
+        """
+        Compare this tick with the previous one
+        Returns:
+            The wall clock shift in seconds if a suspend or clock jump happened
+        """
+        last_tick, self._last_tick = self._last_tick, (now, mono)
+        if last_tick is None:
+            return None
+
+        wall_elapsed = now - last_tick[0]
+        mono_elapsed = mono - last_tick[1]
+        # The monotonic clock may or may not count suspended time depending on
+        # the platform, so a long silence between ticks is a resume as well
+        if (
+            abs(wall_elapsed - mono_elapsed) <= self.jump_threshold
+            and wall_elapsed <= self.jump_threshold
+        ):
+            return None
+        return wall_elapsed
+
+    def run_pending(self, now: float | None = None, mono: float | None = None):
+        """Run every job whose instant has passed"""
+        now = time() if now is None else now
+        mono = monotonic() if mono is None else mono
+
+        shift = self.detect_clock_jump(now, mono)
+        if shift is not None:
+            logger.info(f"Clock jump detected ({shift:+.0f}s), catching up")
+            if self.on_clock_jump is not None:
+                try:
+                    self.on_clock_jump(shift)
+                except Exception as e:
+                    logger.error(f"Error catching up after clock jump: {e}")
+
+        while True:
+            with self._lock:
+                if not self._queue or self._queue[0][0] > now:
+                    return
+                _, _, job = heapq.heappop(self._queue)
+
+            if job.cancelled:
+                continue
+
+            try:
+                job.func()
+            except Exception as e:
+                logger.error(f"Error running scheduled job {job}: {e}")
+
+
+# Default scheduler shared by the application
+scheduler = Scheduler()
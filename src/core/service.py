@@ -0,0 +1,69 @@
+from datetime import datetime
+
+from astral import LocationInfo
+
+from src.core.ephemeris import SUNRISE_ELEVATION
+from src.core.switch import Switch
+from src.utils.ipc import PublishServer, get_address
+from src.utils.logger import Logger, log_event
+
+
+logger = Logger.get_logger("app")
+
+SERVICE_CHANNEL = "service"
+
+
+def service_address() -> tuple[str, str]:
+    """Machine-wide channel of the service, shared by every session"""
+    return get_address(SERVICE_CHANNEL, shared=True)
+
+
+class ServiceSwitch(Switch):
+    """
+    Location, ephemeris and scheduling owned once for the whole machine
+
+    Instead of writing the registry, each theme change is published to the
+    session agents, which apply it for their own user.
+    """
+
+    def __init__(
+        self,
+        city: LocationInfo,
+        light_elevation: float = SUNRISE_ELEVATION,
+        dark_elevation: float = SUNRISE_ELEVATION,
+    ):
+        super().__init__(city, None, light_elevation, dark_elevation)
+        self.server = PublishServer(self.handle, self.event, service_address())
+
+    def event(self) -> dict:
+        """Current state, as pushed to the agents"""
+        return {
+            "event": "theme",
+            "theme": self.theme,
+            "sun_hours": dict(self.sun_hours),
+            "day_kind": self.day_kind,
+        }
+
+    def handle(self, request: dict) -> dict:
+        if request.get("cmd") == "status":
+            return {"ok": True, **self.event(), "agents": len(self.server.subscribers)}
+        return {"ok": False, "error": f"Unknown command: {request.get('cmd')}"}
+
+    def switch_to_theme(
+        self, theme: str, source: str = "auto", scheduled: datetime | None = None
+    ):
+        if theme == self.theme:
+            return
+        self.theme = theme
+        logger.info(f"Publishing {theme} theme to the sessions")
+        self.server.publish(self.event())
+        log_event("publish", theme=theme, source=source, scheduled=scheduled)
+
+    def apply_weather(self, theme: str, at: datetime):
+        super().apply_weather(theme, at)
+        self.server.publish(self.event())
+
+    def update_sun_hours(self):
+        super().update_sun_hours()
+        # Agents keep the sun hours for status, next switch and overrides
+        self.server.publish(self.event())
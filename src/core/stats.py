@@ -0,0 +1,144 @@
+import gzip
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from json import loads as json_loads
+from pathlib import Path
+
+from src.utils.logger import rotated_files
+
+
+# Upper bounds (seconds) of the switch latency histogram, the last bucket is open
+LATENCY_BUCKETS = (1, 5, 30, 60, 300)
+
+
+def log_files(path: Path) -> list[Path]:
+    """Rotated event logs then the current one, in chronological order"""
+    return [*rotated_files(path), *([path] if path.exists() else [])]
+
+
+def read_events(paths: Iterable[Path]) -> Iterator[dict]:
+    """
+    Events of JSONL files (plain or gzipped), one at a time
+    Malformed lines (e.g. cut by a crash) are skipped.
+    """
+    for path in paths:
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json_loads(line)
+                except ValueError:
+                    continue
+                if isinstance(event, dict) and "event" in event:
+                    yield event
+
+
+class SwitchStats:
+    """Counters over a stream of events, in constant memory"""
+
+    def __init__(self):
+        self.events = 0
+        self.first: str | None = None
+        self.last: str | None = None
+        self.switches: Counter[str] = Counter()
+        self.sources: Counter[str] = Counter()
+        self.overrides: Counter[str] = Counter()
+        self.skipped = 0
+        self.resumed = 0
+        self.latency_count = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def add(self, event: dict):
+        self.events += 1
+        self.first = self.first or event.get("ts")
+        self.last = event.get("ts", self.last)
+
+        kind = event["event"]
+        if kind == "switch":
+            self.switches[event.get("theme") or "unknown"] += 1
+            self.sources[event.get("source") or "unknown"] += 1
+            if event.get("scheduled") and event.get("actual"):
+                self.add_latency(event["scheduled"], event["actual"])
+        elif kind == "override":
+            self.overrides[event.get("mode") or "unknown"] += 1
+        elif kind == "skip":
+            self.skipped += 1
+        elif kind == "resume":
+            self.resumed += 1
+
+    def add_latency(self, scheduled: str, actual: str):
+        try:
+            delay = (
+                datetime.fromisoformat(actual) - datetime.fromisoformat(scheduled)
+            ).total_seconds()
+        except (TypeError, ValueError):
+            return
+        delay = max(delay, 0.0)
+        self.latency_count += 1
+        self.latency_total += delay
+        self.latency_max = max(self.latency_max, delay)
+        index = next(
+            (k for k, bound in enumerate(LATENCY_BUCKETS) if delay <= bound),
+            len(LATENCY_BUCKETS),
+        )
+        self.latency_buckets[index] += 1
+
+    def summary(self) -> dict:
+        labels = [f"<={bound}s" for bound in LATENCY_BUCKETS]
+        labels.append(f">{LATENCY_BUCKETS[-1]}s")
+        return {
+            "events": self.events,
+            "first": self.first,
+            "last": self.last,
+            "switches": dict(self.switches),
+            "sources": dict(self.sources),
+            "overrides": dict(self.overrides),
+            "skipped": self.skipped,
+            "resumed": self.resumed,
+            "latency": {
+                "count": self.latency_count,
+                "mean": (
+                    round(self.latency_total / self.latency_count, 3)
+                    if self.latency_count
+                    else None
+                ),
+                "max": round(self.latency_max, 3) if self.latency_count else None,
+                "histogram": dict(zip(labels, self.latency_buckets, strict=True)),
+            },
+        }
+
+
+def summarize(events: Iterable[dict]) -> dict:
+    """Switch counts, override frequency and latency of an event stream"""
+    stats = SwitchStats()
+    for event in events:
+        stats.add(event)
+    return stats.summary()
+
+
+def format_summary(summary: dict) -> str:
+    def counts(values: dict) -> str:
+        return ", ".join(f"{k}: {v}" for k, v in sorted(values.items())) or "none"
+
+    latency = summary["latency"]
+    lines = [
+        f"Events: {summary['events']} ({summary['first']} to {summary['last']})",
+        f"Switches: {sum(summary['switches'].values())} "
+        f"({counts(summary['switches'])})",
+        f"Sources: {counts(summary['sources'])}",
+        f"Overrides: {sum(summary['overrides'].values())} "
+        f"({counts(summary['overrides'])}), "
+        f"{summary['skipped']} switches skipped, {summary['resumed']} resumed",
+    ]
+    if latency["count"]:
+        lines.append(
+            f"Latency: mean {latency['mean']}s, max {latency['max']}s "
+            f"over {latency['count']} scheduled switches"
+        )
+        lines.extend(
+            f"  {label:>7} {count}" for label, count in latency["histogram"].items()
+        )
+    return "\n".join(lines)
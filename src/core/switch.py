@@ -1,82 +1,237 @@
+from collections.abc import Callable, Iterator
 from ctypes import windll
-from datetime import datetime
-from json import dump as json_dump, load as json_load
+from datetime import date, datetime, time, timedelta
+from functools import partial
+from itertools import chain
+from typing import TYPE_CHECKING
 from winreg import HKEY_CURRENT_USER, KEY_SET_VALUE, REG_DWORD, OpenKey, SetValueEx
 
-import schedule
 from astral import LocationInfo
-from astral.sun import sun
 
-from src.utils.logger import Logger
+from src.core.actor import ThemeActor, serialized
+from src.core.cache import EphemerisCache, location_key
+from src.core.ephemeris import (
+    SUNRISE_ELEVATION,
+    DayEphemeris,
+    day_ephemeris,
+    range_ephemeris,
+)
+from src.core.export import EXPORT_DAYS, Transition, day_transitions
+from src.core.hooks import HookRunner
+from src.core.override import Override, override_deadline
+from src.core.scheduler import scheduler
+from src.core.timeline import NORMAL, next_midnight, theme_at, transitions
+from src.core.wallpaper import WallpaperStage
+from src.core.window import EphemerisWindow
+from src.utils.logger import Logger, log_event
 from src.utils.path import Paths
+from src.utils.state import StateStore
 
 
+if TYPE_CHECKING:
+    # Set by the application only, the session agents never load it
+    from src.core.weather import WeatherShift
+
 logger = Logger.get_logger("app")
 
 
 class Switch:
-    def __init__(self, city: LocationInfo):
+    def __init__(
+        self,
+        city: LocationInfo,
+        state: StateStore | None = None,
+        light_elevation: float = SUNRISE_ELEVATION,
+        dark_elevation: float = SUNRISE_ELEVATION,
+    ):
         self.city = city
+        self.light_elevation = light_elevation
+        self.dark_elevation = dark_elevation
         self.sun_hours = {
             "timestamp": None,
             "sunrise": None,
             "sunset": None,
         }
+        self.day_kind = NORMAL
         self.theme = None
-        self.sunrise_job = None
-        self.sunset_job = None
+        self.override = Override(state)
+        # Called after the theme or the override changes (e.g. tray icon)
+        self.on_change: Callable[[], None] | None = None
+        # User actions run in the background after each switch
+        self.hooks: HookRunner | None = None
+        # Wallpaper of each theme, prefetched before the transitions
+        self.wallpaper: WallpaperStage | None = None
+        # Shift of the switches by the cloud cover forecast
+        self.weather: WeatherShift | None = None
+        # Thread running every change of the theme state, one at a time
+        self.actor: ThemeActor | None = None
+        self.window = EphemerisWindow(
+            city.latitude,
+            city.longitude,
+            city.timezone,
+            light_elevation,
+            dark_elevation,
+            fetch=self.fetch_days,
+        )
+
+    @property
+    def tz(self):
+        """Timezone of the location, in which sun hours are expressed"""
+        return self.city.tzinfo
+
+    def now(self) -> datetime:
+        """Current instant in the location timezone"""
+        return datetime.now(self.tz)
 
+    @serialized("sun_hours")
     def update_sun_hours(self):
-        """Update sun hours"""
-        if schedule.get_jobs("switch-task"):
-            schedule.clear("switch-task")
+        """Update sun hours, then schedule today's switches and the next refresh"""
+        scheduler.clear("refresh-task")
+        scheduler.clear("weather-task")
 
         self.get_sun_hours()
 
-        if self.sun_hours["sunrise"] and self.sun_hours["sunset"]:
-            schedule.every().day.at(self.sun_hours["sunrise"]).do(
-                self.switch_to_light_theme
-            ).tag("switch-task")
-            schedule.every().day.at(self.sun_hours["sunset"]).do(
-                self.switch_to_dark_theme
-            ).tag("switch-task")
+        now = self.now()
+        if self.day_kind != NORMAL:
+            # Polar day or night: a single theme for the whole day, no switch
+            logger.info(f"No sun crossing today ({self.day_kind})")
+            self.on_transition(theme_at(self.sun_hours, now.time(), self.day_kind))
 
-    def get_sun_hours(self):
+        self.schedule_switches(now)
+
+        # Each switch may move with the cloud cover forecast around it
+        if self.weather is not None:
+            for at, theme in self.upcoming_today(now):
+                decide_at = at - self.weather.lead
+                if decide_at <= now:
+                    self.apply_weather(theme, at)
+                else:
+                    scheduler.at(
+                        decide_at,
+                        partial(self.apply_weather, theme, at),
+                        tag="weather-task",
+                    )
 
-        # Check if sun hours are cached
-        cache_path = Paths.get_data_dir() / "ephemeris.json"
-        if cache_path.exists():
-            with cache_path.open("r") as f:
-                file_data = json_load(f)
-                if file_data["timestamp"] == datetime.today().strftime("%Y-%m-%d"):
-                    logger.info("Sun hours fetched from cache")
-                    self.sun_hours["timestamp"] = file_data["timestamp"]
-                    self.sun_hours["sunrise"] = file_data["sunrise"][:5]
-                    self.sun_hours["sunset"] = file_data["sunset"][:5]
-
-                    logger.info(f"Sun hours: {self.sun_hours}")
-                    return self.sun_hours
-
-        # Calcul ephemeris
-        ephemeris = sun(
-            self.city.observer, date=datetime.now(), tzinfo=self.city.timezone
+        scheduler.at(
+            next_midnight(now, time(0, 1)), self.update_sun_hours, tag="refresh-task"
         )
 
-        logger.info("Sun hours calculated")
+    def schedule_switches(self, now: datetime):
+        """Schedule the remaining switches of the current sun hours"""
+        scheduler.clear("switch-task")
+        upcoming = self.upcoming_today(now)
+        for at, theme in upcoming:
+            scheduler.at(at, partial(self.on_transition, theme, at), tag="switch-task")
+        if self.wallpaper is not None:
+            self.wallpaper.schedule(upcoming, now)
 
-        # Update sun hours
-        self.sun_hours["timestamp"] = datetime.today().strftime("%Y-%m-%d")
-        self.sun_hours["sunrise"] = ephemeris["sunrise"].strftime("%H:%M")
-        self.sun_hours["sunset"] = ephemeris["sunset"].strftime("%H:%M")
+    @serialized()
+    def apply_weather(self, theme: str, at: datetime):
+        """
+        Move the switch to theme planned at at by the cloud cover forecast
+        The sun hours are updated, so the status, the tray and a catch up
+        after resume all follow the shifted instant.
+        """
+        if self.weather is None:
+            return
+        shifted = self.weather.shift(theme, at)
+        if shifted == at:
+            return
 
-        # Save sun hours to cache
-        with cache_path.open("w") as f:
-            file_data = self.sun_hours
-            json_dump(file_data, f)
+        self.sun_hours["sunrise" if theme == "light" else "sunset"] = (
+            shifted.astimezone(self.tz).strftime("%H:%M")
+        )
+        logger.info(f"Switch to {theme} moved to {shifted:%H:%M} by the clouds")
+        log_event("weather", theme=theme, planned=at, shifted=shifted)
+
+        now = self.now()
+        self.schedule_switches(now)
+        if shifted <= now and not self.override.is_active():
+            self.apply_scheduled_theme("weather")
+
+    def upcoming_today(self, now: datetime) -> list[tuple[datetime, str]]:
+        """Transitions of the current sun hours still ahead of now"""
+        return [
+            (at, theme)
+            for at, theme in transitions(self.sun_hours, now.date(), self.tz)
+            if at > now
+        ]
+
+    @property
+    def cache_key(self) -> str:
+        """Identify the location and thresholds the cached sun hours belong to"""
+        return location_key(
+            self.city.latitude,
+            self.city.longitude,
+            self.city.timezone,
+            self.light_elevation,
+            self.dark_elevation,
+        )
+
+    def get_sun_hours(self):
+
+        # Precomputed in the background: only advance the window, no I/O
+        today = self.now().date()
+        if (ephemeris := self.window.get(today)) is not None:
+            self._set_sun_hours(today, ephemeris)
+            self.window.refill()
+            logger.info(f"Sun hours (precomputed): {self.sun_hours}")
+            return self.sun_hours
+
+        # Shared with the other sessions, computed once per location and day
+        ephemeris = self.fetch_days(today, 1)[0]
+        self._set_sun_hours(today, ephemeris)
 
         logger.info(f"Sun hours: {self.sun_hours}")
         return self.sun_hours
 
+    def fetch_days(self, start: date, days: int) -> list[DayEphemeris]:
+        """Ephemeris of a range of days, through the machine-wide cache"""
+        cache = EphemerisCache(Paths.get_data_dir() / "ephemeris.json")
+        return cache.get_or_compute(self.cache_key, start, days, self._compute_day)
+
+    def _compute_day(self, day: date) -> DayEphemeris:
+        # Switch when the sun crosses the elevation thresholds
+        return day_ephemeris(
+            self.city.latitude,
+            self.city.longitude,
+            self.city.timezone,
+            day,
+            self.light_elevation,
+            self.dark_elevation,
+        )
+
+    def upcoming_transitions(self, days: int = EXPORT_DAYS) -> Iterator[Transition]:
+        """
+        Transitions from today on, for the exported plan
+        The days already in the window (else in the shared cache) are reused,
+        only the ones after them are computed.
+        """
+        today = self.now().date()
+        head = self.window.upcoming(today) or self.fetch_days(
+            today, min(days, self.window.days)
+        )
+        head = head[:days]
+        tail = range_ephemeris(
+            self.city.latitude,
+            self.city.longitude,
+            self.city.timezone,
+            today + timedelta(days=len(head)),
+            days - len(head),
+            self.light_elevation,
+            self.dark_elevation,
+        )
+        return day_transitions(chain(head, tail))
+
+    def _set_sun_hours(self, day: date, ephemeris: DayEphemeris):
+        self.sun_hours["timestamp"] = day.strftime("%Y-%m-%d")
+        self.sun_hours["sunrise"] = (
+            ephemeris.light.strftime("%H:%M") if ephemeris.light else None
+        )
+        self.sun_hours["sunset"] = (
+            ephemeris.dark.strftime("%H:%M") if ephemeris.dark else None
+        )
+        self.day_kind = ephemeris.kind
+
     def set_windows_theme(self, theme: str):
         """
         Change Windows theme in a simple and reliable way
@@ -128,16 +283,167 @@ class Switch:
         finally:
             key.Close()
 
-    def switch_to_light_theme(self):
+    @serialized("switch")
+    def switch_to_light_theme(
+        self, source: str = "auto", scheduled: datetime | None = None
+    ):
         if self.theme != "light":
             self.set_windows_theme("light")
             self.theme = "light"
+            self.apply_wallpaper(scheduled)
+            self.record_switch(source, scheduled)
         else:
             logger.info("Theme already set to light")
 
-    def switch_to_dark_theme(self):
+    @serialized("switch")
+    def switch_to_dark_theme(
+        self, source: str = "auto", scheduled: datetime | None = None
+    ):
         if self.theme != "dark":
             self.set_windows_theme("dark")
             self.theme = "dark"
+            self.apply_wallpaper(scheduled)
+            self.record_switch(source, scheduled)
         else:
             logger.info("Theme already set to dark")
+
+    def apply_wallpaper(self, scheduled: datetime | None = None):
+        """Show the wallpaper of the current theme, prefetched if scheduled"""
+        if self.wallpaper is not None and self.theme is not None:
+            self.wallpaper.apply(self.theme, scheduled)
+
+    def record_switch(self, source: str, scheduled: datetime | None = None):
+        """
+        Log the switch as a structured event, queue the hooks and notify the
+        listener
+        Args:
+            source: what triggered it ('schedule', 'startup', 'override', ...)
+            scheduled: planned instant, to measure the switch latency
+        """
+        log_event(
+            "switch",
+            theme=self.theme,
+            source=source,
+            scheduled=scheduled,
+            actual=self.now(),
+        )
+        if self.hooks is not None and self.theme is not None:
+            self.hooks.run(self.theme, source)
+        self.notify_change()
+
+    def notify_change(self):
+        if self.on_change is not None:
+            try:
+                self.on_change()
+            except Exception as e:
+                logger.error(f"Error notifying theme change: {e}")
+
+    @serialized("switch")
+    def switch_to_theme(
+        self, theme: str, source: str = "auto", scheduled: datetime | None = None
+    ):
+        if theme == "light":
+            self.switch_to_light_theme(source, scheduled)
+        else:
+            self.switch_to_dark_theme(source, scheduled)
+
+    @serialized("switch")
+    def apply_scheduled_theme(self, source: str = "catch_up"):
+        """Apply the theme expected now from sun hours"""
+        if self.day_kind != NORMAL or (
+            self.sun_hours["sunrise"] or self.sun_hours["sunset"]
+        ):
+            self.switch_to_theme(
+                theme_at(self.sun_hours, self.now().time(), self.day_kind), source
+            )
+
+    @serialized("catch_up")
+    def catch_up(self, shift: float | None = None):
+        """
+        Re-evaluate the theme after a suspend/resume or a clock jump
+        Args:
+            shift: wall clock shift in seconds, for logging only
+        """
+        if self.sun_hours["timestamp"] != self.now().strftime("%Y-%m-%d"):
+            logger.info("Sun hours are stale, updating")
+            self.update_sun_hours()
+
+        # An expired override is ended by its own deadline job
+        if not self.override.is_active():
+            self.apply_scheduled_theme()
+
+    @serialized("transition")
+    def on_transition(
+        self,
+        theme: str,
+        scheduled: datetime | None = None,
+        source: str = "schedule",
+    ):
+        """Scheduled switch, ignored while a manual override is active"""
+        if self.override.is_active():
+            logger.info(
+                f"Scheduled switch to {theme} skipped ({self.override.describe()})"
+            )
+            log_event("skip", theme=theme, source=source, scheduled=scheduled)
+            return
+        self.switch_to_theme(theme, source, scheduled)
+
+    @serialized("service")
+    def apply_service_event(self, event: dict):
+        """Follow the theme published by the system-wide service"""
+        self.sun_hours.update(event["sun_hours"])
+        self.day_kind = event["day_kind"]
+        if self.wallpaper is not None:
+            now = self.now()
+            self.wallpaper.schedule(self.upcoming_today(now), now)
+        if event["theme"] is not None:
+            self.on_transition(event["theme"], source="service")
+
+    @serialized("override")
+    def set_override(self, theme: str, mode: str = "next", minutes: int | None = None):
+        """
+        Force a theme until the override expires
+        Args:
+            mode: 'next' (next transition), 'duration' (minutes) or 'tomorrow'
+        """
+        until = override_deadline(mode, self.now(), self.sun_hours, minutes)
+        self.override.activate(theme, mode, until)
+        self._schedule_override_end()
+        self.switch_to_theme(theme, "override")
+        logger.info(f"Override set: {self.override.describe()}")
+        log_event("override", theme=theme, mode=mode, until=until)
+        self.notify_change()
+
+    @serialized("override")
+    def end_override(self):
+        """Drop the override and go back to the scheduled theme"""
+        scheduler.clear("override-task")
+        if self.override.until is not None:
+            self.override.clear()
+            logger.info("Override ended")
+            log_event("resume")
+        self.apply_scheduled_theme("resume")
+        self.notify_change()
+
+    @serialized()
+    def restore_override(self) -> bool:
+        """
+        Re-apply an override persisted by a previous run
+        Returns:
+            True if an override is active and its theme was applied
+        """
+        if not self.override.is_active() or self.override.theme is None:
+            if self.override.until is not None:
+                self.override.clear()
+            return False
+
+        self._schedule_override_end()
+        self.switch_to_theme(self.override.theme, "override")
+        logger.info(f"Override restored: {self.override.describe()}")
+        self.notify_change()
+        return True
+
+    def _schedule_override_end(self):
+        scheduler.clear("override-task")
+        if self.override.until is not None:
+            scheduler.at(self.override.until, self.end_override, tag="override-task")
@@ -0,0 +1,83 @@
+from datetime import UTC, date, datetime, time, timedelta, tzinfo
+
+
+# Kinds of day: the sun crosses the thresholds, or stays above/below all day
+NORMAL = "normal"
+POLAR_DAY = "polar_day"
+POLAR_NIGHT = "polar_night"
+
+
+def localize(day: date, hour: time, tz: tzinfo | None) -> datetime:
+    """
+    Absolute instant of a wall-clock time in a timezone
+    Non-existent times (DST gap) are shifted forward by the gap, ambiguous
+    times (DST overlap) resolve to their first occurrence.
+    Args:
+        tz: None returns a naive datetime (host local time)
+    """
+    if tz is None:
+        return datetime.combine(day, hour)
+    return datetime.combine(day, hour, tzinfo=tz).astimezone(UTC).astimezone(tz)
+
+
+def parse_hour(value: str) -> time:
+    return datetime.strptime(value[:5], "%H:%M").time()
+
+
+def theme_at(sun_hours: dict, now: time, kind: str = NORMAL) -> str:
+    """
+    Theme expected at a given time of day
+    Args:
+        sun_hours: sunrise and sunset as 'HH:MM' (None if not crossed that day)
+        kind: polar days and nights keep the same theme all day
+    Returns:
+        'light' between sunrise and sunset (inclusive), 'dark' otherwise
+    """
+    if kind == POLAR_DAY:
+        return "light"
+    if kind == POLAR_NIGHT:
+        return "dark"
+
+    sunrise = parse_hour(sun_hours["sunrise"]) if sun_hours["sunrise"] else time.min
+    sunset = parse_hour(sun_hours["sunset"]) if sun_hours["sunset"] else time.max
+    if sunset < sunrise:
+        # Short night around midnight: sets just after it, rises again later
+        return "dark" if sunset < now < sunrise else "light"
+    return "light" if sunrise <= now <= sunset else "dark"
+
+
+def transitions(
+    sun_hours: dict, day: date, tz: tzinfo | None
+) -> list[tuple[datetime, str]]:
+    """
+    Switches of a day as (instant, theme), in chronological order
+    Args:
+        sun_hours: sunrise and sunset as 'HH:MM', wall-clock time in tz; a
+            missing hour (polar day or night) has no switch
+    """
+    return sorted(
+        (localize(day, parse_hour(sun_hours[key]), tz), theme)
+        for key, theme in (("sunrise", "light"), ("sunset", "dark"))
+        if sun_hours.get(key)
+    )
+
+
+def next_transition(sun_hours: dict, now: datetime) -> tuple[datetime, str] | None:
+    """
+    Next scheduled switch after now
+    Args:
+        now: aware datetime in the location timezone, or naive local time
+    Returns:
+        (instant, theme) or None if sun hours are unknown
+    """
+    upcoming = (
+        transition
+        for day in (now.date(), now.date() + timedelta(days=1))
+        for transition in transitions(sun_hours, day, now.tzinfo)
+    )
+    return next((t for t in upcoming if t[0] > now), None)
+
+
+def next_midnight(now: datetime, hour: time = time.min) -> datetime:
+    """Instant of the given time tomorrow, in the timezone of now"""
+    return localize(now.date() + timedelta(days=1), hour, now.tzinfo)
@@ -1,14 +1,22 @@
+from collections.abc import Callable
 from os.path import splitext
 from subprocess import run
+from typing import TYPE_CHECKING, Any
 from winreg import HKEY_CLASSES_ROOT, OpenKey, QueryValue
 
 import pystray
-from PIL import Image
 
+from src.core.icons import IconCache
+from src.core.timeline import next_transition
+from src.utils.breaker import CLOSED, CircuitBreaker
 from src.utils.logger import Logger
 from src.utils.path import Paths
 
 
+if TYPE_CHECKING:
+    # Imported by serve() only when enabled
+    from src.core.runtime import AsyncRuntime
+
 logger = Logger.get_logger("app")
 
 
@@ -17,15 +25,61 @@ class TrayApp:
         self.icon: pystray.Icon = None
         self.theme_monitor = None
         self.running = True
+        self.icons: IconCache | None = None
+        self.variant: str | None = None
+        self.menu_state: tuple | None = None
+        self.network: CircuitBreaker | None = None
+        # Asyncio runtime running the menu actions, if enabled
+        self.runtime: AsyncRuntime | None = None
 
-    def load_icon(self):
-        """Load a simple icon for the tray"""
-        icon_path = Paths.get_assets_dir() / "icon.ico"
-        if icon_path.exists():
-            return Image.open(icon_path)
-        else:
-            logger.error(f"Icon not found (Path:{icon_path})")
-            return None
+    def load_icon(self, variant: str = "light"):
+        """Load the tray icon variant (decoded once, then cached)"""
+        if self.icons is None:
+            self.icons = IconCache(
+                Paths.get_assets_dir() / "icon.ico", Paths.get_data_dir()
+            )
+        return self.icons.get(variant)
+
+    def icon_variant(self) -> str:
+        """Icon reflecting the override, or else the current theme"""
+        if self.override_active():
+            return "override"
+        if self.theme_monitor and self.theme_monitor.theme == "dark":
+            return "dark"
+        return "light"
+
+    def refresh(self):
+        """Reflect a theme or override change in the icon and the menu"""
+        self.update_icon()
+        self.refresh_menu()
+
+    def refresh_menu(self):
+        """
+        Rebuild the menu only when one of its dynamic texts changed
+        Cheap enough to call every second: texts come from in-memory state.
+        """
+        state = (
+            self.theme_text(),
+            self.next_text(),
+            self.location_text(),
+            self.override_text(),
+            self.override_active(),
+            self.network_text(),
+        )
+        if state == self.menu_state:
+            return
+        self.menu_state = state
+        if self.icon:
+            self.icon.update_menu()
+
+    def update_icon(self):
+        """Swap the tray image when the theme or the override changed"""
+        variant = self.icon_variant()
+        if self.icon is None or variant == self.variant:
+            return
+        if (image := self.load_icon(variant)) is not None:
+            self.icon.icon = image
+            self.variant = variant
 
     def on_show_status(self, icon, item):
         """Show current status"""
@@ -55,35 +109,152 @@ class TrayApp:
                 # No extension or no association found, use Notepad
                 run(["notepad.exe", filepath])
 
-    def on_force_light(self, icon, item):
-        """Force light theme"""
+    def run_action(self, func: Callable[..., Any], *args):
+        """Run a menu action on the runtime if any, else on the tray thread"""
+        if self.runtime is not None:
+            self.runtime.post(func, *args)
+        else:
+            func(*args)
+
+    def on_export_schedule(self, icon, item):
+        """Export the upcoming transitions as a calendar and open it"""
+        self.run_action(self.export_schedule)
+
+    def export_schedule(self):
+        if not self.theme_monitor:
+            return
+
+        from src.core.export import write_ics
+
+        filepath = Paths.get_schedule_file()
+        try:
+            with filepath.open("w", encoding="utf-8", newline="") as f:
+                count = write_ics(
+                    self.theme_monitor.upcoming_transitions(),
+                    f,
+                    key=self.theme_monitor.cache_key,
+                )
+        except OSError as e:
+            logger.error(f"Error exporting schedule: {e}")
+            return
+
+        logger.info(f"Schedule exported ({count} transitions): {filepath}")
+        # Open with the default calendar application
+        run(["explorer.exe", str(filepath)])
+
+    def force_theme(self, theme: str, mode: str = "next", minutes: int | None = None):
+        """Force a theme until the override expires"""
         if self.theme_monitor:
-            self.theme_monitor.switch_to_light_theme()
-            logger.info("Forced light theme")
+            self.theme_monitor.set_override(theme, mode, minutes)
+            logger.info(f"Forced {theme} theme ({mode})")
+            self.refresh_menu()
+
+    def on_force_light(self, icon, item):
+        """Force light theme until the next transition"""
+        self.run_action(self.force_theme, "light")
 
     def on_force_dark(self, icon, item):
-        """Force dark theme"""
+        """Force dark theme until the next transition"""
+        self.run_action(self.force_theme, "dark")
+
+    def on_resume(self, icon, item):
+        """Drop the override and go back to the automatic theme"""
+        self.run_action(self.resume)
+
+    def resume(self):
         if self.theme_monitor:
-            self.theme_monitor.switch_to_dark_theme()
-            logger.info("Forced dark theme")
+            self.theme_monitor.end_override()
+            logger.info("Automatic theme resumed")
+            self.refresh_menu()
+
+    def theme_text(self, item=None) -> str:
+        theme = self.theme_monitor.theme if self.theme_monitor else None
+        return f"Theme: {theme.capitalize() if theme else 'Unknown'}"
+
+    def next_text(self, item=None) -> str:
+        if not self.theme_monitor:
+            return "Next switch: Unknown"
+
+        now = self.theme_monitor.now()
+        transition = next_transition(self.theme_monitor.sun_hours, now)
+        if transition is None:
+            return "Next switch: None"
+
+        at, theme = transition
+        day = "" if at.date() == now.date() else " tomorrow"
+        return f"Next switch: {theme.capitalize()}{day} at {at:%H:%M}"
+
+    def location_text(self, item=None) -> str:
+        if not self.theme_monitor:
+            return "Location: Unknown"
+        return f"Location: {self.theme_monitor.city.name}"
+
+    def network_offline(self, item=None) -> bool:
+        return self.network is not None and self.network.state() != CLOSED
+
+    def network_text(self, item=None) -> str:
+        if not self.network_offline() or self.network is None:
+            return "Network: Online"
+        return f"Network: Offline, {self.network.describe()}"
+
+    def override_active(self, item=None) -> bool:
+        return bool(self.theme_monitor and self.theme_monitor.override.is_active())
+
+    def override_text(self, item=None) -> str:
+        if not self.theme_monitor:
+            return "No override"
+        return f"Override: {self.theme_monitor.override.describe()}"
+
+    def _force_menu(self, theme: str) -> pystray.Menu:
+        return pystray.Menu(
+            pystray.MenuItem(
+                "Until Next Switch",
+                lambda icon, item: self.run_action(self.force_theme, theme),
+            ),
+            pystray.MenuItem(
+                "For 1 Hour",
+                lambda icon, item: self.run_action(
+                    self.force_theme, theme, "duration", 60
+                ),
+            ),
+            pystray.MenuItem(
+                "Until Tomorrow",
+                lambda icon, item: self.run_action(self.force_theme, theme, "tomorrow"),
+            ),
+        )
 
     def on_quit(self, icon, item):
         """Quit the application"""
         self.running = False
         logger.info("Application quit from tray")
+        if self.runtime is not None:
+            self.runtime.stop()
         icon.stop()
 
     def setup_tray(self):
         """Setup the system tray icon and menu"""
         # Load the icon
-        icon_image = self.load_icon()
+        self.variant = self.icon_variant()
+        icon_image = self.load_icon(self.variant)
 
         # Create menu
         menu = pystray.Menu(
+            pystray.MenuItem(self.theme_text, None, enabled=False),
+            pystray.MenuItem(self.next_text, None, enabled=False),
+            pystray.MenuItem(self.location_text, None, enabled=False),
+            pystray.MenuItem(
+                self.network_text, None, enabled=False, visible=self.network_offline
+            ),
+            pystray.Menu.SEPARATOR,
             pystray.MenuItem("Show Status", self.on_show_status),
+            pystray.MenuItem("Export Schedule", self.on_export_schedule),
             pystray.Menu.SEPARATOR,
-            pystray.MenuItem("Force Light Theme", self.on_force_light),
-            pystray.MenuItem("Force Dark Theme", self.on_force_dark),
+            pystray.MenuItem(self.override_text, None, visible=self.override_active),
+            pystray.MenuItem("Force Light Theme", self._force_menu("light")),
+            pystray.MenuItem("Force Dark Theme", self._force_menu("dark")),
+            pystray.MenuItem(
+                "Resume Automatic Theme", self.on_resume, enabled=self.override_active
+            ),
             pystray.Menu.SEPARATOR,
             pystray.MenuItem("Quit", self.on_quit),
         )
@@ -0,0 +1,200 @@
+"""Wallpaper of each theme, prepared ahead of the scheduled transitions"""
+
+import os
+import sys
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import suppress
+from datetime import datetime, timedelta
+from functools import partial
+from pathlib import Path
+from threading import Lock
+
+from PIL import Image, ImageOps
+
+from src.core.scheduler import scheduler
+from src.utils.logger import Logger
+from src.utils.priority import lower_thread_priority
+
+
+logger = Logger.get_logger("app")
+
+# Time before a transition at which its wallpaper is decoded and scaled
+LEAD_TIME = 300.0
+
+# Prepared wallpapers kept in memory, the next transitions first
+KEEP = 2
+
+# Fallback display size, when the system metrics are unavailable
+DISPLAY_SIZE = (1920, 1080)
+
+# Win32 GetSystemMetrics indexes of the primary display size
+SM_CXSCREEN = 0
+SM_CYSCREEN = 1
+
+# Win32 SystemParametersInfoW action and flags
+SPI_SETDESKWALLPAPER = 0x0014
+SPIF_UPDATEINIFILE = 0x01
+SPIF_SENDCHANGE = 0x02
+
+
+def display_size() -> tuple[int, int]:
+    """Size in pixels of the primary display"""
+    if sys.platform == "win32":
+        from ctypes import windll
+
+        with suppress(OSError):
+            width = windll.user32.GetSystemMetrics(SM_CXSCREEN)
+            height = windll.user32.GetSystemMetrics(SM_CYSCREEN)
+            if width and height:
+                return width, height
+    return DISPLAY_SIZE
+
+
+def prepare(source: Path, size: tuple[int, int]) -> Image.Image:
+    """
+    Decode and scale a wallpaper to fill the display, cropping the overflow
+    JPEG sources are decoded directly at the closest reduced scale.
+    """
+    with Image.open(source) as image:
+        image.draft("RGB", size)
+        return ImageOps.fit(image.convert("RGB"), size, Image.Resampling.LANCZOS)
+
+
+def set_wallpaper(path: Path) -> bool:
+    """
+    Set the desktop wallpaper of the current user
+    Returns:
+        False if it could not be changed
+    """
+    if sys.platform != "win32":
+        logger.debug(f"Wallpaper not changed outside Windows ({path})")
+        return False
+
+    from ctypes import windll
+
+    return bool(
+        windll.user32.SystemParametersInfoW(
+            SPI_SETDESKWALLPAPER,
+            0,
+            str(path),
+            SPIF_UPDATEINIFILE | SPIF_SENDCHANGE,
+        )
+    )
+
+
+class WallpaperStage:
+    """
+    Wallpapers decoded and scaled before the transitions that show them
+
+    Each scheduled transition gets a prefetch job LEAD_TIME before it, run on
+    a background thread at idle priority, so the switch itself only writes
+    the prepared pixels (uncompressed BMP) and tells Windows to use them.
+    Only the next KEEP transitions are kept in memory; a wallpaper applied
+    without a prefetch (e.g. at startup) is prepared on the spot.
+    """
+
+    __slots__ = (
+        "_executor",
+        "_lock",
+        "_prepared",
+        "cache_dir",
+        "keep",
+        "lead",
+        "size",
+        "sources",
+    )
+
+    def __init__(
+        self,
+        sources: dict[str, Path],
+        cache_dir: Path,
+        lead: float = LEAD_TIME,
+        keep: int = KEEP,
+        size: tuple[int, int] | None = None,
+    ):
+        self.sources = sources
+        self.cache_dir = cache_dir
+        self.lead = lead
+        self.keep = keep
+        self.size = size or display_size()
+        self._prepared: dict[tuple[datetime, str], Future[Image.Image]] = {}
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(
+            1, thread_name_prefix="wallpaper", initializer=lower_thread_priority
+        )
+
+    def schedule(self, upcoming: Iterable[tuple[datetime, str]], now: datetime):
+        """Schedule the prefetch of each upcoming transition"""
+        scheduler.clear("prefetch-task")
+        for at, theme in upcoming:
+            if theme not in self.sources or at <= now:
+                continue
+            start = at - timedelta(seconds=self.lead)
+            if start <= now:
+                self.prefetch(theme, at, now)
+            else:
+                scheduler.at(
+                    start, partial(self.prefetch, theme, at), tag="prefetch-task"
+                )
+
+    def prefetch(self, theme: str, at: datetime, now: datetime | None = None):
+        """Prepare the wallpaper of the transition to theme at instant at"""
+        if theme not in self.sources:
+            return
+        now = now or datetime.now(at.tzinfo)
+        with self._lock:
+            if (at, theme) not in self._prepared:
+                self._prepared[(at, theme)] = self._executor.submit(
+                    prepare, self.sources[theme], self.size
+                )
+                logger.debug(f"Prefetching {theme} wallpaper for {at:%H:%M}")
+
+            # Past transitions and the ones beyond the next KEEP are dropped
+            upcoming = sorted(key for key in self._prepared if key[0] >= now)
+            for key in set(self._prepared) - set(upcoming[: self.keep]):
+                self._prepared.pop(key).cancel()
+
+    def prepared(self) -> list[tuple[datetime, str]]:
+        """Transitions whose wallpaper is prepared or being prepared"""
+        with self._lock:
+            return sorted(self._prepared)
+
+    def apply(self, theme: str, at: datetime | None = None) -> bool:
+        """
+        Show the wallpaper of theme, prefetched for the transition at if any
+        Returns:
+            False if no wallpaper is set for theme or it could not be applied
+        """
+        if theme not in self.sources:
+            return False
+
+        # Any prepared image of the theme will do (e.g. pushed by the service)
+        with self._lock:
+            keys = sorted(k for k in self._prepared if k[1] == theme)
+            if at is not None and (at, theme) in self._prepared:
+                keys.insert(0, (at, theme))
+            future = self._prepared.pop(keys[0]) if keys else None
+
+        try:
+            if future is not None and not future.cancelled():
+                image = future.result()
+            else:
+                logger.debug(f"{theme.capitalize()} wallpaper not prefetched")
+                image = prepare(self.sources[theme], self.size)
+
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self.cache_dir / f"wallpaper-{theme}.bmp"
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            image.save(tmp_path, "BMP")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"Error preparing {theme} wallpaper: {e}")
+            return False
+
+        return set_wallpaper(path)
+
+    def shutdown(self):
+        with self._lock:
+            self._prepared.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
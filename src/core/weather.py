@@ -0,0 +1,171 @@
+"""Cloud cover forecast, to switch to dark earlier on overcast evenings"""
+
+from datetime import datetime, timedelta
+from time import time
+from typing import NamedTuple
+
+from src.utils.breaker import CircuitBreaker
+from src.utils.logger import Logger
+from src.utils.state import StateStore
+
+
+logger = Logger.get_logger("app")
+
+# Hourly forecast service (no API key), queried once per TTL at most
+URL = "https://api.open-meteo.com/v1/forecast"
+HTTP_TIMEOUT = 5.0
+TTL = 3 * 3600.0
+
+# Cloud cover (%) from which the switches move, and their largest shift
+THRESHOLD = 50.0
+MAX_SHIFT = 45.0
+
+# The forecast around a transition is read this long before its largest
+# shift, so a shifted switch is never scheduled in the past
+LEAD_MARGIN = timedelta(hours=1)
+
+# Hours of forecast averaged on each side of a transition
+SPAN = 3600.0
+
+
+def fetch_cloud_cover(
+    latitude: float, longitude: float, url: str = URL, timeout: float = HTTP_TIMEOUT
+) -> list[tuple[float, float]]:
+    """
+    Hourly cloud cover of the next two days
+    Returns:
+        (UTC timestamp, cover in %) pairs, in chronological order
+    """
+    # Imported here only, so the module loads without the HTTP stack
+    from requests import get
+
+    response = get(
+        url,
+        params={
+            "latitude": latitude,
+            "longitude": longitude,
+            "hourly": "cloud_cover",
+            "forecast_days": 2,
+            "timeformat": "unixtime",
+        },
+        timeout=timeout,
+    )
+    try:
+        response.raise_for_status()
+        hourly = response.json()["hourly"]
+    finally:
+        response.close()
+    return [
+        (float(at), float(cover))
+        for at, cover in zip(hourly["time"], hourly["cloud_cover"], strict=True)
+        if cover is not None
+    ]
+
+
+class CloudForecast:
+    """
+    Cloud cover of a location, cached on disk for ttl seconds
+
+    The request goes through the circuit breaker; while it fails, the last
+    forecast is used whatever its age, and nothing at all without one.
+    """
+
+    __slots__ = ("breaker", "key", "latitude", "longitude", "store", "ttl", "url")
+
+    def __init__(
+        self,
+        latitude: float,
+        longitude: float,
+        store: StateStore,
+        breaker: CircuitBreaker | None = None,
+        ttl: float = TTL,
+        url: str = URL,
+    ):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.store = store
+        self.breaker = breaker
+        self.ttl = ttl
+        self.url = url
+        self.key = f"{latitude:.2f},{longitude:.2f}"
+
+    def hours(self, now: float | None = None) -> list[tuple[float, float]]:
+        """Hourly (timestamp, cover) pairs, fetched if the cache expired"""
+        now = time() if now is None else now
+        cached = self.store.get("forecast") or {}
+        if cached.get("key") != self.key:
+            cached = {}
+        if cached and now - cached["fetched"] < self.ttl:
+            return [tuple(hour) for hour in cached["hours"]]
+
+        if self.breaker is not None and not self.breaker.allow():
+            logger.debug(f"Forecast skipped ({self.breaker.describe()})")
+            return [tuple(hour) for hour in cached.get("hours", [])]
+
+        try:
+            hours = fetch_cloud_cover(self.latitude, self.longitude, self.url)
+        except Exception as e:
+            logger.warning(f"Error fetching the cloud cover forecast: {e}")
+            if self.breaker is not None:
+                self.breaker.record_failure()
+            return [tuple(hour) for hour in cached.get("hours", [])]
+
+        if self.breaker is not None:
+            self.breaker.record_success()
+        try:
+            self.store.set(
+                "forecast", {"key": self.key, "fetched": now, "hours": hours}
+            )
+        except OSError as e:
+            logger.error(f"Error saving the forecast: {e}")
+        logger.info(f"Cloud cover forecast updated ({len(hours)} hours)")
+        return hours
+
+    def cover(self, at: datetime) -> float | None:
+        """
+        Mean cloud cover forecast within an hour of an instant
+        Returns:
+            None if the forecast does not cover it
+        """
+        instant = at.timestamp()
+        values = [c for t, c in self.hours() if abs(t - instant) <= SPAN]
+        return sum(values) / len(values) if values else None
+
+
+class CloudModel(NamedTuple):
+    """
+    Shift of the switches by cloud cover: none up to threshold, then growing
+    linearly up to max_shift minutes under a fully overcast sky
+    """
+
+    threshold: float = THRESHOLD
+    max_shift: float = MAX_SHIFT
+
+    def offset(self, cover: float) -> timedelta:
+        if cover <= self.threshold or self.threshold >= 100:
+            return timedelta(0)
+        ratio = min((cover - self.threshold) / (100 - self.threshold), 1.0)
+        return timedelta(minutes=round(self.max_shift * ratio))
+
+
+class WeatherShift:
+    """Move the switches of an overcast day: dark earlier, light later"""
+
+    __slots__ = ("forecast", "model")
+
+    def __init__(self, forecast: CloudForecast, model: CloudModel | None = None):
+        self.forecast = forecast
+        self.model = model or CloudModel()
+
+    @property
+    def lead(self) -> timedelta:
+        """Time before a transition at which its shift is decided"""
+        return timedelta(minutes=self.model.max_shift) + LEAD_MARGIN
+
+    def shift(self, theme: str, at: datetime) -> datetime:
+        """Instant of the transition to theme planned at at, once shifted"""
+        cover = self.forecast.cover(at)
+        if cover is None:
+            return at
+        offset = self.model.offset(cover)
+        return at - offset if theme == "dark" else at + offset
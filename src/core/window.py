@@ -0,0 +1,159 @@
+import threading
+from collections import deque
+from collections.abc import Callable
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from src.core.ephemeris import SUNRISE_ELEVATION, DayEphemeris, day_ephemeris
+from src.utils.logger import Logger
+from src.utils.priority import lower_thread_priority
+
+
+logger = Logger.get_logger("app")
+
+# Days kept computed ahead, today included
+WINDOW_DAYS = 7
+
+
+class EphemerisWindow:
+    """
+    Sliding window of upcoming days, filled by a background worker
+
+    Looking up today only drops the past days from the front of the window; the
+    worker then appends the missing days at the end, at idle priority.
+    """
+
+    def __init__(
+        self,
+        latitude: float,
+        longitude: float,
+        timezone: str,
+        light_elevation: float = SUNRISE_ELEVATION,
+        dark_elevation: float = SUNRISE_ELEVATION,
+        days: int = WINDOW_DAYS,
+        fetch: Callable[[date, int], list[DayEphemeris]] | None = None,
+    ):
+        """
+        Args:
+            fetch: ephemeris of a range of days (start, count), e.g. from a
+                shared cache; computed locally by default
+        """
+        self.latitude = latitude
+        self.longitude = longitude
+        self.timezone = timezone
+        self.light_elevation = light_elevation
+        self.dark_elevation = dark_elevation
+        self.days = days
+        self.fetch = fetch or self._compute
+
+        self._days: deque[DayEphemeris] = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+
+    def today(self) -> date:
+        return datetime.now(ZoneInfo(self.timezone)).date()
+
+    def get(self, day: date) -> DayEphemeris | None:
+        """
+        Precomputed ephemeris of a day, dropping the days before it
+        Returns:
+            None if the day is not in the window (yet)
+        """
+        with self._lock:
+            while self._days and self._days[0].day < day:
+                self._days.popleft()
+            if self._days and self._days[0].day == day:
+                return self._days[0]
+        return None
+
+    def upcoming(self, day: date) -> list[DayEphemeris]:
+        """
+        Precomputed days from a day on, dropping the days before it
+        Returns:
+            empty if the day is not in the window (yet)
+        """
+        with self._lock:
+            while self._days and self._days[0].day < day:
+                self._days.popleft()
+            if self._days and self._days[0].day == day:
+                return list(self._days)
+        return []
+
+    def extend(self, today: date | None = None) -> int:
+        """
+        Compute the days missing at the end of the window
+        Returns:
+            number of days computed
+        """
+        today = today or self.today()
+        with self._lock:
+            while self._days and self._days[0].day < today:
+                self._days.popleft()
+            last = self._days[-1].day if self._days else today - timedelta(days=1)
+
+        first = last + timedelta(days=1)
+        computed = (today + timedelta(days=self.days) - first).days
+        if computed <= 0 or self._stopping:
+            return 0
+
+        # Computed outside the lock, lookups never wait for the solver
+        ephemerides = self.fetch(first, computed)
+        with self._lock:
+            self._days.extend(ephemerides)
+        return computed
+
+    def _compute(self, start: date, days: int) -> list[DayEphemeris]:
+        return [
+            day_ephemeris(
+                self.latitude,
+                self.longitude,
+                self.timezone,
+                start + timedelta(days=offset),
+                self.light_elevation,
+                self.dark_elevation,
+            )
+            for offset in range(days)
+        ]
+
+    def __len__(self) -> int:
+        return len(self._days)
+
+    def start(self):
+        """Start the worker and fill the window"""
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._run, name="ephemeris-window", daemon=True
+        )
+        self._thread.start()
+        self.refill()
+
+    def refill(self):
+        """Ask the worker to extend the window"""
+        self._wake.set()
+
+    def stop(self):
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def _run(self):
+        if not lower_thread_priority():
+            logger.debug("Could not lower the precompute thread priority")
+
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._stopping:
+                return
+            try:
+                computed = self.extend()
+            except Exception as e:
+                logger.error(f"Error precomputing ephemeris: {e}")
+            else:
+                logger.debug(f"Ephemeris window extended by {computed} day(s)")
@@ -0,0 +1,108 @@
+"""Tray session shared by the application and the session agent"""
+
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from time import sleep
+
+from src.core.control import Controller
+from src.core.ephemeris import SUNRISE_ELEVATION
+from src.core.hooks import WORKERS, HookRunner, load_hooks
+from src.core.scheduler import scheduler
+from src.core.tray import TrayApp
+from src.core.wallpaper import LEAD_TIME, WallpaperStage
+from src.utils.config import configurator
+from src.utils.instance import SingleInstance
+from src.utils.logger import Logger
+from src.utils.path import Paths
+
+
+logger = Logger.get_logger("app")
+
+
+def elevation_thresholds() -> tuple[float, float]:
+    """Light and dark elevation thresholds from the configuration"""
+    return (
+        configurator.getfloat("switch", "light_elevation", fallback=SUNRISE_ELEVATION),
+        configurator.getfloat("switch", "dark_elevation", fallback=SUNRISE_ELEVATION),
+    )
+
+
+def hook_runner() -> HookRunner | None:
+    """Runner of the [hook:<name>] sections, None without any hook"""
+    hooks = load_hooks(configurator)
+    if not hooks:
+        return None
+    logger.info(f"Hooks loaded: {', '.join(hook.name for hook in hooks)}")
+    return HookRunner(hooks, configurator.getint("hooks", "workers", fallback=WORKERS))
+
+
+def wallpaper_stage() -> WallpaperStage | None:
+    """Wallpapers of the [wallpaper] section, None if no theme has one"""
+    sources = {
+        theme: Path(path)
+        for theme in ("light", "dark")
+        if (path := configurator.get("wallpaper", theme, fallback="").strip())
+    }
+    if not sources:
+        return None
+    return WallpaperStage(
+        sources,
+        Paths.get_wallpaper_dir(),
+        configurator.getfloat("wallpaper", "lead", fallback=LEAD_TIME),
+    )
+
+
+def serve(tray_app: TrayApp):
+    """Run the scheduler until quit, on the asyncio runtime if enabled"""
+    if configurator.getboolean("runtime", "asyncio", fallback=False):
+        # Imported only when enabled, the polling loop needs no event loop
+        from src.core.runtime import WORKERS as RUNTIME_WORKERS, AsyncRuntime
+
+        runtime = AsyncRuntime(
+            workers=configurator.getint("runtime", "workers", fallback=RUNTIME_WORKERS)
+        )
+        runtime.on_tick = tray_app.refresh_menu
+        tray_app.runtime = runtime
+        # Stopped from the tray, even before it runs
+        if tray_app.running:
+            runtime.run()
+        tray_app.runtime = None
+        return
+
+    while tray_app.running:
+        scheduler.run_pending()
+        tray_app.refresh_menu()
+        sleep(1)
+
+
+def run_tray(target: Callable[[TrayApp], None], instance: SingleInstance) -> int:
+    """
+    Run the tray icon on the calling thread and target on a background one
+    Args:
+        target: logic of the session (standalone application or agent)
+        instance: single-instance guard already acquired by the entry point
+    """
+    # Create tray app
+    logger.debug("Creating tray app...")
+    tray_app = TrayApp()
+    logger.debug("Tray app created.")
+    logger.debug("Setting up tray app...")
+    tray_app.setup_tray()
+    logger.debug("Tray app setup.")
+
+    # Listen to later launches
+    instance.serve(Controller(tray_app).handle)
+
+    # Start main logic in separate thread
+    logger.debug("Starting main logic in separate thread...")
+    main_thread_obj = threading.Thread(target=target, args=(tray_app,), daemon=True)
+    main_thread_obj.start()
+    logger.debug("Main logic in separate thread started.")
+
+    # Run tray icon (blocking - this keeps the app running)
+    logger.debug("Running tray app...")
+    tray_app.run_tray()
+    instance.release()
+    logger.info("Application stopped")
+    return 0
@@ -0,0 +1,127 @@
+import threading
+from datetime import datetime
+from random import uniform
+from time import time
+
+from src.utils.logger import Logger, log_event
+from src.utils.state import StateStore
+
+
+logger = Logger.get_logger("app")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Delay before the first probe after a failure, doubled on each failure up to
+# MAX_DELAY, and spread by +/- JITTER so machines of a fleet do not retry
+# in lockstep
+BASE_DELAY = 60.0
+MAX_DELAY = 6 * 3600.0
+JITTER = 0.2
+
+
+class CircuitBreaker:
+    """
+    Skip outbound calls that are bound to fail
+
+    Consecutive failures open the circuit until a retry instant, persisted so
+    a restart of an offline machine does not wait for the timeouts again.
+    Once it is reached, a single probe is let through (half open): a success
+    closes the circuit, a failure opens it again for twice as long.
+    """
+
+    __slots__ = (
+        "_lock",
+        "base_delay",
+        "failures",
+        "max_delay",
+        "name",
+        "retry_at",
+        "store",
+    )
+
+    def __init__(
+        self,
+        store: StateStore | None = None,
+        name: str = "network",
+        base_delay: float = BASE_DELAY,
+        max_delay: float = MAX_DELAY,
+    ):
+        self.store = store
+        self.name = name
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        data = (store.get(name) if store else None) or {}
+        self.failures: int = data.get("failures", 0)
+        self.retry_at: float = data.get("retry_at", 0.0)
+
+    def state(self, now: float | None = None) -> str:
+        if self.failures == 0:
+            return CLOSED
+        return OPEN if (time() if now is None else now) < self.retry_at else HALF_OPEN
+
+    def allow(self, now: float | None = None) -> bool:
+        """
+        True unless the circuit is open
+        The first call once half open is the probe: the next retry is pushed
+        back by the base delay, so the other callers are held until it reports
+        (or a new probe is let through if it never does).
+        """
+        now = time() if now is None else now
+        with self._lock:
+            state = self.state(now)
+            if state == HALF_OPEN:
+                self._save(self.failures, now + self.base_delay)
+            return state != OPEN
+
+    def record_success(self):
+        if self.failures:
+            logger.info(f"Circuit {self.name} closed")
+            log_event("circuit", name=self.name, state=CLOSED)
+        self._save(0, 0.0)
+
+    def record_failure(self, now: float | None = None):
+        failures = self.failures + 1
+        delay = min(self.max_delay, self.base_delay * 2 ** (failures - 1))
+        delay *= uniform(1 - JITTER, 1 + JITTER)
+        self._save(failures, (time() if now is None else now) + delay)
+        logger.warning(
+            f"Circuit {self.name} open after {failures} failures, "
+            f"next attempt in {delay:.0f}s"
+        )
+        log_event("circuit", name=self.name, state=OPEN, failures=failures)
+
+    def describe(self) -> str:
+        """Human readable state, e.g. 'retry at 14:05'"""
+        state = self.state()
+        if state == OPEN:
+            return f"retry at {datetime.fromtimestamp(self.retry_at):%H:%M}"
+        if state == HALF_OPEN:
+            return "retrying"
+        return "online"
+
+    def status(self) -> dict:
+        return {
+            "state": self.state(),
+            "failures": self.failures,
+            "retry_at": (
+                datetime.fromtimestamp(self.retry_at).astimezone().isoformat()
+                if self.failures
+                else None
+            ),
+        }
+
+    def _save(self, failures: int, retry_at: float):
+        self.failures = failures
+        self.retry_at = retry_at
+        if self.store is None:
+            return
+        try:
+            self.store.set(
+                self.name,
+                {"failures": failures, "retry_at": retry_at} if failures else None,
+            )
+        except OSError as e:
+            logger.error(f"Error saving circuit state: {e}")
@@ -10,6 +10,7 @@ if Paths.get_config_file().exists():
 else:
     configurator.add_section("logs")
     configurator.set("logs", "debug", "false")
+    configurator.set("logs", "events", "false")
 
     configurator.add_section("location")
     configurator.set("location", "city", "")
@@ -17,6 +18,41 @@ else:
     configurator.set("location", "timezone", "")
     configurator.set("location", "latitude", "0.0")
     configurator.set("location", "longitude", "0.0")
+    # pinned = true keeps the location above as is (no network lookup)
+    configurator.set("location", "pinned", "false")
+    configurator.set("location", "providers", "ipinfo, ipapi")
+
+    # Sun elevation (degrees) at which to switch: -0.833 is sunrise/sunset,
+    # -6 civil dawn/dusk, positive values switch while the sun is still up
+    configurator.add_section("switch")
+    configurator.set("switch", "light_elevation", "-0.833")
+    configurator.set("switch", "dark_elevation", "-0.833")
+
+    # Image shown with each theme (empty keeps the wallpaper), decoded and
+    # scaled lead seconds before the scheduled switches
+    configurator.add_section("wallpaper")
+    configurator.set("wallpaper", "light", "")
+    configurator.set("wallpaper", "dark", "")
+    configurator.set("wallpaper", "lead", "300")
+
+    # Switch to dark earlier (and to light later) under a cloudy sky: from
+    # threshold % of cloud cover, by up to max_shift minutes when overcast
+    configurator.add_section("weather")
+    configurator.set("weather", "enabled", "false")
+    configurator.set("weather", "threshold", "50")
+    configurator.set("weather", "max_shift", "45")
+    configurator.set("weather", "ttl_hours", "3")
+
+    # Actions run after each switch are added as [hook:<name>] sections
+    configurator.add_section("hooks")
+    configurator.set("hooks", "workers", "2")
+    configurator.set("hooks", "timeout", "30")
+
+    # asyncio = true runs the scheduler and the menu actions on an event loop
+    # (waking only when due) instead of a thread polling every second
+    configurator.add_section("runtime")
+    configurator.set("runtime", "asyncio", "false")
+    configurator.set("runtime", "workers", "2")
 
     with open(Paths.get_config_file(), "x") as configfile:
         configurator.write(configfile)
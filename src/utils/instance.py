@@ -0,0 +1,49 @@
+from getpass import getuser
+from time import monotonic, sleep
+
+from src.utils.ipc import Handler, IPCServer, Response, get_address, send_request
+from src.utils.lock import FileLock
+from src.utils.logger import Logger
+from src.utils.path import Paths
+
+
+logger = Logger.get_logger("app")
+
+
+class SingleInstance:
+    """Guarantee a single running instance per user and hand off later launches"""
+
+    def __init__(self, name: str = "instance"):
+        self.lock = FileLock(Paths.get_data_dir() / f"{name}-{getuser()}.lock")
+        self.address = get_address(name)
+        self.server: IPCServer | None = None
+
+    def acquire(self) -> bool:
+        """Try to become the primary instance (never blocks)"""
+        return self.lock.acquire(timeout=0)
+
+    def serve(self, handler: Handler):
+        """Accept requests from later launches"""
+        self.server = IPCServer(handler, self.address)
+        self.server.start()
+
+    def forward(self, args: list[str], timeout: float = 2.0) -> Response | None:
+        """
+        Forward the arguments of this launch to the primary instance
+        Args:
+            timeout: time left to the primary instance to open its channel
+        """
+        request = {"cmd": "activate", "args": args}
+        deadline = monotonic() + timeout
+        while (response := send_request(request, self.address)) is None:
+            if monotonic() >= deadline:
+                logger.warning("Primary instance did not answer")
+                return None
+            sleep(0.05)
+        return response
+
+    def release(self):
+        if self.server is not None:
+            self.server.stop()
+            self.server = None
+        self.lock.release()
@@ -0,0 +1,354 @@
+import os
+import sys
+import threading
+from collections.abc import Callable
+from contextlib import suppress
+from getpass import getuser
+from json import dumps as json_dumps, loads as json_loads
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+from queue import Full, Queue
+from typing import Any
+
+from src.utils.logger import Logger
+from src.utils.path import Paths
+
+
+logger = Logger.get_logger("app")
+
+Request = dict
+Response = dict
+Handler = Callable[[Request], Response]
+
+# Time left to a client to send its request once connected: requests are
+# served one at a time, so a silent client must not hold the channel
+REQUEST_TIMEOUT = 1.0
+
+# Events queued for a subscriber that does not read them (hung or suspended
+# session) before it is dropped
+BACKLOG = 16
+
+
+def get_address(name: str = "instance", shared: bool = False) -> tuple[str, str]:
+    """
+    Local channel address for the current user
+    Args:
+        shared: one channel for the whole machine instead of one per user
+    Returns:
+        (address, family): a named pipe on Windows, a Unix socket elsewhere
+    """
+    suffix = name if shared else f"{name}-{getuser()}"
+    if sys.platform == "win32":
+        return rf"\\.\pipe\AutoSwitchTheme-{suffix}", "AF_PIPE"
+
+    return str(Paths.get_data_dir() / f"{suffix}.sock"), "AF_UNIX"
+
+
+def encode(message: dict) -> bytes:
+    return json_dumps(message, separators=(",", ":")).encode()
+
+
+def decode(data: bytes) -> dict:
+    return json_loads(data.decode())
+
+
+def send_request(
+    request: Request, channel: tuple[str, str] | None = None, timeout: float = 2.0
+) -> Response | None:
+    """
+    Send one request to the channel and wait for the response
+    Returns:
+        The response, or None if nobody is listening
+    """
+    address, family = channel or get_address()
+    try:
+        conn = Client(address, family)
+    except OSError:
+        return None
+
+    with conn:
+        conn.send_bytes(encode(request))
+        if not conn.poll(timeout):
+            return None
+        return decode(conn.recv_bytes())
+
+
+class IPCServer:
+    """Serve requests from the local channel on a background thread"""
+
+    def __init__(self, handler: Handler, channel: tuple[str, str] | None = None):
+        self.handler = handler
+        self.address, self.family = channel or get_address()
+        self.listener: Listener | Any | None = None
+        self.thread: threading.Thread | None = None
+        self.running = False
+
+    def start(self):
+        """Bind the channel and start serving"""
+        if self.family == "AF_UNIX":
+            # Only the lock owner starts a server, so a leftover socket is stale
+            Path(self.address).unlink(missing_ok=True)
+
+        self.listener = self._listen()
+        self.running = True
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+        logger.debug(f"IPC server listening on {self.address}")
+
+    def _listen(self) -> Any:
+        return Listener(self.address, self.family)
+
+    def _serve(self):
+        while self.running and self.listener is not None:
+            try:
+                conn = self.listener.accept()
+            except OSError:
+                break
+
+            with conn:
+                if self.running:
+                    self._handle(conn)
+
+    def _handle(self, conn):
+        try:
+            if not conn.poll(REQUEST_TIMEOUT):
+                logger.warning("IPC client sent no request, connection dropped")
+                return
+            request = decode(conn.recv_bytes())
+        except EOFError:
+            return
+        except Exception as e:
+            logger.error(f"Error handling IPC request: {e}")
+            request = None
+        self._reply(conn, request)
+
+    def _reply(self, conn, request: Request | None):
+        try:
+            if request is None:
+                raise ValueError("Malformed request")
+            response = self.handler(request)
+        except Exception as e:
+            logger.error(f"Error handling IPC request: {e}")
+            response = {"ok": False, "error": str(e)}
+
+        with suppress(OSError):
+            conn.send_bytes(encode(response))
+
+    def stop(self):
+        """Stop serving and release the channel"""
+        if not self.running:
+            return
+
+        self.running = False
+        # Wake up the blocking accept()
+        with suppress(OSError):
+            Client(self.address, self.family).close()
+
+        if self.thread is not None:
+            self.thread.join(timeout=1)
+
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+
+
+class Subscription:
+    """
+    Connection of a subscriber, written by its own thread from a bounded queue
+    So a session that stops reading only blocks its own thread, never the
+    publisher.
+    """
+
+    def __init__(self, conn, user: str, backlog: int = BACKLOG):
+        self.conn = conn
+        self.user = user
+        self.queue: Queue[bytes | None] = Queue(backlog)
+        self.closed = False
+        self._lock = threading.Lock()
+        self.thread = threading.Thread(
+            target=self._send, name=f"subscriber-{user}", daemon=True
+        )
+
+    def start(self):
+        self.thread.start()
+
+    def push(self, data: bytes) -> bool:
+        """
+        Queue an event without waiting
+        Returns:
+            False if the subscriber is gone or does not keep up
+        """
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(data)
+        except Full:
+            return False
+        return True
+
+    def _send(self):
+        while (data := self.queue.get()) is not None:
+            try:
+                self.conn.send_bytes(data)
+            except (OSError, TypeError):
+                # TypeError: closed by close() in the middle of a send
+                break
+        self.close()
+
+    def close(self):
+        """Stop the sender and close the connection (also unblocks a send)"""
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            with suppress(Full):
+                self.queue.put_nowait(None)
+            with suppress(OSError):
+                self.conn.close()
+
+
+class PublishServer(IPCServer):
+    """
+    Serve requests, and push events to the connections that subscribed
+
+    A {"cmd": "subscribe"} request keeps its connection open: it is answered
+    with snapshot() and then receives every published event.
+    """
+
+    def __init__(
+        self,
+        handler: Handler,
+        snapshot: Callable[[], dict],
+        channel: tuple[str, str] | None = None,
+    ):
+        super().__init__(handler, channel)
+        self.snapshot = snapshot
+        self.subscribers: list[Subscription] = []
+        self._lock = threading.Lock()
+
+    def _listen(self) -> Any:
+        # Sessions of every user connect to a shared channel
+        if self.family == "AF_PIPE":
+            from src.utils.pipe import SharedPipeListener
+
+            return SharedPipeListener(self.address)
+
+        listener = super()._listen()
+        if self.family == "AF_UNIX":
+            os.chmod(self.address, 0o666)
+        return listener
+
+    def _serve(self):
+        while self.running and self.listener is not None:
+            try:
+                conn = self.listener.accept()
+            except OSError:
+                break
+
+            if not self.running:
+                conn.close()
+                break
+
+            # A client that connects but never speaks must not block the others
+            try:
+                request = (
+                    decode(conn.recv_bytes()) if conn.poll(REQUEST_TIMEOUT) else None
+                )
+            except (EOFError, OSError, ValueError):
+                request = None
+            if request is None:
+                conn.close()
+                continue
+
+            if request.get("cmd") == "subscribe":
+                self._subscribe(conn, request)
+            else:
+                with conn:
+                    self._reply(conn, request)
+
+    def _subscribe(self, conn, request: Request):
+        subscription = Subscription(conn, request.get("user", "unknown"))
+        with self._lock:
+            # The snapshot is queued under the lock, before any later event
+            subscription.push(encode(self.snapshot()))
+            self.subscribers.append(subscription)
+        subscription.start()
+        logger.info(f"Subscriber connected: {subscription.user}")
+
+    def publish(self, event: dict):
+        """
+        Queue an event for every subscriber, without waiting for them
+        The disconnected ones and those that do not keep up are dropped.
+        """
+        data = encode(event)
+        with self._lock:
+            for subscription in list(self.subscribers):
+                if subscription.push(data):
+                    continue
+                self.subscribers.remove(subscription)
+                if subscription.closed:
+                    logger.info(f"Subscriber disconnected: {subscription.user}")
+                else:
+                    logger.warning(
+                        f"Subscriber {subscription.user} does not keep up, dropped"
+                    )
+                subscription.close()
+
+    def stop(self):
+        super().stop()
+        with self._lock:
+            for subscription in self.subscribers:
+                subscription.close()
+            self.subscribers.clear()
+
+
+class Subscriber:
+    """Receive the events of a PublishServer, reconnecting when it restarts"""
+
+    def __init__(
+        self,
+        on_event: Callable[[dict], None],
+        channel: tuple[str, str],
+        retry: float = 5.0,
+    ):
+        self.on_event = on_event
+        self.address, self.family = channel
+        self.retry = retry
+        self.thread: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        self._stopped.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                conn = Client(self.address, self.family)
+            except OSError:
+                self._stopped.wait(self.retry)
+                continue
+
+            with conn:
+                try:
+                    conn.send_bytes(encode({"cmd": "subscribe", "user": getuser()}))
+                    while not self._stopped.is_set():
+                        if conn.poll(0.5):
+                            self._dispatch(decode(conn.recv_bytes()))
+                except (EOFError, OSError):
+                    logger.warning("Connection to the publisher lost")
+
+            self._stopped.wait(self.retry)
+
+    def _dispatch(self, event: dict):
+        try:
+            self.on_event(event)
+        except Exception as e:
+            logger.error(f"Error handling event: {e}")
+
+    def stop(self):
+        self._stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout=2)
+            self.thread = None
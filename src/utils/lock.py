@@ -0,0 +1,80 @@
+import sys
+from pathlib import Path
+from time import monotonic, sleep
+
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+
+class FileLock:
+    """Advisory lock on a file, shared between processes"""
+
+    __slots__ = ("_file", "path")
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+
+    @property
+    def locked(self) -> bool:
+        return self._file is not None
+
+    def _try_lock(self, file) -> bool:
+        try:
+            if sys.platform == "win32":
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False
+        return True
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        """
+        Acquire the lock
+        Args:
+            timeout: None waits forever, 0 does not wait at all
+        Returns:
+            True if the lock is held by this object
+        """
+        if self._file is not None:
+            return True
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        file = self.path.open("a+")
+        deadline = None if timeout is None else monotonic() + timeout
+
+        while not self._try_lock(file):
+            if deadline is not None and monotonic() >= deadline:
+                file.close()
+                return False
+            sleep(0.01)
+
+        self._file = file
+        return True
+
+    def release(self):
+        """Release the lock if held"""
+        if self._file is None:
+            return
+
+        try:
+            if sys.platform == "win32":
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
@@ -1,6 +1,216 @@
 import logging
-from logging.handlers import TimedRotatingFileHandler
+import os
+import shutil
+import threading
+from contextlib import suppress
+from datetime import datetime, timedelta
+from json import dumps as json_dumps
+from logging.handlers import BaseRotatingHandler
 from pathlib import Path
+from queue import Queue
+from time import localtime, mktime, strftime, strptime, time
+
+from src.utils.priority import lower_thread_priority
+
+
+# Rotation bounds: the active file rolls over at MAX_BYTES or MAX_AGE, and the
+# compressed backups are pruned beyond BACKUP_COUNT files or MAX_TOTAL_BYTES
+MAX_BYTES = 5 * 1024 * 1024
+MAX_AGE = timedelta(days=30)
+BACKUP_COUNT = 12
+MAX_TOTAL_BYTES = 20 * 1024 * 1024
+
+# A failed rename (file held by another process) is retried after this delay
+RETRY_DELAY = 60.0
+
+STAMP_FORMAT = "%Y%m%d-%H%M%S"
+
+# Logger of the structured events (JSON lines), silent unless set up
+EVENTS_LOGGER = "events"
+
+
+def rotated_files(path: Path) -> list[Path]:
+    """Backups of a log file (compressed or not), oldest first"""
+    return sorted(
+        backup
+        for backup in path.parent.glob(f"{path.name}.*-*")
+        if backup.suffix != ".tmp"
+    )
+
+
+class BoundedRotatingFileHandler(BaseRotatingHandler):
+    """
+    Log file rotated by size and by age, with a hard cap on disk use
+
+    Rolling over only renames the file (e.g. app.log.20240615-120000), so the
+    logging thread never waits; a background thread then gzips the backup and
+    prunes the oldest ones. Backups left uncompressed by a previous run are
+    compressed on the next start.
+    """
+
+    def __init__(
+        self,
+        filename: Path,
+        max_bytes: int = MAX_BYTES,
+        max_age: timedelta = MAX_AGE,
+        backup_count: int = BACKUP_COUNT,
+        max_total_bytes: int = MAX_TOTAL_BYTES,
+    ):
+        super().__init__(filename, "a", encoding="utf-8", delay=True)
+        self.path = Path(self.baseFilename)
+        self.max_bytes = max_bytes
+        self.max_age = max_age.total_seconds()
+        self.backup_count = backup_count
+        self.max_total_bytes = max_total_bytes
+        self.retry_at = 0.0
+        self.queue: Queue[Path] = Queue()
+        self.worker: threading.Thread | None = None
+
+        # The active file was started by the last rollover
+        backups = self.backups()
+        started = self.stamp_time(backups[-1]) if backups else None
+        self.rollover_at = (started or time()) + self.max_age
+
+        for backup in backups:
+            if backup.suffix != ".gz":
+                self.submit(backup)
+
+    def backups(self) -> list[Path]:
+        """Rotated files, oldest first"""
+        return rotated_files(self.path)
+
+    def stamp_time(self, backup: Path) -> float | None:
+        stamp = backup.name[len(self.path.name) + 1 :][: len("YYYYmmdd-HHMMSS")]
+        try:
+            return mktime(strptime(stamp, STAMP_FORMAT))
+        except ValueError:
+            return None
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        now = time()
+        if now < self.retry_at:
+            return False
+        if now >= self.rollover_at:
+            return True
+
+        if self.stream is None:
+            self.stream = self._open()
+        # A single record larger than the limit still goes to an empty file
+        position = self.stream.tell()
+        size = position + len(self.format(record)) + len(self.terminator)
+        return position > 0 and size > self.max_bytes
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None  # type: ignore[assignment]
+
+        now = time()
+        target = self.path.with_name(
+            f"{self.path.name}.{strftime(STAMP_FORMAT, localtime(now))}"
+        )
+        counter = 1
+        while target.exists() or target.with_name(target.name + ".gz").exists():
+            target = target.with_name(f"{target.name.split('~')[0]}~{counter}")
+            counter += 1
+
+        try:
+            os.replace(self.path, target)
+        except FileNotFoundError:
+            self.rollover_at = now + self.max_age
+            return
+        except OSError:
+            # Held open by another process (Windows): keep appending for now
+            self.retry_at = now + RETRY_DELAY
+            return
+
+        self.rollover_at = now + self.max_age
+        self.submit(target)
+
+    def submit(self, backup: Path):
+        """Compress a rolled file on the background thread"""
+        self.queue.put(backup)
+        if self.worker is None or not self.worker.is_alive():
+            self.worker = threading.Thread(
+                target=self._compress_loop, name="log-compress", daemon=True
+            )
+            self.worker.start()
+
+    def wait(self):
+        """Block until the pending backups are compressed"""
+        self.queue.join()
+
+    def _compress_loop(self):
+        lower_thread_priority()
+        while True:
+            backup = self.queue.get()
+            try:
+                self.compress(backup)
+                self.prune()
+            except OSError:
+                pass  # Retried on the next start
+            finally:
+                self.queue.task_done()
+
+    def compress(self, backup: Path):
+        # Imported here only, so the command line client does not load it
+        import gzip
+
+        target = backup.with_name(backup.name + ".gz")
+        tmp_path = backup.with_name(backup.name + ".gz.tmp")
+        with backup.open("rb") as src, gzip.open(tmp_path, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, target)
+        backup.unlink()
+
+    def prune(self):
+        """
+        Delete the oldest backups beyond the count and total size caps
+        Backups still waiting to be compressed count too, at their full size.
+        """
+        backups = self.backups()
+        sizes = {}
+        for backup in backups:
+            with suppress(OSError):
+                sizes[backup] = backup.stat().st_size
+        backups = [b for b in backups if b in sizes]
+        total = sum(sizes.values())
+        while backups and (
+            len(backups) > self.backup_count or total > self.max_total_bytes
+        ):
+            oldest = backups.pop(0)
+            with suppress(OSError):
+                oldest.unlink()
+                total -= sizes[oldest]
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, event type and the event fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json_dumps(
+            {
+                "ts": datetime.fromtimestamp(record.created).astimezone().isoformat(),
+                "event": record.getMessage(),
+                **getattr(record, "fields", {}),
+            },
+            default=str,
+        )
+
+
+def log_event(event: str, **fields):
+    """
+    Record a structured event (e.g. a theme switch) in the JSONL sink
+    Args:
+        fields: JSON values; datetimes are written in ISO format
+    """
+    logger = logging.getLogger(EVENTS_LOGGER)
+    if logger.isEnabledFor(logging.INFO):
+        values = {
+            key: value.isoformat() if isinstance(value, datetime) else value
+            for key, value in fields.items()
+        }
+        logger.info(event, extra={"fields": values})
 
 
 class Logger:
@@ -27,15 +237,25 @@ class Logger:
         console_handler.setFormatter(self._formatter())
         logger.addHandler(console_handler)
 
-        # File Handler
-        file_handler = TimedRotatingFileHandler(
-            self.path, when="D", interval=30, backupCount=12
-        )
+        # File Handler (bounded by size and age, backups gzipped in background)
+        file_handler = BoundedRotatingFileHandler(self.path)
         file_handler.setFormatter(self._formatter())
         logger.addHandler(file_handler)
 
         return logger
 
+    def setup_event_log(self) -> logging.Logger:
+        """Structured events in self.path, rotated like the text log"""
+        logger = logging.getLogger(EVENTS_LOGGER)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+        file_handler = BoundedRotatingFileHandler(self.path)
+        file_handler.setFormatter(JsonFormatter())
+        logger.addHandler(file_handler)
+
+        return logger
+
     @classmethod
     def get_logger(cls, name: str) -> logging.Logger:
         return logging.getLogger(name)
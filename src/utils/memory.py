@@ -0,0 +1,68 @@
+import gc
+import os
+import sys
+from contextlib import suppress
+
+
+# Resident memory the application is expected to stay under once started,
+# overridable for constrained machines or slower debug builds
+RSS_BUDGET = int(os.environ.get("AUTOSWITCHTHEME_RSS_BUDGET_MB", "64")) * 1024 * 1024
+
+# Modules only needed to bootstrap the location (IP geolocation)
+NETWORK_MODULES = ("requests", "urllib3", "charset_normalizer", "idna", "certifi")
+
+
+def rss_bytes() -> int | None:
+    """
+    Resident set size of the current process (working set on Windows)
+    Returns:
+        None if the platform does not expose it
+    """
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(
+            process, ctypes.byref(counters), counters.cb
+        ):
+            return None
+        return counters.WorkingSetSize
+
+    with suppress(OSError, ValueError, IndexError), open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    return None
+
+
+def release_modules(*names: str) -> int:
+    """
+    Forget modules (and their submodules) that are no longer needed, so their
+    memory is reclaimed once nothing else references them
+    Returns:
+        number of modules released
+    """
+    released = [
+        module
+        for module in list(sys.modules)
+        if any(module == name or module.startswith(f"{name}.") for name in names)
+    ]
+    for module in released:
+        del sys.modules[module]
+    gc.collect()
+    return len(released)
@@ -1,13 +1,164 @@
-from os import environ, getlogin, name as os_name
+import sys
+from collections.abc import Mapping, Sequence
+from os import environ as os_environ, getlogin, name as os_name
 from pathlib import Path
+from tempfile import TemporaryFile
+from typing import NamedTuple
+
+
+APP_NAME = "AutoSwitchTheme"
+
+# Surcharges par variable d'environnement (ou option --data-dir, --user-dir,
+# --portable de la ligne de commande)
+ENV_DATA_DIR = "AUTOSWITCHTHEME_DATA_DIR"
+ENV_USER_DIR = "AUTOSWITCHTHEME_USER_DIR"
+ENV_PORTABLE = "AUTOSWITCHTHEME_PORTABLE"
+
+# Fichier posé à côté de l'exécutable pour activer le mode portable
+PORTABLE_MARKER = "portable"
+
+# Origine de l'arborescence résolue
+INSTALLED = "installed"
+PORTABLE = "portable"
+CUSTOM = "custom"
+PER_USER = "per-user"
+
+
+class Layout(NamedTuple):
+    """Arborescence de l'application, résolue une fois par processus"""
+
+    mode: str
+    app_dir: Path
+    data_dir: Path
+    user_dir: Path
+
+    def describe(self) -> dict[str, str]:
+        """Chemins résolus, pour les logs et la commande 'paths'"""
+        return {
+            "mode": self.mode,
+            "app": str(self.app_dir),
+            "data": str(self.data_dir),
+            "user": str(self.user_dir),
+            "config": str(self.data_dir / "config" / "settings.ini"),
+            "logs": str(self.data_dir / "logs"),
+        }
+
+
+def option(argv: Sequence[str], name: str) -> str | None:
+    """Valeur d'une option '--name value' ou '--name=value'"""
+    for index, arg in enumerate(argv):
+        if arg == name and index + 1 < len(argv):
+            return argv[index + 1]
+        if arg.startswith(f"{name}="):
+            return arg[len(name) + 1 :]
+    return None
+
+
+def executable_dir() -> Path:
+    """
+    Dossier de l'application : celui de l'exécutable une fois compilé
+    (Nuitka --onefile extrait les sources dans un dossier temporaire)
+    """
+    if getattr(sys, "frozen", False) or "__compiled__" in globals():
+        return Path(sys.argv[0]).resolve().parent
+    return Path(__file__).parent.parent.parent
+
+
+def default_data_dir(environ: Mapping[str, str]) -> Path:
+    """Répertoire des données de la machine (ProgramData)"""
+    if os_name == "nt":
+        return Path(environ.get("PROGRAMDATA", "C:/ProgramData")) / APP_NAME
+    return Path("/var/lib") / APP_NAME
+
+
+def default_user_dir(environ: Mapping[str, str]) -> Path:
+    """Répertoire des données utilisateur (AppData)"""
+    if os_name == "nt":
+        if (appdata_path := environ.get("APPDATA")) is not None:
+            base = Path(appdata_path)
+        else:
+            base = Path(f"C:/Users/{getlogin()}/AppData")
+    else:
+        base = Path.home() / ".config"
+    return base / APP_NAME
+
+
+def resolve_layout(
+    argv: Sequence[str] | None = None,
+    environ: Mapping[str, str] | None = None,
+    app_dir: Path | None = None,
+) -> Layout:
+    """
+    Arborescence demandée, sans toucher au disque
+    Priorité : mode portable, puis surcharges (ligne de commande avant
+    environnement), puis emplacements par défaut.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    environ = os_environ if environ is None else environ
+    app_dir = app_dir or executable_dir()
+
+    if (
+        "--portable" in argv
+        or environ.get(ENV_PORTABLE, "").lower() in ("1", "true", "yes")
+        or (app_dir / PORTABLE_MARKER).exists()
+    ):
+        return Layout(PORTABLE, app_dir, app_dir / "data", app_dir / "data")
+
+    data_dir = option(argv, "--data-dir") or environ.get(ENV_DATA_DIR)
+    user_dir = option(argv, "--user-dir") or environ.get(ENV_USER_DIR)
+    return Layout(
+        CUSTOM if data_dir or user_dir else INSTALLED,
+        app_dir,
+        Path(data_dir) if data_dir else default_data_dir(environ),
+        Path(user_dir) if user_dir else default_user_dir(environ),
+    )
+
+
+def writable(directory: Path) -> bool:
+    """Le répertoire existe (créé au besoin) et accepte un fichier"""
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        with TemporaryFile(dir=directory):
+            return True
+    except OSError:
+        return False
+
+
+def provision(layout: Layout) -> Layout:
+    """
+    Crée les répertoires de l'arborescence, une seule fois
+    Si les données de la machine ne sont pas accessibles en écriture (pas de
+    droits sur ProgramData), elles rejoignent les données de l'utilisateur.
+    """
+    layout.user_dir.mkdir(parents=True, exist_ok=True)
+    if not writable(layout.data_dir):
+        layout = layout._replace(mode=PER_USER, data_dir=layout.user_dir)
+    for directory in (layout.data_dir / "config", layout.data_dir / "logs"):
+        directory.mkdir(parents=True, exist_ok=True)
+    return layout
 
 
 class Paths:
     """Gestion des chemins de l'application"""
 
+    _layout: Layout | None = None
+
+    @staticmethod
+    def configure(
+        argv: Sequence[str] | None = None, environ: Mapping[str, str] | None = None
+    ) -> Layout:
+        """Résout et prépare l'arborescence (au démarrage, ou pour la changer)"""
+        Paths._layout = provision(resolve_layout(argv, environ))
+        return Paths._layout
+
+    @staticmethod
+    def layout() -> Layout:
+        """Arborescence résolue, au premier appel seulement"""
+        return Paths._layout or Paths.configure()
+
     @staticmethod
     def get_app_dir():
-        """Répertoire d'installation (Program Files)"""
+        """Répertoire des sources et des assets embarqués (Program Files)"""
         return Path(__file__).parent.parent.parent
 
     @staticmethod
@@ -18,44 +169,52 @@ class Paths:
     @staticmethod
     def get_data_dir():
         """Répertoire des données (ProgramData)"""
-        if os_name == "nt":
-            base = Path(environ.get("PROGRAMDATA", "C:/ProgramData"))
-        else:
-            base = Path("/var/lib")
-
-        data_dir = base / "AutoSwitchTheme"
-        data_dir.mkdir(parents=True, exist_ok=True)
-        return data_dir
+        return Paths.layout().data_dir
 
     @staticmethod
     def get_user_data_dir():
         """Répertoire des données utilisateur (AppData)"""
-        if os_name == "nt":
-            if (appdata_path := environ.get("APPDATA")) is not None:
-                base = Path(appdata_path)
-            else:
-                username = getlogin()
-                base = Path(f"C:/Users/{username}/AppData")
-        else:
-            base = Path.home() / ".config"
+        return Paths.layout().user_dir
+
+    @staticmethod
+    def get_state_file():
+        """Fichier d'état de l'utilisateur (persisté entre deux lancements)"""
+        return Paths.get_user_data_dir() / "state.json"
+
+    @staticmethod
+    def get_schedule_file():
+        """Calendrier des prochaines bascules exporté depuis le menu"""
+        return Paths.get_user_data_dir() / "schedule.ics"
+
+    @staticmethod
+    def get_wallpaper_dir():
+        """Fonds d'écran préparés à la taille de l'écran, par utilisateur"""
+        return Paths.get_user_data_dir() / "wallpapers"
 
-        user_dir = base / "AutoSwitchTheme"
-        user_dir.mkdir(parents=True, exist_ok=True)
-        return user_dir
+    @staticmethod
+    def get_network_state_file():
+        """État du disjoncteur réseau (échecs consécutifs, prochain essai)"""
+        return Paths.get_data_dir() / "network.json"
+
+    @staticmethod
+    def get_weather_file():
+        """Prévision de couverture nuageuse en cache (partagée par la machine)"""
+        return Paths.get_data_dir() / "weather.json"
 
     @staticmethod
     def get_config_file():
         """Fichier de configuration partagé"""
-        base = Paths.get_data_dir() / "config"
-        base.mkdir(parents=True, exist_ok=True)
-        return base / "settings.ini"
+        return Paths.get_data_dir() / "config" / "settings.ini"
 
     @staticmethod
     def get_log_file():
         """Fichier de log"""
-        log_dir = Paths.get_data_dir() / "logs"
-        log_dir.mkdir(parents=True, exist_ok=True)
-        return log_dir / "app.log"
+        return Paths.get_data_dir() / "logs" / "app.log"
+
+    @staticmethod
+    def get_event_log_file():
+        """Journal des événements structurés (JSON lines)"""
+        return Paths.get_log_file().with_name("events.jsonl")
 
 
 # Utilisation
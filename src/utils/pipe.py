@@ -0,0 +1,121 @@
+"""Named pipe listener open to the other sessions of the machine (Windows only)"""
+
+import _winapi
+import ctypes
+from ctypes import wintypes
+from multiprocessing.connection import PipeConnection
+
+
+# Full control for the system and the administrators, read/write for any
+# signed-in user (the session agents). Without it the pipe gets the default
+# DACL, read only for Everyone, and agents are denied when they connect.
+SHARED_PIPE_SDDL = "D:(A;;GA;;;SY)(A;;GA;;;BA)(A;;GRGW;;;AU)"
+
+# Buffer size of each pipe instance, as in multiprocessing
+BUFSIZE = 8192
+
+SDDL_REVISION_1 = 1
+INVALID_HANDLE_VALUE = wintypes.HANDLE(-1).value
+
+
+class SecurityAttributes(ctypes.Structure):
+    _fields_ = [
+        ("nLength", wintypes.DWORD),
+        ("lpSecurityDescriptor", wintypes.LPVOID),
+        ("bInheritHandle", wintypes.BOOL),
+    ]
+
+
+kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+kernel32.CreateNamedPipeW.restype = wintypes.HANDLE
+kernel32.CreateNamedPipeW.argtypes = [
+    wintypes.LPCWSTR,
+    wintypes.DWORD,
+    wintypes.DWORD,
+    wintypes.DWORD,
+    wintypes.DWORD,
+    wintypes.DWORD,
+    wintypes.DWORD,
+    ctypes.POINTER(SecurityAttributes),
+]
+kernel32.LocalFree.argtypes = [wintypes.LPVOID]
+
+advapi32 = ctypes.WinDLL("advapi32", use_last_error=True)
+advapi32.ConvertStringSecurityDescriptorToSecurityDescriptorW.argtypes = [
+    wintypes.LPCWSTR,
+    wintypes.DWORD,
+    ctypes.POINTER(wintypes.LPVOID),
+    ctypes.POINTER(wintypes.ULONG),
+]
+
+
+class SharedPipeListener:
+    """
+    Listener of a named pipe, as multiprocessing opens it (message mode,
+    overlapped), but created with an explicit security descriptor
+    Raises:
+        OSError: if the descriptor or the pipe cannot be created
+    """
+
+    def __init__(self, address: str, sddl: str = SHARED_PIPE_SDDL):
+        self.address = address
+        self._descriptor = wintypes.LPVOID()
+        if not advapi32.ConvertStringSecurityDescriptorToSecurityDescriptorW(
+            sddl, SDDL_REVISION_1, ctypes.byref(self._descriptor), None
+        ):
+            raise ctypes.WinError(ctypes.get_last_error())
+        self._attributes = SecurityAttributes(
+            ctypes.sizeof(SecurityAttributes), self._descriptor, False
+        )
+        self._pending = [self._new_handle(first=True)]
+
+    def _new_handle(self, first: bool = False) -> int:
+        flags = _winapi.PIPE_ACCESS_DUPLEX | _winapi.FILE_FLAG_OVERLAPPED
+        if first:
+            flags |= _winapi.FILE_FLAG_FIRST_PIPE_INSTANCE
+        handle = kernel32.CreateNamedPipeW(
+            self.address,
+            flags,
+            _winapi.PIPE_TYPE_MESSAGE
+            | _winapi.PIPE_READMODE_MESSAGE
+            | _winapi.PIPE_WAIT,
+            _winapi.PIPE_UNLIMITED_INSTANCES,
+            BUFSIZE,
+            BUFSIZE,
+            _winapi.NMPWAIT_WAIT_FOREVER,
+            ctypes.byref(self._attributes),
+        )
+        if handle is None or handle == INVALID_HANDLE_VALUE:
+            raise ctypes.WinError(ctypes.get_last_error())
+        return handle
+
+    def accept(self) -> PipeConnection:
+        """Wait for the next client, while a new instance waits for the one after"""
+        self._pending.append(self._new_handle())
+        handle = self._pending.pop(0)
+        try:
+            overlapped = _winapi.ConnectNamedPipe(handle, overlapped=True)
+        except OSError as e:
+            # The client may have connected, written and left already
+            if e.winerror != _winapi.ERROR_NO_DATA:
+                _winapi.CloseHandle(handle)
+                raise
+        else:
+            try:
+                _winapi.WaitForMultipleObjects(
+                    [overlapped.event], False, _winapi.INFINITE
+                )
+            except BaseException:
+                overlapped.cancel()
+                _winapi.CloseHandle(handle)
+                raise
+            finally:
+                overlapped.GetOverlappedResult(True)
+        return PipeConnection(handle)
+
+    def close(self):
+        while self._pending:
+            _winapi.CloseHandle(self._pending.pop())
+        if self._descriptor:
+            kernel32.LocalFree(self._descriptor)
+            self._descriptor = wintypes.LPVOID()
@@ -0,0 +1,33 @@
+import os
+import sys
+import threading
+from contextlib import suppress
+
+
+# Win32 THREAD_PRIORITY_IDLE and the lowest POSIX nice value
+THREAD_PRIORITY_IDLE = -15
+NICE_LOWEST = 19
+
+
+def lower_thread_priority() -> bool:
+    """
+    Run the calling thread at idle priority, so background work never
+    competes with the foreground
+    Returns:
+        True if the priority was lowered
+    """
+    if sys.platform == "win32":
+        from ctypes import windll
+
+        kernel32 = windll.kernel32
+        return bool(
+            kernel32.SetThreadPriority(
+                kernel32.GetCurrentThread(), THREAD_PRIORITY_IDLE
+            )
+        )
+
+    # On Linux a thread id is a valid PRIO_PROCESS target for that thread only
+    with suppress(AttributeError, OSError):
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), NICE_LOWEST)
+        return True
+    return False
@@ -0,0 +1,41 @@
+import os
+import threading
+from json import JSONDecodeError, dump as json_dump, load as json_load
+from pathlib import Path
+from typing import Any
+
+
+class StateStore:
+    """Small JSON key/value store persisted across restarts"""
+
+    __slots__ = ("_data", "_lock", "path")
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data: dict[str, Any] = self._read()
+
+    def _read(self) -> dict[str, Any]:
+        try:
+            with self.path.open("r") as f:
+                data = json_load(f)
+        except (OSError, JSONDecodeError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._data.get(key, default)
+
+    def set(self, key: str, value: Any):
+        """Set a value and persist the store (None removes the key)"""
+        with self._lock:
+            if value is None:
+                self._data.pop(key, None)
+            else:
+                self._data[key] = value
+
+            # Write aside then replace, so a crash never leaves a torn file
+            tmp_path = self.path.with_suffix(".tmp")
+            with tmp_path.open("w") as f:
+                json_dump(self._data, f)
+            os.replace(tmp_path, self.path)
@@ -1,10 +1,11 @@
 import pytest
-import schedule
+
+from src.core.scheduler import scheduler
 
 
 @pytest.fixture(autouse=True)
-def clear_schedule_jobs():
-    """Clear all schedule jobs before and after each test to prevent leakage."""
-    schedule.clear()
+def clear_scheduler_jobs():
+    """Clear all scheduler jobs before and after each test to prevent leakage."""
+    scheduler.clear()
     yield
-    schedule.clear()
+    scheduler.clear()
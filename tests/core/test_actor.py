@@ -0,0 +1,157 @@
+import threading
+
+import pytest
+
+from src.core.actor import ThemeActor, serialized
+
+
+@pytest.fixture
+def actor():
+    actor = ThemeActor()
+    actor.start()
+    yield actor
+    actor.stop(timeout=5)
+
+
+def blocked(actor: ThemeActor) -> threading.Event:
+    """Keep the actor busy until the returned event is set"""
+    started, release = threading.Event(), threading.Event()
+    actor.submit(lambda: started.set() or release.wait(5))
+    started.wait(5)
+    return release
+
+
+class Monitor:
+    def __init__(self, actor: ThemeActor | None):
+        self.actor = actor
+        self.threads: list[str] = []
+
+    @serialized("switch")
+    def switch_to_theme(self, theme: str) -> str:
+        self.threads.append(threading.current_thread().name)
+        return theme
+
+
+# ─── ThemeActor ───────────────────────────────────────────────────────────────
+
+
+class TestCall:
+    def test_runs_on_the_actor_thread(self, actor):
+        assert actor.call(lambda: threading.current_thread().name) == "theme-actor"
+
+    def test_commands_run_in_order(self, actor):
+        done = []
+        release = blocked(actor)
+        futures = [actor.submit(lambda n=n: done.append(n)) for n in range(3)]
+        release.set()
+        for future in futures:
+            future.result(5)
+        assert done == [0, 1, 2]
+
+    def test_nested_call_runs_inline(self, actor):
+        assert actor.call(lambda: actor.call(lambda: 42)) == 42
+
+    def test_inline_while_not_running(self):
+        actor = ThemeActor()
+        assert actor.call(threading.current_thread) is threading.current_thread()
+
+    def test_errors_reach_the_caller(self, actor):
+        def fail():
+            raise ValueError("bad mode")
+
+        with pytest.raises(ValueError, match="bad mode"):
+            actor.call(fail)
+        # The actor survives the failed command
+        assert actor.call(lambda: 1) == 1
+
+
+class TestCollapse:
+    def test_only_the_last_target_runs(self, actor):
+        done = []
+        release = blocked(actor)
+        first = actor.submit(lambda: done.append("light") or "light", key="switch")
+        last = actor.submit(lambda: done.append("dark") or "dark", key="switch")
+        release.set()
+
+        assert first is last
+        assert last.result(5) == "dark"
+        assert done == ["dark"]
+        assert actor.status()["collapsed"] == 1
+
+    def test_replacement_is_queued_last(self, actor):
+        done = []
+        release = blocked(actor)
+        actor.submit(lambda: done.append("force"), key="override")
+        actor.submit(lambda: done.append("switch"), key="switch")
+        actor.submit(lambda: done.append("resume"), key="override")
+        release.set()
+        actor.stop(timeout=5)
+        assert done == ["switch", "resume"]
+
+    def test_commands_without_key_never_collapse(self, actor):
+        done = []
+        release = blocked(actor)
+        actor.submit(lambda: done.append(1))
+        actor.submit(lambda: done.append(2))
+        release.set()
+        actor.stop(timeout=5)
+        assert done == [1, 2]
+
+
+class TestLifecycle:
+    def test_stop_runs_the_queued_commands(self, actor):
+        done = []
+        release = blocked(actor)
+        actor.submit(lambda: done.append(1))
+        release.set()
+        actor.stop(timeout=5)
+        assert done == [1]
+
+    def test_submit_after_stop(self, actor):
+        actor.stop(timeout=5)
+        with pytest.raises(RuntimeError):
+            actor.submit(lambda: None)
+
+
+class TestStatus:
+    def test_depth_and_latency(self, actor):
+        release = blocked(actor)
+        actor.submit(lambda: None)
+        assert actor.status()["depth"] == 1
+        release.set()
+        actor.stop(timeout=5)
+
+        status = actor.status()
+        assert status["runs"] == 2
+        assert status["depth"] == 0
+        assert status["max_depth"] == 1
+        assert status["max"] >= status["mean"] >= 0
+
+
+# ─── serialized ───────────────────────────────────────────────────────────────
+
+
+class TestSerialized:
+    def test_runs_on_the_actor_of_the_object(self, actor):
+        monitor = Monitor(actor)
+        assert monitor.switch_to_theme("dark") == "dark"
+        assert monitor.threads == ["theme-actor"]
+
+    def test_inline_without_actor(self):
+        monitor = Monitor(None)
+        monitor.switch_to_theme("dark")
+        assert monitor.threads == [threading.current_thread().name]
+
+    def test_concurrent_callers_are_serialized(self, actor):
+        monitor = Monitor(actor)
+        callers = [
+            threading.Thread(target=monitor.switch_to_theme, args=(theme,))
+            for theme in ("light", "dark") * 10
+        ]
+        for caller in callers:
+            caller.start()
+        for caller in callers:
+            caller.join(5)
+        assert set(monitor.threads) == {"theme-actor"}
+        status = actor.status()
+        assert status["runs"] + status["collapsed"] == len(callers)
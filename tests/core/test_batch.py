@@ -0,0 +1,163 @@
+import csv
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+
+from src.core.batch import (
+    FIELDS,
+    Location,
+    bounded_map,
+    check_locations,
+    generate,
+    location_rows,
+    parse_location,
+    read_locations,
+    write_csv,
+    write_jsonl,
+)
+from src.core.ephemeris import day_ephemeris
+
+
+PARIS = Location("Paris", 48.8333, 2.33333, "Europe/Paris")
+TROMSO = Location("Tromso", 69.6496, 18.956, "Europe/Oslo")
+START = date(2024, 6, 20)
+
+
+# ─── read_locations ──────────────────────────────────────────────────────────
+
+
+class TestReadLocations:
+    def test_csv(self, tmp_path):
+        path = tmp_path / "offices.csv"
+        path.write_text(
+            "name,latitude,longitude,timezone\nParis,48.8333,2.33333,Europe/Paris\n"
+        )
+        assert list(read_locations(path)) == [PARIS]
+
+    def test_json(self, tmp_path):
+        path = tmp_path / "offices.json"
+        path.write_text(json.dumps([PARIS._asdict(), TROMSO._asdict()]))
+        assert list(read_locations(path)) == [PARIS, TROMSO]
+
+    def test_check_counts_valid_locations(self, tmp_path):
+        path = tmp_path / "offices.json"
+        path.write_text(json.dumps([PARIS._asdict(), TROMSO._asdict()]))
+        assert check_locations(path) == 2
+
+    def test_check_finds_a_late_invalid_record(self, tmp_path):
+        path = tmp_path / "offices.csv"
+        path.write_text(
+            "name,latitude,longitude,timezone\n"
+            "Paris,48.8333,2.33333,Europe/Paris\n"
+            "Nowhere,north,0,UTC\n"
+        )
+        with pytest.raises(ValueError, match="Nowhere"):
+            check_locations(path)
+
+    def test_invalid_record(self):
+        with pytest.raises(ValueError, match="Invalid location"):
+            parse_location({"name": "Nowhere", "latitude": "north"})
+
+    def test_unknown_timezone(self):
+        record = {**PARIS._asdict(), "timezone": "Europe/Pariss"}
+        with pytest.raises(ValueError, match="Europe/Pariss"):
+            parse_location(record)
+
+
+# ─── location_rows ───────────────────────────────────────────────────────────
+
+
+class TestLocationRows:
+    def test_one_row_per_day(self):
+        rows = location_rows(PARIS, START, 3)
+        assert [row["date"] for row in rows] == [
+            "2024-06-20",
+            "2024-06-21",
+            "2024-06-22",
+        ]
+        assert set(rows[0]) == set(FIELDS)
+
+    def test_matches_day_ephemeris(self):
+        (row,) = location_rows(PARIS, START, 1)
+        expected = day_ephemeris(*PARIS[1:], START)
+        assert row["light"] == expected.light.isoformat(timespec="seconds")
+        assert row["kind"] == "normal"
+
+    def test_polar_day_has_no_instants(self):
+        (row,) = location_rows(TROMSO, START, 1)
+        assert row == {
+            "location": "Tromso",
+            "date": "2024-06-20",
+            "kind": "polar_day",
+            "light": None,
+            "dark": None,
+        }
+
+
+# ─── generate ────────────────────────────────────────────────────────────────
+
+
+class TestGenerate:
+    def test_rows_are_grouped_by_location(self):
+        rows = list(generate([PARIS, TROMSO], START, 2))
+        assert [row["location"] for row in rows] == ["Paris"] * 2 + ["Tromso"] * 2
+
+    def test_process_pool_gives_the_same_rows(self):
+        locations = [PARIS, TROMSO, PARIS._replace(name="Paris 2")]
+        assert list(generate(locations, START, 5, workers=2)) == list(
+            generate(locations, START, 5)
+        )
+
+    def test_input_is_consumed_lazily(self):
+        consumed = []
+
+        def locations():
+            for location in (PARIS, TROMSO):
+                consumed.append(location.name)
+                yield location
+
+        rows = generate(locations(), START, 1)
+        next(rows)
+        assert consumed == ["Paris"]
+
+
+class TestBoundedMap:
+    def test_keeps_order(self):
+        with ThreadPoolExecutor(4) as executor:
+            assert list(bounded_map(executor, lambda x: x * 2, range(10), 3)) == [
+                x * 2 for x in range(10)
+            ]
+
+    def test_limits_tasks_in_flight(self):
+        submitted = []
+
+        def items():
+            for k in range(100):
+                submitted.append(k)
+                yield k
+
+        with ThreadPoolExecutor(2) as executor:
+            results = bounded_map(executor, lambda x: x, items(), 4)
+            next(results)
+        assert len(submitted) == 4
+
+
+# ─── writers ─────────────────────────────────────────────────────────────────
+
+
+class TestWriters:
+    def test_csv(self):
+        output = io.StringIO()
+        assert write_csv(location_rows(PARIS, START, 2), output) == 2
+        output.seek(0)
+        rows = list(csv.DictReader(output))
+        assert rows[1]["date"] == "2024-06-21"
+
+    def test_jsonl(self):
+        output = io.StringIO()
+        assert write_jsonl(location_rows(TROMSO, START, 2), output) == 2
+        lines = output.getvalue().splitlines()
+        assert json.loads(lines[0])["kind"] == "polar_day"
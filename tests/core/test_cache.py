@@ -0,0 +1,197 @@
+import json
+import threading
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from src.core.cache import EphemerisCache, decode_day, encode_day
+from src.core.ephemeris import DayEphemeris, day_ephemeris
+from src.core.timeline import POLAR_DAY
+
+
+PARIS = ZoneInfo("Europe/Paris")
+KEY = "48.8333,2.33333,Europe/Paris,-0.833,-0.833"
+TODAY = date.today()
+
+
+def compute(day: date) -> DayEphemeris:
+    return day_ephemeris(48.8333, 2.33333, "Europe/Paris", day)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return EphemerisCache(tmp_path / "ephemeris.json")
+
+
+# ─── encoding ────────────────────────────────────────────────────────────────
+
+
+class TestEncoding:
+    def test_round_trip_keeps_instants(self):
+        ephemeris = compute(date(2024, 6, 15))
+        decoded = decode_day(ephemeris.day, encode_day(ephemeris))
+        assert decoded == ephemeris
+        assert decoded.light.strftime("%H:%M") == ephemeris.light.strftime("%H:%M")
+
+    def test_round_trip_polar_day(self):
+        ephemeris = DayEphemeris(date(2024, 6, 21), None, None, POLAR_DAY)
+        assert decode_day(ephemeris.day, encode_day(ephemeris)) == ephemeris
+
+    def test_instants_keep_local_wall_time(self, cache):
+        (ephemeris,) = cache.get_or_compute(KEY, date(2024, 6, 15), 1, compute)
+        (cached,) = cache.get(KEY, date(2024, 6, 15))
+        assert cached.light.astimezone(PARIS) == ephemeris.light
+        assert isinstance(cached.light, datetime)
+
+
+# ─── get_or_compute ──────────────────────────────────────────────────────────
+
+
+class TestGetOrCompute:
+    def test_empty_cache_misses(self, cache):
+        assert cache.get(KEY, TODAY) is None
+
+    def test_computes_and_shares_the_range(self, cache):
+        result = cache.get_or_compute(KEY, TODAY, 3, compute)
+        assert [e.day for e in result] == [TODAY + timedelta(days=k) for k in range(3)]
+        assert cache.get(KEY, TODAY, 3) == result
+
+    def test_second_call_does_not_compute(self, cache, tmp_path):
+        cache.get_or_compute(KEY, TODAY, 2, compute)
+        other = EphemerisCache(tmp_path / "ephemeris.json")
+        with patch(f"{__name__}.compute") as mock_compute:
+            other.get_or_compute(KEY, TODAY, 2, mock_compute)
+        mock_compute.assert_not_called()
+
+    def test_computes_only_missing_days(self, cache):
+        cache.get_or_compute(KEY, TODAY, 2, compute)
+        computed = []
+
+        def tracked(day):
+            computed.append(day)
+            return compute(day)
+
+        cache.get_or_compute(KEY, TODAY, 4, tracked)
+        assert computed == [TODAY + timedelta(days=2), TODAY + timedelta(days=3)]
+
+    def test_keys_are_independent(self, cache):
+        cache.get_or_compute(KEY, TODAY, 1, compute)
+        assert cache.get("0.0,0.0,UTC,-0.833,-0.833", TODAY) is None
+        assert cache.get(KEY, TODAY) is not None
+
+    def test_drops_past_days(self, cache, tmp_path):
+        cache.get_or_compute(KEY, TODAY - timedelta(days=10), 1, compute)
+        cache.get_or_compute(KEY, TODAY, 1, compute)
+        saved = json.loads((tmp_path / "ephemeris.json").read_text())
+        assert list(saved["entries"][KEY]) == [TODAY.isoformat()]
+
+    def test_no_temporary_file_left(self, cache, tmp_path):
+        cache.get_or_compute(KEY, TODAY, 1, compute)
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "ephemeris.json",
+            "ephemeris.json.lock",
+        ]
+
+    def test_corrupted_file_is_recomputed(self, cache, tmp_path):
+        (tmp_path / "ephemeris.json").write_text("{not json")
+        result = cache.get_or_compute(KEY, TODAY, 1, compute)
+        assert result == [compute(TODAY)]
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {"light": "not a date", "dark": None, "kind": "normal"},
+            {"light": None, "dark": None},
+            "garbage",
+        ],
+    )
+    def test_malformed_entry_is_recomputed(self, cache, tmp_path, data):
+        (tmp_path / "ephemeris.json").write_text(
+            json.dumps({"version": 1, "entries": {KEY: {TODAY.isoformat(): data}}})
+        )
+        assert cache.get(KEY, TODAY) is None
+        assert cache.get_or_compute(KEY, TODAY, 1, compute) == [compute(TODAY)]
+        # Replaced by the computed day
+        assert cache.get(KEY, TODAY) == [compute(TODAY)]
+
+    def test_malformed_location_is_ignored(self, cache, tmp_path):
+        (tmp_path / "ephemeris.json").write_text(
+            json.dumps({"version": 1, "entries": {KEY: ["garbage"]}})
+        )
+        assert cache.get_or_compute(KEY, TODAY, 1, compute) == [compute(TODAY)]
+
+    def test_locked_cache_computes_without_writing(self, cache, tmp_path):
+        with (
+            patch("src.core.cache.LOCK_TIMEOUT", 0),
+            EphemerisCache(tmp_path / "ephemeris.json").lock,
+        ):
+            result = cache.get_or_compute(KEY, TODAY, 1, compute)
+
+        assert result == [compute(TODAY)]
+        assert not (tmp_path / "ephemeris.json").exists()
+
+    def test_unopenable_lock_computes_without_cache(self, cache, tmp_path):
+        # A folder where the lock file should be cannot be opened
+        (tmp_path / "ephemeris.json.lock").mkdir()
+        result = cache.get_or_compute(KEY, TODAY, 1, compute)
+
+        assert result == [compute(TODAY)]
+        assert not (tmp_path / "ephemeris.json").exists()
+
+    def test_write_error_still_returns_days(self, cache):
+        with (
+            patch("src.core.cache.os.replace", side_effect=PermissionError),
+            patch("src.core.cache.sleep"),
+        ):
+            result = cache.get_or_compute(KEY, TODAY, 1, compute)
+        assert result == [compute(TODAY)]
+
+
+# ─── concurrency ─────────────────────────────────────────────────────────────
+
+
+class TestConcurrentSessions:
+    def test_each_day_is_computed_once(self, tmp_path):
+        computed = []
+        barrier = threading.Barrier(8)
+
+        def slow_compute(day):
+            computed.append(day)
+            return compute(day)
+
+        def session():
+            barrier.wait()
+            EphemerisCache(tmp_path / "ephemeris.json").get_or_compute(
+                KEY, TODAY, 7, slow_compute
+            )
+
+        threads = [threading.Thread(target=session) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(computed) == [TODAY + timedelta(days=k) for k in range(7)]
+
+    def test_readers_never_see_a_torn_file(self, tmp_path):
+        writer = EphemerisCache(tmp_path / "ephemeris.json")
+        writer.get_or_compute(KEY, TODAY, 1, compute)
+        stop = threading.Event()
+        errors = []
+
+        def read():
+            reader = EphemerisCache(tmp_path / "ephemeris.json")
+            while not stop.is_set():
+                if reader.get(KEY, TODAY) is None:
+                    errors.append("miss")
+
+        thread = threading.Thread(target=read)
+        thread.start()
+        for k in range(1, 30):
+            writer.get_or_compute(KEY, TODAY + timedelta(days=k), 1, compute)
+        stop.set()
+        thread.join()
+
+        assert errors == []
@@ -0,0 +1,152 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from src.core.actor import ThemeActor
+from src.core.control import Controller
+from src.core.hooks import Hook, HookRunner
+from src.utils.breaker import CircuitBreaker
+
+
+@pytest.fixture
+def tray_app():
+    tray_app = MagicMock()
+    tray_app.running = True
+    tray_app.theme_monitor.theme = "light"
+    tray_app.theme_monitor.override.is_active.return_value = False
+    tray_app.theme_monitor.sun_hours = {
+        "timestamp": "2024-06-15",
+        "sunrise": "07:00",
+        "sunset": "20:00",
+    }
+    tray_app.network = None
+    tray_app.theme_monitor.hooks = None
+    tray_app.theme_monitor.actor = None
+    return tray_app
+
+
+@pytest.fixture
+def controller(tray_app):
+    return Controller(tray_app)
+
+
+class TestHandle:
+    def test_unknown_command_is_rejected(self, controller):
+        response = controller.handle({"cmd": "bogus"})
+        assert response["ok"] is False
+
+    def test_activate_is_acknowledged(self, controller):
+        response = controller.handle({"cmd": "activate", "args": ["--flag"]})
+        assert response == {"ok": True, "running": True}
+
+    def test_commands_need_a_monitor(self, controller, tray_app):
+        tray_app.theme_monitor = None
+        for cmd in ("status", "resume", "next"):
+            assert controller.handle({"cmd": cmd})["ok"] is False
+
+
+class TestStatus:
+    def test_reports_theme_and_sun_hours(self, controller):
+        response = controller.handle({"cmd": "status"})
+        assert response == {
+            "ok": True,
+            "theme": "light",
+            "sunrise": "07:00",
+            "sunset": "20:00",
+            "override": None,
+            "network": None,
+            "hooks": None,
+            "actor": None,
+        }
+
+    def test_reports_active_override(self, controller, tray_app):
+        tray_app.theme_monitor.override.is_active.return_value = True
+        tray_app.theme_monitor.override.describe.return_value = "Dark for 0h 30m"
+        response = controller.handle({"cmd": "status"})
+        assert response["override"] == "Dark for 0h 30m"
+
+    def test_reports_network_circuit(self, controller, tray_app):
+        tray_app.network = CircuitBreaker()
+        tray_app.network.record_failure()
+        network = controller.handle({"cmd": "status"})["network"]
+        assert network["state"] == "open"
+        assert network["failures"] == 1
+
+    def test_reports_hook_metrics(self, controller, tray_app):
+        tray_app.theme_monitor.hooks = HookRunner([Hook("editor", "true")])
+        hooks = controller.handle({"cmd": "status"})["hooks"]
+        assert hooks["editor"]["runs"] == 0
+
+    def test_reports_actor_metrics(self, controller, tray_app):
+        tray_app.theme_monitor.actor = ThemeActor()
+        actor = controller.handle({"cmd": "status"})["actor"]
+        assert actor["runs"] == 0
+        assert actor["depth"] == 0
+
+
+class TestForce:
+    def test_force_light_until_next_switch(self, controller, tray_app):
+        controller.handle({"cmd": "force", "args": ["light"]})
+        tray_app.theme_monitor.set_override.assert_called_once_with(
+            "light", "next", None
+        )
+
+    def test_force_dark_for_duration(self, controller, tray_app):
+        controller.handle({"cmd": "force", "args": ["dark", "duration", 30]})
+        tray_app.theme_monitor.set_override.assert_called_once_with(
+            "dark", "duration", 30
+        )
+
+    def test_invalid_theme_is_rejected(self, controller, tray_app):
+        response = controller.handle({"cmd": "force", "args": ["blue"]})
+        assert response["ok"] is False
+        tray_app.theme_monitor.set_override.assert_not_called()
+
+    def test_invalid_mode_is_reported(self, controller, tray_app):
+        tray_app.theme_monitor.set_override.side_effect = ValueError("bad mode")
+        response = controller.handle({"cmd": "force", "args": ["dark", "bogus"]})
+        assert response == {"ok": False, "error": "bad mode"}
+
+
+class TestResume:
+    def test_ends_override(self, controller, tray_app):
+        controller.handle({"cmd": "resume"})
+        tray_app.theme_monitor.end_override.assert_called_once()
+
+
+class TestNext:
+    def test_reports_next_transition(self, controller, tray_app):
+        paris = ZoneInfo("Europe/Paris")
+        tray_app.theme_monitor.now.return_value = datetime(
+            2024, 6, 15, 12, tzinfo=paris
+        )
+        response = controller.handle({"cmd": "next"})
+        assert response == {
+            "ok": True,
+            "at": "2024-06-15T20:00+02:00",
+            "theme": "dark",
+        }
+
+
+class TestLocation:
+    def test_returns_location_and_thresholds(self, controller, tray_app):
+        tray_app.theme_monitor.city.latitude = 48.8
+        tray_app.theme_monitor.city.longitude = 2.3
+        tray_app.theme_monitor.city.timezone = "Europe/Paris"
+        tray_app.theme_monitor.light_elevation = -0.833
+        tray_app.theme_monitor.dark_elevation = -6.0
+
+        assert controller.handle({"cmd": "location"}) == {
+            "ok": True,
+            "latitude": 48.8,
+            "longitude": 2.3,
+            "timezone": "Europe/Paris",
+            "light_elevation": -0.833,
+            "dark_elevation": -6.0,
+        }
+
+    def test_needs_a_monitor(self, controller, tray_app):
+        tray_app.theme_monitor = None
+        assert controller.handle({"cmd": "location"})["ok"] is False
@@ -0,0 +1,156 @@
+from datetime import date, timedelta
+
+import pytest
+from astral import LocationInfo
+from astral.sun import dawn, dusk, sun
+
+from src.core.ephemeris import (
+    MIN_PERIOD,
+    day_ephemeris,
+    precompute,
+    range_ephemeris,
+    solar_elevations,
+    solve_bracket,
+)
+from src.core.timeline import NORMAL, POLAR_DAY, POLAR_NIGHT
+
+
+LOCATIONS = [
+    LocationInfo("Paris", "France", "Europe/Paris", 48.8333, 2.33333),
+    LocationInfo("New York", "USA", "America/New_York", 40.7128, -74.006),
+    LocationInfo("Sydney", "Australia", "Australia/Sydney", -33.8688, 151.2093),
+]
+TROMSO = LocationInfo("Tromso", "Norway", "Europe/Oslo", 69.6496, 18.956)
+DAYS = [date(2024, 1, 1) + timedelta(days=k) for k in range(0, 366, 15)]
+
+
+def ephemeris_of(city: LocationInfo, day: date, light=-0.833, dark=-0.833):
+    return day_ephemeris(city.latitude, city.longitude, city.timezone, day, light, dark)
+
+
+# ─── solve_bracket ───────────────────────────────────────────────────────────
+
+
+class TestSolveBracket:
+    def test_finds_root_within_tolerance(self):
+        root = solve_bracket(lambda x: x * x - 2, 0.0, 2.0, -2.0, 2.0, 1e-9)
+        assert root == pytest.approx(2**0.5, abs=1e-9)
+
+    def test_decreasing_function(self):
+        root = solve_bracket(lambda x: 3 - x, 0.0, 10.0, 3.0, -7.0, 1e-9)
+        assert root == pytest.approx(3.0, abs=1e-9)
+
+
+# ─── solar_elevations ────────────────────────────────────────────────────────
+
+
+class TestSolarElevations:
+    def test_batch_matches_single_calls(self):
+        instants = [1718445600.0 + k * 3600 for k in range(24)]
+        batch = solar_elevations(48.8, 2.3, instants)
+        assert batch == [solar_elevations(48.8, 2.3, [ts])[0] for ts in instants]
+
+    def test_noon_is_higher_than_midnight(self):
+        # 2024-06-15 at 12:00 and 00:00 UTC in Paris
+        noon, midnight = solar_elevations(48.8, 2.3, [1718452800.0, 1718409600.0])
+        assert noon > 60 > 0 > midnight
+
+
+# ─── day_ephemeris ───────────────────────────────────────────────────────────
+
+
+@pytest.mark.parametrize("city", LOCATIONS, ids=lambda c: c.name)
+class TestDayEphemeris:
+    def test_matches_astral_sunrise_and_sunset(self, city):
+        for day in DAYS:
+            expected = sun(city.observer, date=day, tzinfo=city.tzinfo)
+            result = ephemeris_of(city, day)
+            assert abs((result.light - expected["sunrise"]).total_seconds()) < 60
+            assert abs((result.dark - expected["sunset"]).total_seconds()) < 60
+
+    def test_matches_astral_civil_twilight(self, city):
+        for day in DAYS:
+            result = ephemeris_of(city, day, -6.0, -6.0)
+            light = dawn(city.observer, date=day, tzinfo=city.tzinfo)
+            dark = dusk(city.observer, date=day, tzinfo=city.tzinfo)
+            assert abs((result.light - light).total_seconds()) < 60
+            assert abs((result.dark - dark).total_seconds()) < 60
+
+    def test_positive_threshold_narrows_the_day(self, city):
+        for day in DAYS:
+            horizon, room_light = ephemeris_of(city, day), ephemeris_of(city, day, 6, 6)
+            assert horizon.light < room_light.light < room_light.dark < horizon.dark
+
+    def test_instants_are_in_location_timezone(self, city):
+        result = ephemeris_of(city, DAYS[0])
+        assert result.light.tzinfo == city.tzinfo
+        assert result.light.date() == result.dark.date() == DAYS[0]
+
+
+# ─── polar days ──────────────────────────────────────────────────────────────
+
+
+class TestPolar:
+    def test_midsummer_is_polar_day(self):
+        result = ephemeris_of(TROMSO, date(2024, 6, 21))
+        assert result == (date(2024, 6, 21), None, None, POLAR_DAY)
+
+    def test_midwinter_is_polar_night(self):
+        result = ephemeris_of(TROMSO, date(2024, 12, 21))
+        assert result == (date(2024, 12, 21), None, None, POLAR_NIGHT)
+
+    def test_equinox_is_normal(self):
+        result = ephemeris_of(TROMSO, date(2024, 3, 21))
+        assert result.kind == NORMAL
+        assert result.light < result.dark
+
+    def test_mid_latitudes_are_always_normal(self):
+        for city in LOCATIONS:
+            assert {ephemeris_of(city, day).kind for day in DAYS} == {NORMAL}
+
+    def test_short_light_period_is_merged_into_night(self):
+        # Paris noon elevation peaks at about 64.54 degrees mid-June
+        result = ephemeris_of(LOCATIONS[0], date(2024, 6, 15), 64.5, 64.5)
+        assert result == (date(2024, 6, 15), None, None, POLAR_NIGHT)
+
+    def test_no_day_has_a_shorter_period(self):
+        for offset in range(366):
+            result = ephemeris_of(TROMSO, date(2024, 1, 1) + timedelta(days=offset))
+            if result.light and result.dark:
+                assert abs(result.dark - result.light) >= MIN_PERIOD
+
+    def test_short_night_before_polar_day(self):
+        # Sets just after midnight and rises again within the hour
+        result = ephemeris_of(TROMSO, date(2024, 5, 17))
+        assert result.dark < result.light
+        assert result.kind == NORMAL
+
+
+class TestCache:
+    def test_same_arguments_hit_the_cache(self):
+        first = day_ephemeris(48.8, 2.3, "Europe/Paris", date(2024, 6, 15))
+        second = day_ephemeris(48.8, 2.3, "Europe/Paris", date(2024, 6, 15))
+        assert first is second
+
+    def test_precompute_fills_the_window(self):
+        window = precompute(48.8, 2.3, "Europe/Paris", date(2024, 6, 15), 7)
+        assert [e.day for e in window] == [
+            date(2024, 6, 15) + timedelta(days=k) for k in range(7)
+        ]
+        assert day_ephemeris(48.8, 2.3, "Europe/Paris", date(2024, 6, 18)) is window[3]
+
+
+class TestRangeEphemeris:
+    @pytest.mark.parametrize("city", [*LOCATIONS, TROMSO], ids=lambda c: c.name)
+    def test_matches_day_by_day(self, city):
+        start = date(2024, 3, 20)
+        days = list(
+            range_ephemeris(city.latitude, city.longitude, city.timezone, start, 40)
+        )
+        assert days == [
+            ephemeris_of(city, start + timedelta(days=k)) for k in range(40)
+        ]
+
+    def test_is_lazy(self):
+        days = range_ephemeris(48.8, 2.3, "Europe/Paris", date(2024, 1, 1), 10**6)
+        assert next(days).day == date(2024, 1, 1)
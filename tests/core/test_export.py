@@ -0,0 +1,110 @@
+import csv
+import io
+from datetime import UTC, date, datetime
+from time import perf_counter
+
+from src.core.ephemeris import day_ephemeris
+from src.core.export import (
+    Transition,
+    day_transitions,
+    ics_lines,
+    upcoming_transitions,
+    write_csv,
+    write_ics,
+)
+from src.core.timeline import NORMAL, POLAR_DAY
+
+
+PARIS = (48.8333, 2.33333, "Europe/Paris")
+TROMSO = (69.6496, 18.956, "Europe/Oslo")
+
+
+# ─── upcoming_transitions ────────────────────────────────────────────────────
+
+
+class TestUpcomingTransitions:
+    def test_precomputed_days_give_the_same_plan(self):
+        days = [day_ephemeris(*PARIS, date(2024, 6, d)) for d in (15, 16)]
+        assert list(day_transitions(days)) == list(
+            upcoming_transitions(*PARIS, date(2024, 6, 15), 2)
+        )
+
+    def test_two_switches_per_normal_day(self):
+        transitions = list(upcoming_transitions(*PARIS, date(2024, 6, 15), 2))
+        expected = day_ephemeris(*PARIS, date(2024, 6, 15))
+        assert [t.theme for t in transitions] == ["light", "dark"] * 2
+        assert transitions[0] == Transition(
+            date(2024, 6, 15), expected.light, "light", NORMAL
+        )
+
+    def test_polar_day_holds_the_theme(self):
+        (transition,) = upcoming_transitions(*TROMSO, date(2024, 6, 21), 1)
+        assert transition == Transition(date(2024, 6, 21), None, "light", POLAR_DAY)
+
+    def test_is_chronological(self):
+        transitions = [
+            t.at for t in upcoming_transitions(*TROMSO, date(2024, 1, 1), 366) if t.at
+        ]
+        assert transitions == sorted(transitions)
+
+    def test_years_are_generated_quickly(self):
+        start = perf_counter()
+        count = sum(1 for _ in upcoming_transitions(*PARIS, date(2025, 1, 1), 3 * 365))
+        assert count == 2 * 3 * 365
+        assert perf_counter() - start < 10
+
+
+# ─── writers ─────────────────────────────────────────────────────────────────
+
+
+class TestIcs:
+    def test_calendar_structure(self):
+        lines = list(ics_lines([], datetime(2024, 6, 1, tzinfo=UTC)))
+        assert lines[0] == "BEGIN:VCALENDAR"
+        assert "VERSION:2.0" in lines
+        assert lines[-1] == "END:VCALENDAR"
+
+    def test_switch_event_in_utc(self):
+        at = datetime(2024, 6, 15, 21, 58, 3, tzinfo=UTC)
+        transition = Transition(date(2024, 6, 15), at, "dark", NORMAL)
+        lines = list(ics_lines([transition], datetime(2024, 6, 1, tzinfo=UTC)))
+        assert "DTSTART:20240615T215803Z" in lines
+        assert "SUMMARY:Switch to dark theme" in lines
+        assert "UID:2024-06-15-dark@autoswitchtheme" in lines
+
+    def test_uid_depends_on_the_plan(self):
+        transition = Transition(date(2024, 6, 21), None, "light", POLAR_DAY)
+
+        def uid(key):
+            return next(
+                line for line in ics_lines([transition], key=key) if "UID" in line
+            )
+
+        paris = "48.8333,2.33333,Europe/Paris,-0.833,-0.833"
+        assert uid(paris) == uid(paris)
+        assert uid(paris) != uid("48.8333,2.33333,Europe/Paris,-0.833,-6.0")
+        assert uid(paris).endswith("@autoswitchtheme")
+
+    def test_polar_day_is_all_day(self):
+        transition = Transition(date(2024, 6, 21), None, "light", POLAR_DAY)
+        lines = list(ics_lines([transition]))
+        assert "DTSTART;VALUE=DATE:20240621" in lines
+        assert "DTEND;VALUE=DATE:20240622" in lines
+
+    def test_lines_end_with_crlf(self):
+        output = io.StringIO(newline="")
+        count = write_ics(upcoming_transitions(*PARIS, date(2024, 6, 15), 1), output)
+        assert count == 2
+        assert output.getvalue().endswith("END:VCALENDAR\r\n")
+        assert all(len(line) <= 75 for line in output.getvalue().split("\r\n"))
+
+
+class TestCsv:
+    def test_rows(self):
+        output = io.StringIO()
+        transitions = upcoming_transitions(*TROMSO, date(2024, 6, 21), 1)
+        assert write_csv(transitions, output) == 1
+        output.seek(0)
+        assert list(csv.DictReader(output)) == [
+            {"date": "2024-06-21", "time": "", "theme": "light", "kind": "polar_day"}
+        ]
@@ -0,0 +1,250 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import monotonic, sleep
+from unittest.mock import patch
+
+import pytest
+
+from src.core.geolocation import (
+    CACHED,
+    ESTIMATE,
+    NETWORK,
+    PINNED,
+    Fix,
+    Provider,
+    estimate_location,
+    estimate_provider,
+    http_provider,
+    locate,
+    named_providers,
+    parse_ip_api,
+    parse_ipapi,
+    parse_ipinfo,
+    settle,
+    static_provider,
+    zone_table,
+)
+
+
+LYON = {
+    "city": "Lyon",
+    "region": "Auvergne-Rhône-Alpes",
+    "timezone": "Europe/Paris",
+    "loc": "45.7485,4.8467",
+}
+
+SAVED = Fix(43.7, 7.25, "Europe/Paris", "Nice", "PACA", "cached", CACHED)
+
+
+@pytest.fixture
+def server():
+    """Local stand-in of an IP geolocation service: server(body, delay, status)"""
+    servers = []
+
+    def start(body: dict, delay: float = 0.0, status: int = 200) -> str:
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                sleep(delay)
+                payload = json.dumps(body).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except OSError:
+                    pass  # The client gave up
+
+            def log_message(self, format, *args):
+                pass
+
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        httpd.daemon_threads = True
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        servers.append(httpd)
+        return f"http://127.0.0.1:{httpd.server_address[1]}/json"
+
+    yield start
+
+    for httpd in servers:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+# ─── Parsers ──────────────────────────────────────────────────────────────────
+
+
+class TestParsers:
+    def test_ipinfo(self):
+        fix = parse_ipinfo(LYON)
+        assert (fix.latitude, fix.longitude) == (45.7485, 4.8467)
+        assert (fix.city, fix.timezone) == ("Lyon", "Europe/Paris")
+
+    def test_ipapi(self):
+        fix = parse_ipapi(
+            {"latitude": 45.7, "longitude": 4.8, "timezone": "Europe/Paris"}
+        )
+        assert (fix.latitude, fix.longitude, fix.city) == (45.7, 4.8, "")
+
+    def test_ip_api(self):
+        fix = parse_ip_api(
+            {
+                "status": "success",
+                "lat": 45.7,
+                "lon": 4.8,
+                "timezone": "Europe/Paris",
+                "regionName": "ARA",
+            }
+        )
+        assert (fix.latitude, fix.region) == (45.7, "ARA")
+
+    def test_ip_api_failure(self):
+        with pytest.raises(ValueError, match="private range"):
+            parse_ip_api({"status": "fail", "message": "private range"})
+
+    def test_unknown_provider_names_are_skipped(self):
+        providers = named_providers(["ipinfo", "bogus", "ip-api"])
+        assert [p.name for p in providers] == ["ipinfo", "ip-api"]
+        assert all(p.quality == NETWORK for p in providers)
+
+
+# ─── Offline estimate ─────────────────────────────────────────────────────────
+
+
+class TestEstimate:
+    def test_zone_coordinates(self):
+        if "Europe/Paris" not in zone_table():
+            pytest.skip("zone1970.tab not available")
+        fix = estimate_location("Europe/Paris")
+        assert fix.latitude == pytest.approx(48.87, abs=0.01)
+        assert fix.longitude == pytest.approx(2.33, abs=0.01)
+        assert (fix.city, fix.quality) == ("Paris", ESTIMATE)
+
+    def test_southern_and_western_zone(self):
+        if "America/Sao_Paulo" not in zone_table():
+            pytest.skip("zone1970.tab not available")
+        fix = estimate_location("America/Sao_Paulo")
+        assert fix.latitude < 0 and fix.longitude < 0
+        assert fix.city == "Sao Paulo"
+
+    def test_unknown_zone_uses_the_utc_offset(self):
+        with patch("src.core.geolocation.local_offset", -3600):
+            fix = estimate_location("Nowhere/Special")
+        assert (fix.timezone, fix.longitude) == ("Etc/GMT-1", 15.0)
+
+    def test_no_zone_at_utc(self):
+        with patch("src.core.geolocation.local_offset", 0):
+            fix = estimate_location(None)
+        assert (fix.timezone, fix.longitude) == ("Etc/GMT", 0.0)
+
+
+# ─── Chain ────────────────────────────────────────────────────────────────────
+
+
+class TestLocate:
+    def test_no_providers(self):
+        assert locate([]) is None
+
+    def test_pinned_answers_at_once(self, server):
+        slow = http_provider("slow", server(LYON, delay=2.0), parse_ipinfo)
+        pinned = static_provider(SAVED._replace(source="pinned", quality=PINNED))
+
+        start = monotonic()
+        fix = locate([slow, pinned])
+
+        assert monotonic() - start < 1.0
+        assert fix is not None and fix.source == "pinned"
+
+    def test_losing_lookups_are_settled(self, server):
+        slow = http_provider("slow", server(LYON, delay=0.5), parse_ipinfo)
+        pinned = static_provider(SAVED._replace(source="pinned", quality=PINNED))
+        locate([slow, pinned])
+
+        assert not settle(timeout=0)
+        assert settle()
+        assert settle(timeout=0)
+
+    def test_network_beats_cached(self, server):
+        providers = [
+            static_provider(SAVED),
+            estimate_provider("Europe/Paris"),
+            http_provider("ipinfo", server(LYON), parse_ipinfo),
+        ]
+        fix = locate(providers)
+        assert fix is not None
+        assert (fix.city, fix.source, fix.quality) == ("Lyon", "ipinfo", NETWORK)
+
+    def test_fastest_network_answer_wins(self, server):
+        marseille = {**LYON, "city": "Marseille", "loc": "43.3,5.4"}
+        providers = [
+            http_provider("slow", server(LYON, delay=2.0), parse_ipinfo),
+            http_provider("fast", server(marseille), parse_ipinfo),
+        ]
+
+        start = monotonic()
+        fix = locate(providers)
+
+        assert monotonic() - start < 1.0
+        assert fix is not None and fix.source == "fast"
+
+    def test_http_error_is_ignored(self, server):
+        providers = [
+            static_provider(SAVED),
+            http_provider("broken", server({}, status=500), parse_ipinfo),
+        ]
+        fix = locate(providers)
+        assert fix is not None and fix.source == "cached"
+
+    def test_invalid_answer_is_ignored(self, server):
+        providers = [
+            estimate_provider("Europe/Paris"),
+            http_provider("bad", server({"city": "?"}), parse_ipinfo),
+        ]
+        fix = locate(providers)
+        assert fix is not None and fix.source == "estimate"
+
+    def test_provider_timeout_falls_back(self, server):
+        providers = [
+            static_provider(SAVED),
+            http_provider("slow", server(LYON, delay=3.0), parse_ipinfo, 0.3),
+        ]
+
+        start = monotonic()
+        fix = locate(providers, deadline=5.0)
+
+        assert monotonic() - start < 1.5
+        assert fix is not None and fix.source == "cached"
+
+    def test_deadline_returns_best_so_far(self, server):
+        providers = [
+            estimate_provider("Europe/Paris"),
+            http_provider("slow", server(LYON, delay=3.0), parse_ipinfo, 10.0),
+        ]
+
+        start = monotonic()
+        fix = locate(providers, deadline=0.3)
+
+        assert monotonic() - start < 1.5
+        assert fix is not None and fix.source == "estimate"
+
+    def test_waits_for_a_better_provider(self, server):
+        providers = [
+            estimate_provider("Europe/Paris"),
+            http_provider("ipinfo", server(LYON, delay=0.3), parse_ipinfo),
+        ]
+        fix = locate(providers)
+        assert fix is not None and fix.source == "ipinfo"
+
+    def test_unreachable_service(self):
+        providers = [
+            static_provider(SAVED),
+            http_provider("down", "http://127.0.0.1:9/json", parse_ipinfo, 1.0),
+        ]
+        fix = locate(providers)
+        assert fix is not None and fix.source == "cached"
+
+    def test_provider_answering_nothing(self):
+        nothing = Provider("nothing", NETWORK, lambda timeout: None)
+        fix = locate([nothing, estimate_provider(None)])
+        assert fix is not None and fix.source == "estimate"
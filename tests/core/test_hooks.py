@@ -0,0 +1,215 @@
+import shlex
+import sys
+import threading
+from configparser import ConfigParser
+from time import monotonic, sleep
+from unittest.mock import patch
+
+import pytest
+
+from src.core.hooks import (
+    FAILED,
+    OK,
+    TIMED_OUT,
+    TIMEOUT,
+    Hook,
+    HookRunner,
+    load_hooks,
+    resolve,
+    run_command,
+    run_entry_point,
+)
+
+
+# Entry points of the tests, called by the runner as 'tests.core.test_hooks:...'
+CALLS: list[tuple[str, str]] = []
+RELEASE = threading.Event()
+
+
+def record(theme: str, source: str):
+    CALLS.append((theme, source))
+
+
+def block(theme: str, source: str):
+    RELEASE.wait(5)
+
+
+def fail(theme: str, source: str):
+    raise RuntimeError("boom")
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    CALLS.clear()
+    RELEASE.clear()
+    yield
+    RELEASE.set()
+
+
+def python_command(code: str) -> str:
+    return f"{shlex.quote(sys.executable)} -c {shlex.quote(code)}"
+
+
+def config(text: str) -> ConfigParser:
+    parser = ConfigParser()
+    parser.read_string(text)
+    return parser
+
+
+# ─── load_hooks ───────────────────────────────────────────────────────────────
+
+
+class TestLoadHooks:
+    def test_no_hooks(self):
+        assert load_hooks(config("[hooks]\nworkers = 2\n")) == []
+
+    def test_command_and_entry_point(self):
+        hooks = load_hooks(
+            config(
+                "[hooks]\ntimeout = 10\n"
+                "[hook:terminal]\ncommand = set-colors {theme}\nthemes = dark\n"
+                "[hook:editor]\nentry_point = editor.theme:apply\ntimeout = 2\n"
+            )
+        )
+        assert hooks == [
+            Hook("terminal", "set-colors {theme}", "", 10.0, ("dark",)),
+            Hook("editor", "", "editor.theme:apply", 2.0, ()),
+        ]
+
+    def test_default_timeout(self):
+        (hook,) = load_hooks(config("[hook:a]\ncommand = true\n"))
+        assert hook.timeout == TIMEOUT
+
+    def test_invalid_hooks_are_skipped(self):
+        hooks = load_hooks(
+            config(
+                "[hook:empty]\n"
+                "[hook:both]\ncommand = true\nentry_point = a:b\n"
+                "[hook:module]\nentry_point = editor\n"
+            )
+        )
+        assert hooks == []
+
+
+# ─── Execution ────────────────────────────────────────────────────────────────
+
+
+class TestExecution:
+    def test_resolve_nested_attribute(self):
+        assert resolve("os:path.join") is __import__("os").path.join
+
+    def test_command_gets_the_theme(self, tmp_path):
+        out = tmp_path / "out.txt"
+        code = (
+            "import os, sys; "
+            f"open({str(out)!r}, 'w').write("
+            "sys.argv[1] + ' ' + os.environ['AUTOSWITCHTHEME_SOURCE'])"
+        )
+        run_command(Hook("h", python_command(code) + " {theme}"), "dark", "schedule")
+        assert out.read_text() == "dark schedule"
+
+    def test_command_failure(self):
+        import subprocess
+
+        with pytest.raises(subprocess.CalledProcessError):
+            run_command(Hook("h", python_command("raise SystemExit(3)")), "dark", "")
+
+    def test_command_is_killed_past_timeout(self):
+        import subprocess
+
+        hook = Hook("h", python_command("import time; time.sleep(10)"), timeout=0.3)
+        start = monotonic()
+        with pytest.raises(subprocess.TimeoutExpired):
+            run_command(hook, "dark", "")
+        assert monotonic() - start < 5
+
+    def test_entry_point_is_called(self):
+        run_entry_point(Hook("h", entry_point=f"{__name__}:record"), "light", "auto")
+        assert CALLS == [("light", "auto")]
+
+    def test_entry_point_timeout(self):
+        hook = Hook("h", entry_point=f"{__name__}:block", timeout=0.2)
+        with pytest.raises(TimeoutError):
+            run_entry_point(hook, "light", "auto")
+
+
+# ─── HookRunner ───────────────────────────────────────────────────────────────
+
+
+class TestHookRunner:
+    def test_run_does_not_wait_for_hooks(self):
+        runner = HookRunner([Hook("slow", entry_point=f"{__name__}:block")])
+        start = monotonic()
+        runner.run("dark")
+        assert monotonic() - start < 0.1
+        RELEASE.set()
+        runner.shutdown(wait=True)
+        assert runner.status()["slow"]["runs"] == 1
+
+    def test_metrics_by_outcome(self):
+        runner = HookRunner(
+            [
+                Hook("ok", entry_point=f"{__name__}:record"),
+                Hook("failing", entry_point=f"{__name__}:fail"),
+                Hook("slow", entry_point=f"{__name__}:block", timeout=0.2),
+            ],
+            workers=3,
+        )
+        with patch("src.core.hooks.log_event") as mock_event:
+            runner.run("dark", "schedule")
+            runner.shutdown(wait=True)
+
+        status = runner.status()
+        assert (status["ok"]["runs"], status["ok"]["failures"]) == (1, 0)
+        assert status["failing"]["failures"] == 1
+        assert status["slow"]["timeouts"] == 1
+        assert status["slow"]["last"] >= 0.2
+        outcomes = {
+            c.kwargs["name"]: c.kwargs["outcome"] for c in mock_event.call_args_list
+        }
+        assert outcomes == {"ok": OK, "failing": FAILED, "slow": TIMED_OUT}
+
+    def test_hooks_filtered_by_theme(self):
+        runner = HookRunner(
+            [Hook("h", entry_point=f"{__name__}:record", themes=("dark",))]
+        )
+        runner.run("light")
+        runner.run("dark")
+        runner.shutdown(wait=True)
+        assert CALLS == [("dark", "auto")]
+
+    def test_pending_hook_is_skipped(self):
+        runner = HookRunner([Hook("slow", entry_point=f"{__name__}:block")])
+        runner.run("dark")
+        runner.run("light")
+        RELEASE.set()
+        runner.shutdown(wait=True)
+        status = runner.status()["slow"]
+        assert (status["runs"], status["skipped"]) == (1, 1)
+
+    def test_pool_is_bounded(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def track(hook, theme, source):
+            with lock:
+                running.append(hook.name)
+                peak.append(len(running))
+            sleep(0.1)
+            with lock:
+                running.remove(hook.name)
+
+        hooks = [Hook(f"h{i}", entry_point="a:b") for i in range(5)]
+        runner = HookRunner(hooks, workers=2)
+        with patch("src.core.hooks.run_entry_point", side_effect=track):
+            runner.run("dark")
+            runner.shutdown(wait=True)
+        assert max(peak) == 2
+        assert sum(m["runs"] for m in runner.status().values()) == 5
+
+    def test_run_after_shutdown_is_ignored(self):
+        runner = HookRunner([Hook("h", entry_point=f"{__name__}:record")])
+        runner.shutdown()
+        runner.run("dark")
+        assert runner.status()["h"]["runs"] == 0
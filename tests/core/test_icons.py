@@ -0,0 +1,91 @@
+import os
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from src.core.icons import VARIANTS, IconCache, decode, render
+from src.utils.path import Paths
+
+
+@pytest.fixture
+def source():
+    return Paths.get_assets_dir() / "icon.ico"
+
+
+# ─── decode ──────────────────────────────────────────────────────────────────
+
+
+class TestDecode:
+    def test_reads_the_closest_resolution(self, source):
+        image = decode(source, 32)
+        assert image.size == (32, 32)
+        assert image.mode == "RGBA"
+
+    def test_resizes_missing_resolutions(self, source):
+        assert decode(source, 20).size == (20, 20)
+
+
+# ─── render ──────────────────────────────────────────────────────────────────
+
+
+class TestRender:
+    def test_dark_inverts_colours_and_keeps_alpha(self):
+        base = Image.new("RGBA", (8, 8), (10, 20, 30, 128))
+        assert render(base, "dark").getpixel((0, 0)) == (245, 235, 225, 128)
+
+    def test_override_adds_a_badge(self):
+        base = Image.new("RGBA", (16, 16), (0, 0, 0, 0))
+        badged = render(base, "override")
+        assert badged.getpixel((0, 0)) == (0, 0, 0, 0)
+        assert badged.getpixel((14, 14))[3] == 255
+        assert base.getpixel((14, 14)) == (0, 0, 0, 0)
+
+
+# ─── IconCache ───────────────────────────────────────────────────────────────
+
+
+class TestIconCache:
+    def test_renders_every_variant(self, source, tmp_path):
+        cache = IconCache(source, tmp_path, 32)
+        for variant in VARIANTS:
+            assert cache.get(variant).size == (32, 32)
+
+    def test_missing_source_returns_none(self, tmp_path):
+        assert IconCache(tmp_path / "missing.ico", tmp_path, 32).get() is None
+
+    def test_decodes_lazily_and_once(self, source, tmp_path):
+        with patch("src.core.icons.decode", wraps=decode) as mock_decode:
+            cache = IconCache(source, tmp_path, 32)
+            mock_decode.assert_not_called()
+            cache.get("light")
+            cache.get("dark")
+        mock_decode.assert_called_once()
+
+    def test_later_start_skips_decoding(self, source, tmp_path):
+        first = IconCache(source, tmp_path, 32).get("override")
+
+        with patch("src.core.icons.decode") as mock_decode:
+            second = IconCache(source, tmp_path, 32).get("override")
+
+        mock_decode.assert_not_called()
+        assert second.tobytes() == first.tobytes()
+
+    def test_changed_source_is_decoded_again(self, source, tmp_path):
+        copy = tmp_path / "icon.ico"
+        copy.write_bytes(source.read_bytes())
+        IconCache(copy, tmp_path, 32).get()
+        stat = copy.stat()
+        os.utime(copy, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        with patch("src.core.icons.decode", wraps=decode) as mock_decode:
+            IconCache(copy, tmp_path, 32).get()
+        mock_decode.assert_called_once()
+
+    def test_corrupt_cache_is_ignored(self, source, tmp_path):
+        (tmp_path / "icons-32.bin").write_bytes(b"garbage")
+        assert IconCache(source, tmp_path, 32).get("dark").size == (32, 32)
+
+    def test_unwritable_cache_still_returns_icons(self, source, tmp_path):
+        cache = IconCache(source, tmp_path / "missing", 32)
+        assert cache.get().size == (32, 32)
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from src.core.override import Override, override_deadline
+from src.utils.state import StateStore
+
+
+SUN_HOURS = {"sunrise": "07:00", "sunset": "20:00"}
+NOW = datetime(2024, 6, 15, 12, 0)
+
+
+class TestOverrideDeadline:
+    def test_next_is_next_transition(self):
+        assert override_deadline("next", NOW, SUN_HOURS) == datetime(2024, 6, 15, 20, 0)
+
+    def test_duration_adds_minutes(self):
+        result = override_deadline("duration", NOW, SUN_HOURS, 90)
+        assert result == NOW + timedelta(minutes=90)
+
+    def test_tomorrow_is_next_midnight(self):
+        assert override_deadline("tomorrow", NOW, SUN_HOURS) == datetime(2024, 6, 16)
+
+    def test_next_without_sun_hours_falls_back_to_midnight(self):
+        sun_hours = {"sunrise": None, "sunset": None}
+        assert override_deadline("next", NOW, sun_hours) == datetime(2024, 6, 16)
+
+    def test_duration_requires_minutes(self):
+        with pytest.raises(ValueError):
+            override_deadline("duration", NOW, SUN_HOURS)
+
+    def test_unknown_mode_is_rejected(self):
+        with pytest.raises(ValueError):
+            override_deadline("forever", NOW, SUN_HOURS)
+
+
+class TestOverride:
+    def test_inactive_by_default(self):
+        assert Override().is_active(NOW) is False
+
+    def test_active_until_deadline(self):
+        override = Override()
+        override.activate("dark", "duration", NOW + timedelta(minutes=30))
+        assert override.is_active(NOW) is True
+        assert override.is_active(NOW + timedelta(minutes=30)) is False
+
+    def test_remaining(self):
+        override = Override()
+        override.activate("dark", "duration", NOW + timedelta(minutes=30))
+        assert override.remaining(NOW) == timedelta(minutes=30)
+
+    def test_describe(self):
+        override = Override()
+        override.activate("dark", "duration", NOW + timedelta(minutes=65))
+        assert override.describe(NOW) == "Dark for 1h 05m"
+
+    def test_clear(self):
+        override = Override()
+        override.activate("dark", "tomorrow", NOW + timedelta(hours=1))
+        override.clear()
+        assert override.is_active(NOW) is False
+        assert override.describe(NOW) == "No override"
+
+
+class TestOverridePersistence:
+    def test_survives_restart(self, tmp_path):
+        until = NOW + timedelta(hours=2)
+        Override(StateStore(tmp_path / "state.json")).activate("light", "next", until)
+
+        restored = Override(StateStore(tmp_path / "state.json"))
+        assert (restored.theme, restored.mode, restored.until) == (
+            "light",
+            "next",
+            until,
+        )
+
+    def test_clear_is_persisted(self, tmp_path):
+        override = Override(StateStore(tmp_path / "state.json"))
+        override.activate("light", "next", NOW)
+        override.clear()
+
+        assert Override(StateStore(tmp_path / "state.json")).until is None
+
+    def test_write_error_keeps_the_override(self, tmp_path):
+        override = Override(StateStore(tmp_path / "state.json"))
+        with patch.object(StateStore, "set", side_effect=PermissionError):
+            override.activate("dark", "next", NOW + timedelta(hours=1))
+            assert override.is_active(NOW)
+            override.clear()
+        assert override.until is None
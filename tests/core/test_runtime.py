@@ -0,0 +1,109 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.core.runtime import AsyncRuntime
+from src.core.scheduler import Scheduler
+
+
+@pytest.fixture
+def jobs():
+    return Scheduler()
+
+
+def started(runtime: AsyncRuntime) -> threading.Thread:
+    thread = threading.Thread(target=runtime.run, daemon=True)
+    thread.start()
+    return thread
+
+
+@pytest.fixture
+def runtime(jobs):
+    runtime = AsyncRuntime(jobs)
+    thread = started(runtime)
+    yield runtime
+    runtime.stop()
+    thread.join(5)
+
+
+# ─── Timers ───────────────────────────────────────────────────────────────────
+
+
+class TestTimers:
+    def test_job_scheduled_later_wakes_the_loop(self, runtime, jobs):
+        done = threading.Event()
+        jobs.at(datetime.now().astimezone() + timedelta(seconds=0.2), done.set)
+        assert done.wait(5)
+
+    def test_jobs_run_off_the_loop_thread(self, runtime, jobs):
+        threads = []
+        done = threading.Event()
+
+        def job():
+            threads.append(threading.current_thread().name)
+            done.set()
+
+        jobs.at(datetime.now().astimezone(), job)
+        assert done.wait(5)
+        assert threads[0].startswith("runtime")
+
+    def test_idle_without_due_job(self, runtime, jobs):
+        ticks = []
+        runtime.on_tick = lambda: ticks.append(1)
+        jobs.at(datetime.now().astimezone() + timedelta(hours=1), lambda: None)
+        time.sleep(0.3)
+        assert ticks == []
+
+    def test_wakes_every_tick(self, jobs):
+        runtime = AsyncRuntime(jobs, tick=0.05)
+        ticked = threading.Event()
+        runtime.on_tick = ticked.set
+        thread = started(runtime)
+        assert ticked.wait(5)
+        runtime.stop()
+        thread.join(5)
+
+
+# ─── Bridge ───────────────────────────────────────────────────────────────────
+
+
+class TestPost:
+    def test_actions_run_in_order(self, runtime):
+        done = []
+        finished = threading.Event()
+        for name in ("force", "resume"):
+            runtime.post(lambda n=name: time.sleep(0.05) or done.append(n))
+        runtime.post(finished.set)
+        assert finished.wait(5)
+        assert done == ["force", "resume"]
+
+    def test_failed_action_does_not_stop_the_next(self, runtime):
+        finished = threading.Event()
+        runtime.post(lambda: 1 / 0)
+        runtime.post(finished.set)
+        assert finished.wait(5)
+
+    def test_dropped_once_stopped(self, jobs):
+        runtime = AsyncRuntime(jobs)
+        runtime.stop()
+        started(runtime).join(5)
+        assert runtime.loop.is_closed()
+        runtime.post(lambda: None)  # Must not raise
+
+
+class TestOffload:
+    def test_result(self, runtime):
+        future = asyncio.run_coroutine_threadsafe(
+            runtime.offload(sum, [1, 2]), runtime.loop
+        )
+        assert future.result(5) == 3
+
+    def test_timeout(self, runtime):
+        future = asyncio.run_coroutine_threadsafe(
+            runtime.offload(time.sleep, 0.5, timeout=0.05), runtime.loop
+        )
+        with pytest.raises(TimeoutError):
+            future.result(5)
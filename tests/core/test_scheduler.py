@@ -0,0 +1,121 @@
+from datetime import UTC, datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.core.scheduler import Scheduler
+
+
+@pytest.fixture
+def sched():
+    return Scheduler()
+
+
+T0 = datetime(2024, 6, 15, 12, 0, tzinfo=UTC)
+
+
+class TestAt:
+    def test_job_not_run_before_instant(self, sched):
+        func = MagicMock()
+        sched.at(T0, func)
+        sched.run_pending(now=T0.timestamp() - 1)
+        func.assert_not_called()
+
+    def test_job_run_once_at_instant(self, sched):
+        func = MagicMock()
+        sched.at(T0, func)
+        sched.run_pending(now=T0.timestamp())
+        sched.run_pending(now=T0.timestamp() + 60)
+        func.assert_called_once()
+
+    def test_jobs_run_in_instant_order(self, sched):
+        calls = []
+        sched.at(T0 + timedelta(minutes=5), lambda: calls.append("late"))
+        sched.at(T0, lambda: calls.append("early"))
+        sched.run_pending(now=(T0 + timedelta(hours=1)).timestamp())
+        assert calls == ["early", "late"]
+
+    def test_failing_job_does_not_stop_others(self, sched):
+        func = MagicMock()
+        sched.at(T0, MagicMock(side_effect=RuntimeError("boom")))
+        sched.at(T0, func)
+        sched.run_pending(now=T0.timestamp())
+        func.assert_called_once()
+
+    def test_earliest_job_notifies(self, sched):
+        sched.on_schedule = MagicMock()
+        sched.at(T0, MagicMock())
+        sched.at(T0 + timedelta(hours=1), MagicMock())
+        sched.at(T0 - timedelta(hours=1), MagicMock())
+        assert sched.on_schedule.call_count == 2
+
+
+class TestClear:
+    def test_clear_by_tag(self, sched):
+        kept, dropped = MagicMock(), MagicMock()
+        sched.at(T0, kept, tag="keep")
+        sched.at(T0, dropped, tag="drop")
+        sched.clear("drop")
+        sched.run_pending(now=T0.timestamp())
+        kept.assert_called_once()
+        dropped.assert_not_called()
+
+    def test_clear_all(self, sched):
+        sched.at(T0, MagicMock(), tag="a")
+        sched.at(T0, MagicMock(), tag="b")
+        sched.clear()
+        assert sched.get_jobs() == []
+
+
+class TestGetJobs:
+    def test_filters_by_tag(self, sched):
+        sched.at(T0, MagicMock(), tag="a")
+        sched.at(T0, MagicMock(), tag="b")
+        assert [job.tag for job in sched.get_jobs("a")] == ["a"]
+
+    def test_next_run_is_earliest(self, sched):
+        sched.at(T0 + timedelta(hours=1), MagicMock())
+        sched.at(T0, MagicMock())
+        assert sched.next_run() == T0
+
+    def test_next_run_none_when_empty(self, sched):
+        assert sched.next_run() is None
+
+
+class TestClockJump:
+    def test_no_jump_on_first_tick(self, sched):
+        assert sched.detect_clock_jump(1000.0, 50.0) is None
+
+    def test_regular_ticks_are_not_jumps(self, sched):
+        sched.detect_clock_jump(1000.0, 50.0)
+        assert sched.detect_clock_jump(1001.0, 51.0) is None
+
+    def test_suspend_is_detected(self, sched):
+        # Monotonic clock paused while the machine slept
+        sched.detect_clock_jump(1000.0, 50.0)
+        assert sched.detect_clock_jump(4600.0, 51.0) == 3600.0
+
+    def test_long_silence_is_detected(self, sched):
+        # Monotonic clock counting suspended time
+        sched.detect_clock_jump(1000.0, 50.0)
+        assert sched.detect_clock_jump(4600.0, 3650.0) == 3600.0
+
+    def test_backward_clock_change_is_detected(self, sched):
+        sched.detect_clock_jump(1000.0, 50.0)
+        assert sched.detect_clock_jump(-2600.0, 51.0) == -3600.0
+
+    def test_callback_runs_before_overdue_jobs(self, sched):
+        calls = []
+        sched.on_clock_jump = lambda shift: calls.append("catch-up")
+        sched.at(T0, lambda: calls.append("job"))
+        sched.run_pending(now=T0.timestamp() - 3600, mono=50.0)
+        sched.run_pending(now=T0.timestamp() + 60, mono=51.0)
+        assert calls == ["catch-up", "job"]
+
+    def test_callback_error_does_not_stop_jobs(self, sched):
+        func = MagicMock()
+        sched.on_clock_jump = MagicMock(side_effect=RuntimeError("boom"))
+        sched.at(T0, func)
+        sched.run_pending(now=T0.timestamp() - 3600, mono=50.0)
+        sched.run_pending(now=T0.timestamp(), mono=51.0)
+        func.assert_called_once()
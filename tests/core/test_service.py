@@ -0,0 +1,153 @@
+import queue
+from datetime import datetime
+from time import monotonic, sleep
+from unittest.mock import MagicMock, patch
+from zoneinfo import ZoneInfo
+
+import pytest
+from astral import LocationInfo
+
+from src.core.service import ServiceSwitch, service_address
+from src.core.switch import Switch
+from src.core.timeline import NORMAL, POLAR_NIGHT
+from src.utils.ipc import Subscriber, send_request
+from src.utils.path import Paths
+
+
+PARIS = LocationInfo("Paris", "France", "Europe/Paris", 48.8333, 2.33333)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    with patch.object(Paths, "get_data_dir", return_value=tmp_path):
+        yield tmp_path
+
+
+@pytest.fixture
+def service(data_dir):
+    service = ServiceSwitch(PARIS)
+    service.server.start()
+    yield service
+    service.server.stop()
+
+
+class TestServiceAddress:
+    def test_channel_is_shared_by_users(self, data_dir):
+        with patch("src.utils.ipc.getuser", return_value="alice"):
+            alice = service_address()
+        with patch("src.utils.ipc.getuser", return_value="bob"):
+            bob = service_address()
+        assert alice == bob
+
+
+# ─── ServiceSwitch ───────────────────────────────────────────────────────────
+
+
+class TestServiceSwitch:
+    def test_theme_change_is_published_not_written(self, data_dir):
+        service = ServiceSwitch(PARIS)
+        with (
+            patch.object(service.server, "publish") as mock_publish,
+            patch.object(service, "set_windows_theme") as mock_registry,
+        ):
+            service.on_transition("dark")
+
+        mock_registry.assert_not_called()
+        assert mock_publish.call_args.args[0]["theme"] == "dark"
+
+    def test_same_theme_is_not_published_twice(self, data_dir):
+        service = ServiceSwitch(PARIS)
+        with patch.object(service.server, "publish") as mock_publish:
+            service.switch_to_theme("dark")
+            service.switch_to_theme("dark")
+        mock_publish.assert_called_once()
+
+    def test_refresh_publishes_sun_hours(self, data_dir):
+        service = ServiceSwitch(PARIS)
+        with patch.object(service.server, "publish") as mock_publish:
+            service.update_sun_hours()
+
+        event = mock_publish.call_args.args[0]
+        assert event["sun_hours"]["sunrise"] == service.sun_hours["sunrise"]
+        assert event["day_kind"] == NORMAL
+
+    def test_status_counts_agents(self, service):
+        response = send_request({"cmd": "status"}, service_address())
+        assert response["ok"] is True
+        assert response["agents"] == 0
+
+    def test_unknown_command(self, service):
+        response = send_request({"cmd": "force"}, service_address())
+        assert response["ok"] is False
+
+
+# ─── session agent ───────────────────────────────────────────────────────────
+
+
+class TestAgent:
+    def _event(self, theme, kind=NORMAL):
+        sun_hours = {"timestamp": "2024-06-15", "sunrise": "07:00", "sunset": "20:00"}
+        return {
+            "event": "theme",
+            "theme": theme,
+            "sun_hours": sun_hours,
+            "day_kind": kind,
+        }
+
+    def test_event_updates_sun_hours_and_theme(self):
+        agent = Switch(PARIS)
+        with patch.object(agent, "set_windows_theme") as mock_registry:
+            agent.apply_service_event(self._event("dark", POLAR_NIGHT))
+
+        mock_registry.assert_called_once_with("dark")
+        assert agent.sun_hours["sunrise"] == "07:00"
+        assert agent.day_kind == POLAR_NIGHT
+
+    def test_event_without_theme_only_updates_sun_hours(self):
+        agent = Switch(PARIS)
+        with patch.object(agent, "set_windows_theme") as mock_registry:
+            agent.apply_service_event(self._event(None))
+
+        mock_registry.assert_not_called()
+        assert agent.sun_hours["sunset"] == "20:00"
+
+    def test_event_schedules_the_wallpaper_prefetch(self):
+        agent = Switch(PARIS)
+        agent.wallpaper = MagicMock()
+        now = datetime(2024, 6, 15, 12, 0, tzinfo=ZoneInfo("Europe/Paris"))
+        with patch.object(agent, "now", return_value=now):
+            agent.apply_service_event(self._event(None))
+
+        agent.wallpaper.schedule.assert_called_once_with(
+            [(now.replace(hour=20), "dark")], now
+        )
+
+    def test_override_wins_over_service(self):
+        agent = Switch(PARIS)
+        until = datetime(2999, 1, 1, tzinfo=ZoneInfo("Europe/Paris"))
+        agent.override.activate("light", "duration", until)
+        with patch.object(agent, "set_windows_theme") as mock_registry:
+            agent.apply_service_event(self._event("dark"))
+
+        mock_registry.assert_not_called()
+
+    def test_agents_follow_service_over_ipc(self, service):
+        applied = queue.Queue()
+        agents = [Switch(PARIS) for _ in range(2)]
+        subscribers = []
+        for agent in agents:
+            agent.set_windows_theme = applied.put
+            subscriber = Subscriber(agent.apply_service_event, service_address(), 0.05)
+            subscriber.start()
+            subscribers.append(subscriber)
+
+        try:
+            deadline = monotonic() + 5
+            while len(service.server.subscribers) < len(agents):
+                assert monotonic() < deadline, "agents did not subscribe"
+                sleep(0.01)
+            service.switch_to_theme("dark")
+            assert [applied.get(timeout=5) for _ in agents] == ["dark", "dark"]
+        finally:
+            for subscriber in subscribers:
+                subscriber.stop()
@@ -0,0 +1,143 @@
+import gzip
+import json
+
+from src.core.stats import (
+    SwitchStats,
+    format_summary,
+    log_files,
+    read_events,
+    summarize,
+)
+
+
+def switch(theme, source="schedule", scheduled=None, actual=None, ts="2024-06-15"):
+    return {
+        "ts": ts,
+        "event": "switch",
+        "theme": theme,
+        "source": source,
+        "scheduled": scheduled,
+        "actual": actual,
+    }
+
+
+# ─── log_files / read_events ─────────────────────────────────────────────────
+
+
+class TestReadEvents:
+    def test_rotated_files_come_first(self, tmp_path):
+        current = tmp_path / "events.jsonl"
+        current.write_text("")
+        older = tmp_path / "events.jsonl.20240101-000000.gz"
+        newer = tmp_path / "events.jsonl.20240201-000000"
+        older.write_bytes(b"")
+        newer.write_text("")
+        assert log_files(current) == [older, newer, current]
+
+    def test_missing_current_file(self, tmp_path):
+        assert log_files(tmp_path / "events.jsonl") == []
+
+    def test_reads_plain_and_gzipped_logs(self, tmp_path):
+        plain = tmp_path / "events.jsonl"
+        plain.write_text(json.dumps(switch("dark")) + "\n")
+        compressed = tmp_path / "events.jsonl.20240101-000000.gz"
+        with gzip.open(compressed, "wt") as f:
+            f.write(json.dumps(switch("light")) + "\n")
+
+        themes = [e["theme"] for e in read_events([compressed, plain])]
+        assert themes == ["light", "dark"]
+
+    def test_skips_malformed_lines(self, tmp_path):
+        log = tmp_path / "events.jsonl"
+        log.write_text('{"event": "resume"}\nnot json\n[1, 2]\n{"trunc')
+        assert list(read_events([log])) == [{"event": "resume"}]
+
+    def test_is_lazy(self, tmp_path):
+        log = tmp_path / "events.jsonl"
+        log.write_text('{"event": "resume"}\n' * 3)
+        events = read_events([log])
+        assert next(events) == {"event": "resume"}
+
+
+# ─── summarize ───────────────────────────────────────────────────────────────
+
+
+class TestSummarize:
+    def test_counts_switches_by_theme_and_source(self):
+        summary = summarize(
+            [switch("dark"), switch("light"), switch("dark", "override")]
+        )
+        assert summary["switches"] == {"dark": 2, "light": 1}
+        assert summary["sources"] == {"schedule": 2, "override": 1}
+
+    def test_counts_overrides_skips_and_resumes(self):
+        summary = summarize(
+            [
+                {"event": "override", "mode": "next"},
+                {"event": "override", "mode": "duration"},
+                {"event": "override", "mode": "next"},
+                {"event": "skip", "theme": "dark"},
+                {"event": "resume"},
+            ]
+        )
+        assert summary["overrides"] == {"next": 2, "duration": 1}
+        assert summary["skipped"] == 1
+        assert summary["resumed"] == 1
+
+    def test_latency_of_scheduled_switches(self):
+        summary = summarize(
+            [
+                switch(
+                    "dark",
+                    scheduled="2024-06-15T21:00:00+02:00",
+                    actual="2024-06-15T21:00:00.500000+02:00",
+                ),
+                switch(
+                    "light",
+                    scheduled="2024-06-16T05:00:00+02:00",
+                    actual="2024-06-16T05:02:00+02:00",
+                ),
+                switch("dark", source="startup", actual="2024-06-16T08:00:00+02:00"),
+            ]
+        )
+        latency = summary["latency"]
+        assert latency["count"] == 2
+        assert latency["mean"] == 60.25
+        assert latency["max"] == 120.0
+        assert latency["histogram"]["<=1s"] == 1
+        assert latency["histogram"]["<=300s"] == 1
+
+    def test_tracks_period(self):
+        summary = summarize([switch("dark", ts="a"), switch("light", ts="b")])
+        assert (summary["first"], summary["last"]) == ("a", "b")
+
+    def test_memory_does_not_depend_on_event_count(self):
+        stats = SwitchStats()
+        for k in range(10_000):
+            stats.add(switch("dark" if k % 2 else "light"))
+        assert stats.events == 10_000
+        assert len(stats.switches) == 2
+
+
+# ─── format_summary ──────────────────────────────────────────────────────────
+
+
+class TestFormatSummary:
+    def test_empty_log(self):
+        text = format_summary(summarize([]))
+        assert "Switches: 0 (none)" in text
+        assert "Latency" not in text
+
+    def test_includes_latency(self):
+        text = format_summary(
+            summarize(
+                [
+                    switch(
+                        "dark",
+                        scheduled="2024-06-15T21:00:00+02:00",
+                        actual="2024-06-15T21:00:03+02:00",
+                    )
+                ]
+            )
+        )
+        assert "Latency: mean 3.0s, max 3.0s over 1 scheduled switches" in text
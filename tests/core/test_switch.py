@@ -1,14 +1,44 @@
 import json
-from datetime import UTC, datetime
+import threading
+from datetime import UTC, date, datetime, time, timedelta
 from unittest.mock import MagicMock, patch
 from winreg import REG_DWORD
+from zoneinfo import ZoneInfo
 
 import pytest
-import schedule
 from astral import LocationInfo
 
+from src.core.actor import ThemeActor
+from src.core.ephemeris import DayEphemeris, range_ephemeris
+from src.core.export import upcoming_transitions
+from src.core.scheduler import scheduler
 from src.core.switch import Switch
+from src.core.timeline import NORMAL, POLAR_DAY, POLAR_NIGHT
 from src.utils.path import Paths
+from src.utils.state import StateStore
+
+
+PARIS = ZoneInfo("Europe/Paris")
+
+
+def paris_today() -> str:
+    return datetime.now(PARIS).strftime("%Y-%m-%d")
+
+
+def seed_cache(
+    data_dir, key: str, day: str, sunrise: str | None, sunset: str | None, kind=NORMAL
+):
+    """Write a shared ephemeris cache holding a single day in Paris time."""
+
+    def instant(hour):
+        if hour is None:
+            return None
+        at = datetime.combine(date.fromisoformat(day), time.fromisoformat(hour), PARIS)
+        return at.isoformat()
+
+    entry = {"light": instant(sunrise), "dark": instant(sunset), "kind": kind}
+    data = {"version": 1, "entries": {key: {day: entry}}}
+    (data_dir / "ephemeris.json").write_text(json.dumps(data))
 
 
 @pytest.fixture
@@ -30,10 +60,11 @@ def switch_obj(paris):
 @pytest.fixture
 def mock_sun_data():
     """Données solaires mockées à UTC pour la prévisibilité des tests."""
-    return {
-        "sunrise": datetime(2024, 6, 15, 6, 30, tzinfo=UTC),
-        "sunset": datetime(2024, 6, 15, 20, 45, tzinfo=UTC),
-    }
+    return DayEphemeris(
+        date(2024, 6, 15),
+        datetime(2024, 6, 15, 6, 30, tzinfo=UTC),
+        datetime(2024, 6, 15, 20, 45, tzinfo=UTC),
+    )
 
 
 # ─── __init__ ────────────────────────────────────────────────────────────────
@@ -246,9 +277,7 @@ class TestSwitchToDarkTheme:
 
 class TestGetSunHours:
     def test_reads_sunrise_from_valid_cache(self, switch_obj, tmp_path):
-        today = datetime.today().strftime("%Y-%m-%d")
-        cache = {"timestamp": today, "sunrise": "07:30:00", "sunset": "19:45:00"}
-        (tmp_path / "ephemeris.json").write_text(json.dumps(cache))
+        seed_cache(tmp_path, switch_obj.cache_key, paris_today(), "07:30", "19:45")
 
         with patch.object(Paths, "get_data_dir", return_value=tmp_path):
             result = switch_obj.get_sun_hours()
@@ -256,9 +285,7 @@ class TestGetSunHours:
         assert result["sunrise"] == "07:30"
 
     def test_reads_sunset_from_valid_cache(self, switch_obj, tmp_path):
-        today = datetime.today().strftime("%Y-%m-%d")
-        cache = {"timestamp": today, "sunrise": "07:30:00", "sunset": "19:45:00"}
-        (tmp_path / "ephemeris.json").write_text(json.dumps(cache))
+        seed_cache(tmp_path, switch_obj.cache_key, paris_today(), "07:30", "19:45")
 
         with patch.object(Paths, "get_data_dir", return_value=tmp_path):
             result = switch_obj.get_sun_hours()
@@ -266,34 +293,55 @@ class TestGetSunHours:
         assert result["sunset"] == "19:45"
 
     def test_reads_timestamp_from_valid_cache(self, switch_obj, tmp_path):
-        today = datetime.today().strftime("%Y-%m-%d")
-        cache = {"timestamp": today, "sunrise": "07:30:00", "sunset": "19:45:00"}
-        (tmp_path / "ephemeris.json").write_text(json.dumps(cache))
+        today = paris_today()
+        seed_cache(tmp_path, switch_obj.cache_key, today, "07:30", "19:45")
 
         with patch.object(Paths, "get_data_dir", return_value=tmp_path):
             result = switch_obj.get_sun_hours()
 
         assert result["timestamp"] == today
 
+    def test_cache_hit_does_not_compute(self, switch_obj, tmp_path):
+        seed_cache(tmp_path, switch_obj.cache_key, paris_today(), "07:30", "19:45")
+
+        with (
+            patch.object(Paths, "get_data_dir", return_value=tmp_path),
+            patch("src.core.switch.day_ephemeris") as mock_ephemeris,
+        ):
+            switch_obj.get_sun_hours()
+
+        mock_ephemeris.assert_not_called()
+
     def test_ignores_stale_cache_and_recalculates(
         self, switch_obj, tmp_path, mock_sun_data
     ):
-        stale = {"timestamp": "2000-01-01", "sunrise": "05:00:00", "sunset": "15:00:00"}
-        (tmp_path / "ephemeris.json").write_text(json.dumps(stale))
+        seed_cache(tmp_path, switch_obj.cache_key, "2000-01-01", "05:00", "15:00")
 
         with (
             patch.object(Paths, "get_data_dir", return_value=tmp_path),
-            patch("src.core.switch.sun", return_value=mock_sun_data),
+            patch("src.core.switch.day_ephemeris", return_value=mock_sun_data),
         ):
             result = switch_obj.get_sun_hours()
 
         assert result["sunrise"] == "06:30"
         assert result["sunset"] == "20:45"
 
+    def test_ignores_former_single_day_cache(self, switch_obj, tmp_path, mock_sun_data):
+        former = {"timestamp": paris_today(), "sunrise": "05:00", "sunset": "15:00"}
+        (tmp_path / "ephemeris.json").write_text(json.dumps(former))
+
+        with (
+            patch.object(Paths, "get_data_dir", return_value=tmp_path),
+            patch("src.core.switch.day_ephemeris", return_value=mock_sun_data),
+        ):
+            result = switch_obj.get_sun_hours()
+
+        assert result["sunrise"] == "06:30"
+
     def test_calculates_when_no_cache_file(self, switch_obj, tmp_path, mock_sun_data):
         with (
             patch.object(Paths, "get_data_dir", return_value=tmp_path),
-            patch("src.core.switch.sun", return_value=mock_sun_data),
+            patch("src.core.switch.day_ephemeris", return_value=mock_sun_data),
         ):
             result = switch_obj.get_sun_hours()
 
@@ -305,64 +353,513 @@ class TestGetSunHours:
     ):
         with (
             patch.object(Paths, "get_data_dir", return_value=tmp_path),
-            patch("src.core.switch.sun", return_value=mock_sun_data),
+            patch("src.core.switch.day_ephemeris", return_value=mock_sun_data),
         ):
             switch_obj.get_sun_hours()
 
         assert (tmp_path / "ephemeris.json").exists()
 
-    def test_cached_file_has_today_timestamp(self, switch_obj, tmp_path, mock_sun_data):
+    def test_cached_file_has_today_entry(self, switch_obj, tmp_path, mock_sun_data):
         with (
             patch.object(Paths, "get_data_dir", return_value=tmp_path),
-            patch("src.core.switch.sun", return_value=mock_sun_data),
+            patch("src.core.switch.day_ephemeris", return_value=mock_sun_data),
         ):
             switch_obj.get_sun_hours()
 
         saved = json.loads((tmp_path / "ephemeris.json").read_text())
-        assert saved["timestamp"] == datetime.today().strftime("%Y-%m-%d")
+        assert paris_today() in saved["entries"][switch_obj.cache_key]
+
+    def test_ignores_cache_of_other_thresholds(
+        self, switch_obj, tmp_path, mock_sun_data
+    ):
+        other = Switch(switch_obj.city, dark_elevation=-6.0).cache_key
+        seed_cache(tmp_path, other, paris_today(), "05:00", "15:00")
+
+        with (
+            patch.object(Paths, "get_data_dir", return_value=tmp_path),
+            patch("src.core.switch.day_ephemeris", return_value=mock_sun_data),
+        ):
+            result = switch_obj.get_sun_hours()
+
+        assert result["sunrise"] == "06:30"
+
+    def test_passes_elevation_thresholds(self, paris, tmp_path, mock_sun_data):
+        switch_obj = Switch(paris, light_elevation=6.0, dark_elevation=-6.0)
+        with (
+            patch.object(Paths, "get_data_dir", return_value=tmp_path),
+            patch(
+                "src.core.switch.day_ephemeris", return_value=mock_sun_data
+            ) as mock_ephemeris,
+        ):
+            switch_obj.get_sun_hours()
+
+        assert mock_ephemeris.call_args.args[-2:] == (6.0, -6.0)
 
     def test_result_contains_all_keys(self, switch_obj, tmp_path):
-        today = datetime.today().strftime("%Y-%m-%d")
-        cache = {"timestamp": today, "sunrise": "07:00:00", "sunset": "20:00:00"}
-        (tmp_path / "ephemeris.json").write_text(json.dumps(cache))
+        seed_cache(tmp_path, switch_obj.cache_key, paris_today(), "07:00", "20:00")
 
         with patch.object(Paths, "get_data_dir", return_value=tmp_path):
             result = switch_obj.get_sun_hours()
 
         assert {"sunrise", "sunset", "timestamp"} == set(result.keys())
 
+    def test_saves_polar_day_kind(self, switch_obj, tmp_path):
+        polar = DayEphemeris(date(2024, 6, 21), None, None, POLAR_DAY)
+        with (
+            patch.object(Paths, "get_data_dir", return_value=tmp_path),
+            patch("src.core.switch.day_ephemeris", return_value=polar),
+        ):
+            result = switch_obj.get_sun_hours()
 
-# ─── update_sun_hours ────────────────────────────────────────────────────────
+        saved = json.loads((tmp_path / "ephemeris.json").read_text())
+        entry = saved["entries"][switch_obj.cache_key][paris_today()]
+        assert result["sunrise"] is None and result["sunset"] is None
+        assert entry["kind"] == switch_obj.day_kind == POLAR_DAY
 
+    def test_reads_polar_kind_from_cache(self, switch_obj, tmp_path):
+        seed_cache(
+            tmp_path, switch_obj.cache_key, paris_today(), None, None, POLAR_NIGHT
+        )
+
+        with patch.object(Paths, "get_data_dir", return_value=tmp_path):
+            result = switch_obj.get_sun_hours()
+
+        assert result["sunrise"] is None
+        assert switch_obj.day_kind == POLAR_NIGHT
+
+
+# ─── precomputed window ──────────────────────────────────────────────────────
 
-class TestUpdateSunHours:
-    def test_schedules_exactly_two_switch_tasks(self, switch_obj, tmp_path):
-        today = datetime.today().strftime("%Y-%m-%d")
-        cache = {"timestamp": today, "sunrise": "07:00:00", "sunset": "20:00:00"}
-        (tmp_path / "ephemeris.json").write_text(json.dumps(cache))
 
+class TestPrecomputedWindow:
+    def test_window_hit_skips_cache_and_solver(self, switch_obj, tmp_path):
+        today = datetime.now(PARIS).date()
         with patch.object(Paths, "get_data_dir", return_value=tmp_path):
-            switch_obj.update_sun_hours()
+            switch_obj.window.extend(today)
+        (tmp_path / "ephemeris.json").unlink()
+
+        with (
+            patch.object(Paths, "get_data_dir", return_value=tmp_path),
+            patch("src.core.switch.day_ephemeris") as mock_ephemeris,
+            patch.object(switch_obj.window, "refill") as mock_refill,
+        ):
+            result = switch_obj.get_sun_hours()
 
-        assert len(schedule.get_jobs("switch-task")) == 2
+        mock_ephemeris.assert_not_called()
+        mock_refill.assert_called_once()
+        assert not (tmp_path / "ephemeris.json").exists()
+        assert result["timestamp"] == paris_today()
+        assert result["sunrise"] is not None
 
-    def test_clears_previous_switch_tasks_before_scheduling(self, switch_obj, tmp_path):
-        # Pre-existing stale job
-        schedule.every().day.at("05:00").do(lambda: None).tag("switch-task")
+    def test_window_fills_through_shared_cache(self, switch_obj, tmp_path):
+        today = datetime.now(PARIS).date()
+        with patch.object(Paths, "get_data_dir", return_value=tmp_path):
+            switch_obj.window.extend(today)
+
+        saved = json.loads((tmp_path / "ephemeris.json").read_text())
+        assert len(saved["entries"][switch_obj.cache_key]) == len(switch_obj.window)
 
-        today = datetime.today().strftime("%Y-%m-%d")
-        cache = {"timestamp": today, "sunrise": "07:00:00", "sunset": "20:00:00"}
-        (tmp_path / "ephemeris.json").write_text(json.dumps(cache))
+    def test_window_uses_switch_thresholds(self, paris):
+        switch_obj = Switch(paris, light_elevation=6.0, dark_elevation=-6.0)
+        assert switch_obj.window.light_elevation == 6.0
+        assert switch_obj.window.dark_elevation == -6.0
 
+
+class TestUpcomingTransitions:
+    def test_window_days_are_reused(self, switch_obj, tmp_path):
+        today = datetime.now(PARIS).date()
+        with patch.object(Paths, "get_data_dir", return_value=tmp_path):
+            switch_obj.window.extend(today)
+
+        with patch(
+            "src.core.switch.range_ephemeris", wraps=range_ephemeris
+        ) as mock_range:
+            transitions = list(switch_obj.upcoming_transitions(10))
+
+        # Only the days after the window are computed
+        assert mock_range.call_args.args[3:5] == (
+            today + timedelta(days=len(switch_obj.window)),
+            10 - len(switch_obj.window),
+        )
+        assert transitions == list(
+            upcoming_transitions(
+                switch_obj.city.latitude,
+                switch_obj.city.longitude,
+                switch_obj.city.timezone,
+                today,
+                10,
+            )
+        )
+
+    def test_empty_window_reads_the_shared_cache(self, switch_obj, tmp_path):
+        seed_cache(tmp_path, switch_obj.cache_key, paris_today(), "07:30", "19:45")
+        with (
+            patch.object(Paths, "get_data_dir", return_value=tmp_path),
+            patch.object(switch_obj, "_compute_day") as mock_compute,
+        ):
+            (first, *_) = switch_obj.upcoming_transitions(1)
+
+        mock_compute.assert_not_called()
+        assert first.at.strftime("%H:%M") == "07:30"
+
+
+# ─── update_sun_hours ────────────────────────────────────────────────────────
+
+
+class TestUpdateSunHours:
+    @pytest.fixture
+    def cached(self, switch_obj, tmp_path):
+        seed_cache(tmp_path, switch_obj.cache_key, "2024-06-15", "07:00", "20:00")
         with patch.object(Paths, "get_data_dir", return_value=tmp_path):
+            yield
+
+    def _update_at(self, switch_obj, now):
+        with patch.object(switch_obj, "now", return_value=now):
             switch_obj.update_sun_hours()
 
+    def test_schedules_both_switches_before_sunrise(self, switch_obj, cached):
+        self._update_at(switch_obj, datetime(2024, 6, 15, 5, 0, tzinfo=PARIS))
+        assert len(scheduler.get_jobs("switch-task")) == 2
+
+    def test_schedules_only_future_switches(self, switch_obj, cached):
+        self._update_at(switch_obj, datetime(2024, 6, 15, 12, 0, tzinfo=PARIS))
+        jobs = scheduler.get_jobs("switch-task")
+        assert [job.at for job in jobs] == [datetime(2024, 6, 15, 20, 0, tzinfo=PARIS)]
+
+    def test_switches_are_absolute_instants_in_location_zone(self, switch_obj, cached):
+        self._update_at(switch_obj, datetime(2024, 6, 15, 5, 0, tzinfo=PARIS))
+        sunrise = scheduler.get_jobs("switch-task")[0].at
+        assert sunrise.astimezone(UTC) == datetime(2024, 6, 15, 5, 0, tzinfo=UTC)
+
+    def test_prefetches_wallpapers_of_the_switches(self, switch_obj, cached):
+        switch_obj.wallpaper = MagicMock()
+        now = datetime(2024, 6, 15, 12, 0, tzinfo=PARIS)
+        self._update_at(switch_obj, now)
+        switch_obj.wallpaper.schedule.assert_called_once_with(
+            [(datetime(2024, 6, 15, 20, 0, tzinfo=PARIS), "dark")], now
+        )
+
+    def test_weather_decision_leads_each_switch(self, switch_obj, cached):
+        switch_obj.weather = MagicMock(lead=timedelta(hours=2))
+        self._update_at(switch_obj, datetime(2024, 6, 15, 4, 0, tzinfo=PARIS))
+        jobs = scheduler.get_jobs("weather-task")
+        assert [job.at.hour for job in jobs] == [5, 18]
+
+    def test_weather_decided_at_once_close_to_a_switch(self, switch_obj, cached):
+        switch_obj.weather = MagicMock(lead=timedelta(hours=2))
+        sunset = datetime(2024, 6, 15, 20, 0, tzinfo=PARIS)
+        switch_obj.weather.shift.return_value = sunset - timedelta(minutes=30)
+        self._update_at(switch_obj, datetime(2024, 6, 15, 19, 0, tzinfo=PARIS))
+
+        assert switch_obj.sun_hours["sunset"] == "19:30"
+        jobs = scheduler.get_jobs("switch-task")
+        assert [job.at for job in jobs] == [sunset - timedelta(minutes=30)]
+
+    def test_schedules_refresh_after_location_midnight(self, switch_obj, cached):
+        self._update_at(switch_obj, datetime(2024, 6, 15, 12, 0, tzinfo=PARIS))
+        refresh = scheduler.get_jobs("refresh-task")
+        assert [job.at for job in refresh] == [
+            datetime(2024, 6, 16, 0, 1, tzinfo=PARIS)
+        ]
+
+    def test_clears_previous_switch_tasks_before_scheduling(self, switch_obj, cached):
+        # Pre-existing stale job
+        scheduler.at(datetime(2999, 1, 1, tzinfo=UTC), lambda: None, "switch-task")
+
+        self._update_at(switch_obj, datetime(2024, 6, 15, 5, 0, tzinfo=PARIS))
+
         # Exactly 2 new jobs, stale one removed
-        assert len(schedule.get_jobs("switch-task")) == 2
+        assert len(scheduler.get_jobs("switch-task")) == 2
 
     def test_does_not_schedule_when_sun_hours_are_none(self, switch_obj):
         with patch.object(switch_obj, "get_sun_hours"):
             # sun_hours stays at initial None values
             switch_obj.update_sun_hours()
 
-        assert len(schedule.get_jobs("switch-task")) == 0
+        assert len(scheduler.get_jobs("switch-task")) == 0
+
+    @pytest.mark.parametrize(
+        ("kind", "theme"), [(POLAR_DAY, "light"), (POLAR_NIGHT, "dark")]
+    )
+    def test_polar_day_applies_single_theme(self, switch_obj, tmp_path, kind, theme):
+        polar = DayEphemeris(date(2024, 6, 15), None, None, kind)
+        with (
+            patch.object(Paths, "get_data_dir", return_value=tmp_path),
+            patch("src.core.switch.day_ephemeris", return_value=polar),
+            patch.object(switch_obj, "switch_to_theme") as mock_switch,
+        ):
+            self._update_at(switch_obj, datetime(2024, 6, 15, 12, 0, tzinfo=PARIS))
+
+        mock_switch.assert_called_once_with(theme, "schedule", None)
+        assert scheduler.get_jobs("switch-task") == []
+        assert len(scheduler.get_jobs("refresh-task")) == 1
+
+
+# ─── override ────────────────────────────────────────────────────────────────
+
+
+class TestOverride:
+    @pytest.fixture
+    def sunny_switch(self, switch_obj):
+        switch_obj.sun_hours = {
+            "timestamp": "2024-06-15",
+            "sunrise": "07:00",
+            "sunset": "20:00",
+        }
+        return switch_obj
+
+    def test_set_override_switches_theme(self, sunny_switch):
+        with patch.object(sunny_switch, "switch_to_dark_theme") as mock_dark:
+            sunny_switch.set_override("dark", "duration", 30)
+        mock_dark.assert_called_once()
+
+    def test_set_override_schedules_single_deadline(self, sunny_switch):
+        with patch.object(sunny_switch, "switch_to_dark_theme"):
+            sunny_switch.set_override("dark", "duration", 30)
+            sunny_switch.set_override("dark", "duration", 60)
+        assert len(scheduler.get_jobs("override-task")) == 1
+
+    def test_transition_skipped_while_override_active(self, sunny_switch):
+        with patch.object(sunny_switch, "switch_to_dark_theme"):
+            sunny_switch.set_override("dark", "duration", 30)
+        with patch.object(sunny_switch, "switch_to_light_theme") as mock_light:
+            sunny_switch.on_transition("light")
+        mock_light.assert_not_called()
+
+    def test_transition_applied_without_override(self, sunny_switch):
+        with patch.object(sunny_switch, "switch_to_light_theme") as mock_light:
+            sunny_switch.on_transition("light")
+        mock_light.assert_called_once()
+
+    def test_end_override_clears_deadline(self, sunny_switch):
+        with (
+            patch.object(sunny_switch, "switch_to_dark_theme"),
+            patch.object(sunny_switch, "switch_to_light_theme"),
+        ):
+            sunny_switch.set_override("dark", "duration", 30)
+            sunny_switch.end_override()
+        assert sunny_switch.override.is_active() is False
+        assert scheduler.get_jobs("override-task") == []
+
+    def test_restore_override_without_state(self, sunny_switch):
+        assert sunny_switch.restore_override() is False
+
+    def test_unwritable_state_keeps_the_override(self, sunny_switch, tmp_path):
+        sunny_switch.override.store = StateStore(tmp_path / "state.json")
+        with (
+            patch.object(StateStore, "set", side_effect=PermissionError),
+            patch.object(sunny_switch, "switch_to_dark_theme") as mock_dark,
+        ):
+            sunny_switch.set_override("dark", "duration", 30)
+        mock_dark.assert_called_once()
+        assert sunny_switch.override.is_active() is True
+        assert len(scheduler.get_jobs("override-task")) == 1
+
+
+# ─── on_change ───────────────────────────────────────────────────────────────
+
+
+class TestOnChange:
+    @patch("src.core.switch.windll")
+    @patch("src.core.switch.SetValueEx")
+    @patch("src.core.switch.OpenKey")
+    def test_called_when_theme_changes(
+        self, mock_openkey, mock_setvalue, mock_windll, switch_obj
+    ):
+        switch_obj.on_change = MagicMock()
+        switch_obj.switch_to_dark_theme()
+        switch_obj.switch_to_dark_theme()
+        switch_obj.on_change.assert_called_once()
+
+    def test_called_when_override_changes(self, switch_obj):
+        switch_obj.on_change = MagicMock()
+        with (
+            patch.object(switch_obj, "switch_to_dark_theme"),
+            patch.object(switch_obj, "apply_scheduled_theme"),
+        ):
+            switch_obj.set_override("dark", "duration", 30)
+            switch_obj.end_override()
+        assert switch_obj.on_change.call_count == 2
+
+    @patch("src.core.switch.windll")
+    @patch("src.core.switch.SetValueEx")
+    @patch("src.core.switch.OpenKey")
+    def test_switch_is_recorded_as_event(
+        self, mock_openkey, mock_setvalue, mock_windll, switch_obj
+    ):
+        at = datetime(2024, 6, 15, 21, 0, tzinfo=PARIS)
+        with patch("src.core.switch.log_event") as mock_event:
+            switch_obj.on_transition("dark", at)
+            switch_obj.on_transition("dark", at)
+
+        mock_event.assert_called_once()
+        assert mock_event.call_args.args == ("switch",)
+        assert mock_event.call_args.kwargs["source"] == "schedule"
+        assert mock_event.call_args.kwargs["scheduled"] == at
+
+    def test_skipped_transition_is_recorded(self, switch_obj):
+        with (
+            patch.object(switch_obj, "switch_to_dark_theme"),
+            patch("src.core.switch.log_event") as mock_event,
+        ):
+            switch_obj.set_override("dark", "duration", 30)
+            switch_obj.on_transition("light")
+
+        assert [c.args[0] for c in mock_event.call_args_list] == ["override", "skip"]
+
+    def test_listener_errors_are_logged(self, switch_obj):
+        switch_obj.on_change = MagicMock(side_effect=RuntimeError("boom"))
+        switch_obj.notify_change()  # Must not raise
+
+    @patch("src.core.switch.windll")
+    @patch("src.core.switch.SetValueEx")
+    @patch("src.core.switch.OpenKey")
+    def test_wallpaper_follows_the_switch(
+        self, mock_openkey, mock_setvalue, mock_windll, switch_obj
+    ):
+        at = datetime(2024, 6, 15, 21, 0, tzinfo=PARIS)
+        switch_obj.wallpaper = MagicMock()
+        switch_obj.on_transition("dark", at)
+        switch_obj.on_transition("dark", at)
+        switch_obj.wallpaper.apply.assert_called_once_with("dark", at)
+
+    @patch("src.core.switch.windll")
+    @patch("src.core.switch.SetValueEx")
+    @patch("src.core.switch.OpenKey")
+    def test_hooks_run_on_each_switch(
+        self, mock_openkey, mock_setvalue, mock_windll, switch_obj
+    ):
+        switch_obj.hooks = MagicMock()
+        switch_obj.switch_to_dark_theme("schedule")
+        switch_obj.switch_to_dark_theme("schedule")
+        switch_obj.switch_to_light_theme("override")
+        assert switch_obj.hooks.run.call_args_list == [
+            (("dark", "schedule"),),
+            (("light", "override"),),
+        ]
+
+
+# ─── apply_weather ───────────────────────────────────────────────────────────
+
+
+class TestApplyWeather:
+    SUNSET = datetime(2024, 12, 15, 17, 0, tzinfo=PARIS)
+
+    @pytest.fixture
+    def clouded(self, switch_obj):
+        switch_obj.sun_hours.update(
+            {"timestamp": "2024-12-15", "sunrise": "08:40", "sunset": "17:00"}
+        )
+        switch_obj.weather = MagicMock()
+        return switch_obj
+
+    def test_clear_sky_keeps_the_switch(self, clouded):
+        clouded.weather.shift.return_value = self.SUNSET
+        clouded.apply_weather("dark", self.SUNSET)
+        assert clouded.sun_hours["sunset"] == "17:00"
+
+    def test_shifted_switch_is_rescheduled(self, clouded):
+        shifted = self.SUNSET - timedelta(minutes=40)
+        clouded.weather.shift.return_value = shifted
+        with (
+            patch.object(clouded, "now", return_value=self.SUNSET - timedelta(hours=2)),
+            patch("src.core.switch.log_event") as mock_event,
+        ):
+            clouded.apply_weather("dark", self.SUNSET)
+
+        assert clouded.sun_hours["sunset"] == "16:20"
+        assert [job.at for job in scheduler.get_jobs("switch-task")] == [shifted]
+        assert mock_event.call_args.kwargs["shifted"] == shifted
+
+    def test_switch_shifted_into_the_past_applies_now(self, clouded):
+        clouded.weather.shift.return_value = self.SUNSET - timedelta(minutes=40)
+        with (
+            patch.object(
+                clouded, "now", return_value=self.SUNSET - timedelta(minutes=10)
+            ),
+            patch.object(clouded, "switch_to_theme") as mock_switch,
+        ):
+            clouded.apply_weather("dark", self.SUNSET)
+        mock_switch.assert_called_once_with("dark", "weather")
+
+
+# ─── catch_up ────────────────────────────────────────────────────────────────
+
+
+class TestCatchUp:
+    def test_recomputes_stale_sun_hours(self, switch_obj):
+        switch_obj.sun_hours["timestamp"] = "2000-01-01"
+        with (
+            patch.object(switch_obj, "update_sun_hours") as mock_update,
+            patch.object(switch_obj, "apply_scheduled_theme"),
+        ):
+            switch_obj.catch_up(3600)
+        mock_update.assert_called_once()
+
+    def test_keeps_fresh_sun_hours(self, switch_obj):
+        switch_obj.sun_hours["timestamp"] = paris_today()
+        with (
+            patch.object(switch_obj, "update_sun_hours") as mock_update,
+            patch.object(switch_obj, "apply_scheduled_theme"),
+        ):
+            switch_obj.catch_up(3600)
+        mock_update.assert_not_called()
+
+    def test_applies_scheduled_theme(self, switch_obj):
+        with (
+            patch.object(switch_obj, "update_sun_hours"),
+            patch.object(switch_obj, "apply_scheduled_theme") as mock_apply,
+        ):
+            switch_obj.catch_up(3600)
+        mock_apply.assert_called_once()
+
+    def test_keeps_active_override(self, switch_obj):
+        switch_obj.override.activate(
+            "dark", "duration", datetime(2999, 1, 1, tzinfo=UTC)
+        )
+        with (
+            patch.object(switch_obj, "update_sun_hours"),
+            patch.object(switch_obj, "apply_scheduled_theme") as mock_apply,
+        ):
+            switch_obj.catch_up(3600)
+        mock_apply.assert_not_called()
+
+
+# ─── actor ───────────────────────────────────────────────────────────────────
+
+
+class TestActor:
+    @pytest.fixture
+    def actor(self, switch_obj):
+        switch_obj.actor = actor = ThemeActor()
+        actor.start()
+        yield actor
+        actor.stop(timeout=5)
+
+    def test_switch_runs_on_the_actor_thread(self, switch_obj, actor):
+        threads = []
+        with patch.object(
+            switch_obj,
+            "set_windows_theme",
+            side_effect=lambda theme: threads.append(threading.current_thread().name),
+        ):
+            switch_obj.switch_to_theme("dark", "tray")
+        assert threads == ["theme-actor"]
+        assert switch_obj.theme == "dark"
+
+    def test_override_and_transition_are_serialized(self, switch_obj, actor):
+        switch_obj.sun_hours = {
+            "timestamp": "2024-06-15",
+            "sunrise": "07:00",
+            "sunset": "20:00",
+        }
+        with patch.object(switch_obj, "set_windows_theme"):
+            tray = threading.Thread(
+                target=switch_obj.set_override, args=("dark", "duration", 30)
+            )
+            tray.start()
+            tray.join(5)
+            switch_obj.on_transition("light")
+        # The scheduled switch sees the override set from the other thread
+        assert switch_obj.theme == "dark"
+        assert actor.status()["runs"] == 2
@@ -0,0 +1,192 @@
+import time as time_module
+from datetime import UTC, date, datetime, time, timedelta
+from random import Random
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from src.core.timeline import (
+    POLAR_DAY,
+    POLAR_NIGHT,
+    localize,
+    next_midnight,
+    next_transition,
+    theme_at,
+    transitions,
+)
+
+
+SUN_HOURS = {"sunrise": "07:00", "sunset": "20:00"}
+
+
+class TestThemeAt:
+    def test_light_during_daytime(self):
+        assert theme_at(SUN_HOURS, time(12, 0)) == "light"
+
+    def test_dark_before_sunrise(self):
+        assert theme_at(SUN_HOURS, time(5, 30)) == "dark"
+
+    def test_dark_after_sunset(self):
+        assert theme_at(SUN_HOURS, time(20, 1)) == "dark"
+
+    def test_boundaries_are_light(self):
+        assert theme_at(SUN_HOURS, time(7, 0)) == "light"
+        assert theme_at(SUN_HOURS, time(20, 0)) == "light"
+
+    def test_accepts_seconds_in_hours(self):
+        sun_hours = {"sunrise": "07:00:00", "sunset": "20:00:00"}
+        assert theme_at(sun_hours, time(12, 0)) == "light"
+
+    def test_polar_days_ignore_hours(self):
+        assert theme_at(SUN_HOURS, time(12, 0), POLAR_NIGHT) == "dark"
+        assert theme_at(SUN_HOURS, time(23, 0), POLAR_DAY) == "light"
+
+    def test_missing_sunset_keeps_light_until_midnight(self):
+        sun_hours = {"sunrise": "01:30", "sunset": None}
+        assert theme_at(sun_hours, time(1, 0)) == "dark"
+        assert theme_at(sun_hours, time(23, 59)) == "light"
+
+    def test_night_after_midnight(self):
+        sun_hours = {"sunrise": "01:10", "sunset": "00:15"}
+        assert theme_at(sun_hours, time(0, 5)) == "light"
+        assert theme_at(sun_hours, time(0, 30)) == "dark"
+        assert theme_at(sun_hours, time(12, 0)) == "light"
+
+    def test_missing_sunrise_is_light_from_midnight(self):
+        sun_hours = {"sunrise": None, "sunset": "00:45"}
+        assert theme_at(sun_hours, time(0, 30)) == "light"
+        assert theme_at(sun_hours, time(1, 0)) == "dark"
+
+
+class TestNextTransition:
+    def test_sunset_after_noon(self):
+        result = next_transition(SUN_HOURS, datetime(2024, 6, 15, 12, 0))
+        assert result == (datetime(2024, 6, 15, 20, 0), "dark")
+
+    def test_sunrise_before_dawn(self):
+        result = next_transition(SUN_HOURS, datetime(2024, 6, 15, 5, 0))
+        assert result == (datetime(2024, 6, 15, 7, 0), "light")
+
+    def test_tomorrow_sunrise_after_sunset(self):
+        result = next_transition(SUN_HOURS, datetime(2024, 6, 15, 22, 0))
+        assert result == (datetime(2024, 6, 16, 7, 0), "light")
+
+    def test_none_when_sun_hours_unknown(self):
+        sun_hours = {"sunrise": None, "sunset": None}
+        assert next_transition(sun_hours, datetime(2024, 6, 15, 12, 0)) is None
+
+    def test_single_crossing_day(self):
+        sun_hours = {"sunrise": "01:30", "sunset": None}
+        result = next_transition(sun_hours, datetime(2024, 6, 15, 12, 0))
+        assert result == (datetime(2024, 6, 16, 1, 30), "light")
+
+
+# ─── timezone sweep ──────────────────────────────────────────────────────────
+
+
+ZONES = [
+    "Europe/Paris",
+    "America/New_York",
+    "America/Santiago",
+    "Australia/Sydney",
+    "Australia/Lord_Howe",  # 30 min DST shift
+    "Asia/Kolkata",
+    "Asia/Kathmandu",
+    "Pacific/Chatham",
+    "Pacific/Apia",  # skipped a whole day in 2011
+    "Africa/Casablanca",
+    "UTC",
+]
+YEARS = range(2000, 2041, 4)
+
+
+def sample_days(year: int, rng: Random):
+    """DST transition days of the year plus a few random days"""
+    yield from (date(year, 3, d) for d in range(24, 32))
+    yield from (date(year, 10, d) for d in range(1, 32))
+    yield from (date(year, 1, 1) + timedelta(days=rng.randrange(365)) for _ in range(8))
+
+
+@pytest.mark.parametrize("zone", ZONES)
+class TestTimezoneSweep:
+    def test_localize_round_trips_or_shifts_forward(self, zone):
+        tz, rng = ZoneInfo(zone), Random(zone)
+        for year in YEARS:
+            for day in sample_days(year, rng):
+                hour = time(rng.randrange(24), rng.randrange(60))
+                instant = localize(day, hour, tz)
+                wall = instant.replace(tzinfo=None)
+                requested = datetime.combine(day, hour)
+                # Existing times round-trip, gap times move forward by the gap
+                assert timedelta(0) <= wall - requested <= timedelta(hours=1)
+                assert instant.astimezone(UTC).astimezone(tz) == instant
+
+    def test_transitions_are_ordered_and_in_the_day(self, zone):
+        tz, rng = ZoneInfo(zone), Random(zone)
+        sun_hours = {"sunrise": "06:15", "sunset": "19:45"}
+        for year in YEARS:
+            for day in sample_days(year, rng):
+                (sunrise, light), (sunset, dark) = transitions(sun_hours, day, tz)
+                assert (light, dark) == ("light", "dark")
+                assert sunrise < sunset
+                assert sunrise.date() == sunset.date() == day
+
+    def test_next_transition_is_strictly_after_now(self, zone):
+        tz, rng = ZoneInfo(zone), Random(zone)
+        sun_hours = {"sunrise": "06:15", "sunset": "19:45"}
+        for year in YEARS:
+            for day in sample_days(year, rng):
+                # Half minutes never fall exactly on a switch
+                hour = time(rng.randrange(24), rng.randrange(60), 30)
+                now = localize(day, hour, tz)
+                at, theme = next_transition(sun_hours, now)
+                assert at > now
+                assert at - now <= timedelta(hours=26)
+                # The next switch always leaves the theme expected now
+                assert theme != theme_at(sun_hours, now.time())
+
+    def test_next_midnight_is_next_day(self, zone):
+        tz, rng = ZoneInfo(zone), Random(zone)
+        for year in YEARS:
+            for day in sample_days(year, rng):
+                now = localize(day, time(12), tz)
+                refresh = next_midnight(now, time(0, 1))
+                assert refresh > now
+                assert refresh.date() > day
+
+
+class TestHostZoneIndependence:
+    def test_instants_do_not_depend_on_host_zone(self, monkeypatch):
+        if not hasattr(time_module, "tzset"):
+            pytest.skip("tzset not available on this platform")
+
+        paris = ZoneInfo("Europe/Paris")
+        instant = localize(date(2024, 3, 31), time(7, 0), paris)
+        expected = instant.timestamp()
+
+        for host_zone in ("America/Los_Angeles", "Asia/Tokyo", "UTC"):
+            monkeypatch.setenv("TZ", host_zone)
+            time_module.tzset()
+            assert (
+                localize(date(2024, 3, 31), time(7, 0), paris).timestamp() == expected
+            )
+
+        monkeypatch.undo()
+        time_module.tzset()
+
+
+class TestLocalize:
+    PARIS = ZoneInfo("Europe/Paris")
+
+    def test_gap_moves_forward(self):
+        # 2024-03-31 02:30 does not exist in Paris
+        result = localize(date(2024, 3, 31), time(2, 30), self.PARIS)
+        assert result.replace(tzinfo=None) == datetime(2024, 3, 31, 3, 30)
+
+    def test_overlap_takes_first_occurrence(self):
+        # 2024-10-27 02:30 happens twice in Paris
+        result = localize(date(2024, 10, 27), time(2, 30), self.PARIS)
+        assert result.utcoffset() == timedelta(hours=2)
+
+    def test_naive_without_zone(self):
+        assert localize(date(2024, 6, 15), time(7), None) == datetime(2024, 6, 15, 7)
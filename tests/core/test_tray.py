@@ -1,11 +1,17 @@
+from datetime import datetime
 from unittest.mock import MagicMock, patch
+from zoneinfo import ZoneInfo
 
 import pytest
 
 from src.core.tray import TrayApp
+from src.utils.breaker import CircuitBreaker
 from src.utils.path import Paths
 
 
+PARIS = ZoneInfo("Europe/Paris")
+
+
 @pytest.fixture
 def tray():
     return TrayApp()
@@ -20,6 +26,9 @@ def tray_with_monitor(tray):
         "sunset": "20:00",
         "timestamp": "2024-06-15",
     }
+    monitor.now.return_value = datetime(2024, 6, 15, 12, 0, tzinfo=PARIS)
+    monitor.city.name = "Paris"
+    monitor.override.is_active.return_value = False
     tray.theme_monitor = monitor
     return tray
 
@@ -43,31 +52,74 @@ class TestTrayAppInit:
 
 class TestLoadIcon:
     def test_returns_none_when_icon_file_missing(self, tray, tmp_path):
-        with patch.object(Paths, "get_assets_dir", return_value=tmp_path):
-            result = tray.load_icon()
-        assert result is None
-
-    def test_returns_image_when_icon_file_exists(self, tray, tmp_path):
-        icon_path = tmp_path / "icon.ico"
-        icon_path.touch()
-        mock_image = MagicMock()
-
         with (
             patch.object(Paths, "get_assets_dir", return_value=tmp_path),
-            patch("src.core.tray.Image.open", return_value=mock_image),
+            patch.object(Paths, "get_data_dir", return_value=tmp_path),
         ):
             result = tray.load_icon()
+        assert result is None
+
+    def test_returns_requested_variant(self, tray, tmp_path):
+        with patch.object(Paths, "get_data_dir", return_value=tmp_path):
+            light = tray.load_icon()
+            dark = tray.load_icon("dark")
+
+        assert light.mode == dark.mode == "RGBA"
+        assert light.tobytes() != dark.tobytes()
 
-        assert result is mock_image
+    def test_icon_is_decoded_once(self, tray, tmp_path):
+        with patch.object(Paths, "get_data_dir", return_value=tmp_path):
+            tray.load_icon()
+            with patch("src.core.icons.decode") as mock_decode:
+                tray.load_icon("override")
+        mock_decode.assert_not_called()
+
+
+# ─── update_icon ─────────────────────────────────────────────────────────────
+
+
+class TestUpdateIcon:
+    @pytest.fixture
+    def tray_with_icon(self, tray_with_monitor):
+        tray_with_monitor.icon = MagicMock()
+        tray_with_monitor.variant = "light"
+        tray_with_monitor.theme_monitor.override.is_active.return_value = False
+        return tray_with_monitor
+
+    def test_dark_theme_swaps_image(self, tray_with_icon):
+        tray_with_icon.theme_monitor.theme = "dark"
+        with patch.object(tray_with_icon, "load_icon") as mock_load:
+            tray_with_icon.update_icon()
+        mock_load.assert_called_once_with("dark")
+        assert tray_with_icon.icon.icon is mock_load.return_value
+
+    def test_override_takes_precedence(self, tray_with_icon):
+        tray_with_icon.theme_monitor.override.is_active.return_value = True
+        with patch.object(tray_with_icon, "load_icon") as mock_load:
+            tray_with_icon.update_icon()
+        mock_load.assert_called_once_with("override")
+
+    def test_unchanged_variant_is_not_reloaded(self, tray_with_icon):
+        with patch.object(tray_with_icon, "load_icon") as mock_load:
+            tray_with_icon.update_icon()
+        mock_load.assert_not_called()
+
+    def test_does_nothing_before_setup(self, tray_with_monitor):
+        tray_with_monitor.theme_monitor.theme = "dark"
+        with patch.object(tray_with_monitor, "load_icon") as mock_load:
+            tray_with_monitor.update_icon()
+        mock_load.assert_not_called()
 
 
 # ─── on_force_light ──────────────────────────────────────────────────────────
 
 
 class TestOnForceLight:
-    def test_delegates_to_monitor(self, tray_with_monitor):
+    def test_sets_override_until_next_switch(self, tray_with_monitor):
         tray_with_monitor.on_force_light(None, None)
-        tray_with_monitor.theme_monitor.switch_to_light_theme.assert_called_once()
+        tray_with_monitor.theme_monitor.set_override.assert_called_once_with(
+            "light", "next", None
+        )
 
     def test_does_nothing_without_monitor(self, tray):
         tray.on_force_light(None, None)  # Must not raise
@@ -77,14 +129,129 @@ class TestOnForceLight:
 
 
 class TestOnForceDark:
-    def test_delegates_to_monitor(self, tray_with_monitor):
+    def test_sets_override_until_next_switch(self, tray_with_monitor):
         tray_with_monitor.on_force_dark(None, None)
-        tray_with_monitor.theme_monitor.switch_to_dark_theme.assert_called_once()
+        tray_with_monitor.theme_monitor.set_override.assert_called_once_with(
+            "dark", "next", None
+        )
 
     def test_does_nothing_without_monitor(self, tray):
         tray.on_force_dark(None, None)  # Must not raise
 
 
+# ─── force_theme ─────────────────────────────────────────────────────────────
+
+
+class TestForceTheme:
+    def test_passes_duration(self, tray_with_monitor):
+        tray_with_monitor.force_theme("dark", "duration", 60)
+        tray_with_monitor.theme_monitor.set_override.assert_called_once_with(
+            "dark", "duration", 60
+        )
+
+    def test_refreshes_menu(self, tray_with_monitor):
+        tray_with_monitor.icon = MagicMock()
+        tray_with_monitor.force_theme("dark")
+        tray_with_monitor.icon.update_menu.assert_called_once()
+
+
+# ─── on_resume ───────────────────────────────────────────────────────────────
+
+
+class TestOnResume:
+    def test_ends_override(self, tray_with_monitor):
+        tray_with_monitor.on_resume(None, None)
+        tray_with_monitor.theme_monitor.end_override.assert_called_once()
+
+    def test_does_nothing_without_monitor(self, tray):
+        tray.on_resume(None, None)  # Must not raise
+
+
+# ─── run_action ──────────────────────────────────────────────────────────────
+
+
+class TestRunAction:
+    def test_posted_to_the_runtime(self, tray_with_monitor):
+        tray_with_monitor.runtime = MagicMock()
+        tray_with_monitor.on_force_dark(None, None)
+        tray_with_monitor.runtime.post.assert_called_once_with(
+            tray_with_monitor.force_theme, "dark"
+        )
+        tray_with_monitor.theme_monitor.set_override.assert_not_called()
+
+    def test_inline_without_runtime(self, tray_with_monitor):
+        tray_with_monitor.on_resume(None, None)
+        tray_with_monitor.theme_monitor.end_override.assert_called_once()
+
+
+# ─── override status ─────────────────────────────────────────────────────────
+
+
+class TestOverrideStatus:
+    def test_inactive_without_monitor(self, tray):
+        assert tray.override_active() is False
+
+    def test_text_describes_override(self, tray_with_monitor):
+        tray_with_monitor.theme_monitor.override.describe.return_value = (
+            "Dark for 0h 30m"
+        )
+        assert tray_with_monitor.override_text() == "Override: Dark for 0h 30m"
+
+
+# ─── dynamic menu ────────────────────────────────────────────────────────────
+
+
+class TestDynamicMenu:
+    def test_texts_without_monitor(self, tray):
+        assert tray.theme_text() == "Theme: Unknown"
+        assert tray.next_text() == "Next switch: Unknown"
+        assert tray.location_text() == "Location: Unknown"
+
+    def test_theme_and_location(self, tray_with_monitor):
+        assert tray_with_monitor.theme_text() == "Theme: Light"
+        assert tray_with_monitor.location_text() == "Location: Paris"
+
+    def test_next_switch_today(self, tray_with_monitor):
+        assert tray_with_monitor.next_text() == "Next switch: Dark at 20:00"
+
+    def test_next_switch_tomorrow(self, tray_with_monitor):
+        tray_with_monitor.theme_monitor.now.return_value = datetime(
+            2024, 6, 15, 21, 0, tzinfo=PARIS
+        )
+        assert tray_with_monitor.next_text() == "Next switch: Light tomorrow at 07:00"
+
+    def test_no_switch_on_polar_days(self, tray_with_monitor):
+        tray_with_monitor.theme_monitor.sun_hours.update(sunrise=None, sunset=None)
+        assert tray_with_monitor.next_text() == "Next switch: None"
+
+    def test_menu_updated_once_per_change(self, tray_with_monitor):
+        tray_with_monitor.icon = MagicMock()
+        tray_with_monitor.refresh_menu()
+        tray_with_monitor.refresh_menu()
+        assert tray_with_monitor.icon.update_menu.call_count == 1
+
+        tray_with_monitor.theme_monitor.theme = "dark"
+        tray_with_monitor.refresh_menu()
+        assert tray_with_monitor.icon.update_menu.call_count == 2
+
+    def test_network_item_only_when_offline(self, tray_with_monitor):
+        tray_with_monitor.network = CircuitBreaker()
+        assert tray_with_monitor.network_offline() is False
+
+        tray_with_monitor.network.record_failure()
+        assert tray_with_monitor.network_offline() is True
+        assert tray_with_monitor.network_text().startswith("Network: Offline, retry")
+
+    def test_refresh_updates_icon_and_menu(self, tray_with_monitor):
+        with (
+            patch.object(tray_with_monitor, "update_icon") as mock_icon,
+            patch.object(tray_with_monitor, "refresh_menu") as mock_menu,
+        ):
+            tray_with_monitor.refresh()
+        mock_icon.assert_called_once()
+        mock_menu.assert_called_once()
+
+
 # ─── on_quit ─────────────────────────────────────────────────────────────────
 
 
@@ -98,6 +265,11 @@ class TestOnQuit:
         tray.on_quit(mock_icon, None)
         mock_icon.stop.assert_called_once()
 
+    def test_stops_the_runtime(self, tray):
+        tray.runtime = MagicMock()
+        tray.on_quit(MagicMock(), None)
+        tray.runtime.stop.assert_called_once()
+
 
 # ─── on_show_status ──────────────────────────────────────────────────────────
 
@@ -138,6 +310,38 @@ class TestOnShowStatus:
             mock_run.assert_called_once_with(["notepad.exe", log_file])
 
 
+class TestOnExportSchedule:
+    def test_does_nothing_without_monitor(self, tray):
+        tray.on_export_schedule(None, None)  # Must not raise
+
+    def test_writes_calendar_and_opens_it(self, tray_with_monitor, tmp_path):
+        schedule = tmp_path / "schedule.ics"
+        tray_with_monitor.theme_monitor.upcoming_transitions.return_value = []
+        tray_with_monitor.theme_monitor.cache_key = (
+            "48.8,2.3,Europe/Paris,-0.833,-0.833"
+        )
+
+        with (
+            patch.object(Paths, "get_schedule_file", return_value=schedule),
+            patch("src.core.tray.run") as mock_run,
+        ):
+            tray_with_monitor.on_export_schedule(None, None)
+
+        assert schedule.read_text().startswith("BEGIN:VCALENDAR")
+        mock_run.assert_called_once_with(["explorer.exe", str(schedule)])
+
+    def test_write_error_is_logged(self, tray_with_monitor, tmp_path):
+        schedule = tmp_path / "missing" / "schedule.ics"
+
+        with (
+            patch.object(Paths, "get_schedule_file", return_value=schedule),
+            patch("src.core.tray.run") as mock_run,
+        ):
+            tray_with_monitor.on_export_schedule(None, None)
+
+        mock_run.assert_not_called()
+
+
 # ─── setup_tray ──────────────────────────────────────────────────────────────
 
 
@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+
+import pytest
+from PIL import Image
+
+from src.core.scheduler import scheduler
+from src.core.wallpaper import (
+    DISPLAY_SIZE,
+    KEEP,
+    WallpaperStage,
+    display_size,
+    prepare,
+)
+
+
+PARIS = ZoneInfo("Europe/Paris")
+NOW = datetime(2024, 6, 15, 12, 0, tzinfo=PARIS)
+SIZE = (64, 36)
+
+
+@pytest.fixture
+def sources(tmp_path):
+    light = tmp_path / "light.jpg"
+    dark = tmp_path / "dark.png"
+    Image.new("RGB", (400, 400), (250, 250, 250)).save(light)
+    Image.new("RGB", (160, 90), (10, 10, 10)).save(dark)
+    return {"light": light, "dark": dark}
+
+
+@pytest.fixture
+def stage(sources, tmp_path):
+    stage = WallpaperStage(sources, tmp_path / "cache", size=SIZE)
+    yield stage
+    stage.shutdown()
+    scheduler.clear("prefetch-task")
+
+
+# ─── prepare ──────────────────────────────────────────────────────────────────
+
+
+class TestPrepare:
+    def test_fills_the_display(self, sources):
+        image = prepare(sources["light"], SIZE)
+        assert (image.size, image.mode) == (SIZE, "RGB")
+
+    def test_jpeg_is_decoded_at_reduced_scale(self, sources):
+        with patch("src.core.wallpaper.ImageOps.fit", side_effect=lambda i, *a: i):
+            image = prepare(sources["light"], SIZE)
+        # 400x400 drafted to the smallest scale still covering 64x36
+        assert image.size == (100, 100)
+
+    def test_display_size_fallback(self):
+        with patch("src.core.wallpaper.sys.platform", "linux"):
+            assert display_size() == DISPLAY_SIZE
+
+
+# ─── WallpaperStage ───────────────────────────────────────────────────────────
+
+
+class TestSchedule:
+    def test_prefetch_jobs_lead_the_transitions(self, stage):
+        sunset = NOW + timedelta(hours=8)
+        stage.schedule([(sunset, "dark")], NOW)
+        (job,) = scheduler.get_jobs("prefetch-task")
+        assert job.at == sunset - timedelta(seconds=stage.lead)
+
+    def test_transition_within_lead_time_is_prefetched_at_once(self, stage):
+        soon = NOW + timedelta(minutes=2)
+        stage.schedule([(soon, "dark")], NOW)
+        assert scheduler.get_jobs("prefetch-task") == []
+        assert stage.prepared() == [(soon, "dark")]
+
+    def test_themes_without_wallpaper_are_ignored(self, sources, tmp_path):
+        stage = WallpaperStage({"dark": sources["dark"]}, tmp_path, size=SIZE)
+        stage.schedule([(NOW + timedelta(hours=1), "light")], NOW)
+        assert scheduler.get_jobs("prefetch-task") == []
+        stage.shutdown()
+
+
+class TestPrefetch:
+    def test_keeps_only_the_next_transitions(self, stage):
+        instants = [NOW + timedelta(hours=h) for h in (3, 1, 2)]
+        for at, theme in zip(instants, ("light", "dark", "light"), strict=True):
+            stage.prefetch(theme, at, NOW)
+        assert len(stage.prepared()) == KEEP
+        assert [at for at, _ in stage.prepared()] == sorted(instants)[:KEEP]
+
+    def test_past_transitions_are_dropped(self, stage):
+        stage.prefetch("dark", NOW - timedelta(minutes=1), NOW - timedelta(hours=1))
+        stage.prefetch("light", NOW + timedelta(hours=1), NOW)
+        assert [theme for _, theme in stage.prepared()] == ["light"]
+
+
+class TestApply:
+    def test_applies_the_prefetched_image(self, stage):
+        at = NOW + timedelta(minutes=1)
+        stage.prefetch("dark", at, NOW)
+        with (
+            patch("src.core.wallpaper.prepare") as mock_prepare,
+            patch("src.core.wallpaper.set_wallpaper", return_value=True) as mock_set,
+        ):
+            assert stage.apply("dark", at) is True
+
+        mock_prepare.assert_not_called()
+        path = mock_set.call_args.args[0]
+        assert path == stage.cache_dir / "wallpaper-dark.bmp"
+        with Image.open(path) as image:
+            assert image.size == SIZE
+        # Released once applied
+        assert stage.prepared() == []
+
+    def test_any_prepared_image_of_the_theme_is_used(self, stage):
+        stage.prefetch("dark", NOW + timedelta(minutes=1), NOW)
+        with (
+            patch("src.core.wallpaper.prepare") as mock_prepare,
+            patch("src.core.wallpaper.set_wallpaper", return_value=True),
+        ):
+            stage.apply("dark")
+        mock_prepare.assert_not_called()
+
+    def test_prepared_on_the_spot_without_prefetch(self, stage):
+        with patch("src.core.wallpaper.set_wallpaper", return_value=True) as mock_set:
+            assert stage.apply("light") is True
+        mock_set.assert_called_once()
+
+    def test_theme_without_wallpaper(self, stage):
+        stage.sources.pop("light")
+        with patch("src.core.wallpaper.set_wallpaper") as mock_set:
+            assert stage.apply("light") is False
+        mock_set.assert_not_called()
+
+    def test_unreadable_source(self, stage, tmp_path):
+        broken = tmp_path / "broken.jpg"
+        broken.write_bytes(b"not an image")
+        stage.sources["dark"] = broken
+        with patch("src.core.wallpaper.set_wallpaper") as mock_set:
+            assert stage.apply("dark") is False
+        mock_set.assert_not_called()
@@ -0,0 +1,174 @@
+import json
+import threading
+from datetime import UTC, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import ClassVar
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.core.weather import (
+    CloudForecast,
+    CloudModel,
+    WeatherShift,
+    fetch_cloud_cover,
+)
+from src.utils.breaker import CircuitBreaker
+from src.utils.state import StateStore
+
+
+SUNSET = datetime(2024, 12, 15, 16, 0, tzinfo=UTC)
+
+
+def hourly(cover: float) -> dict:
+    """Forecast around SUNSET, as answered by the service"""
+    start = int((SUNSET - timedelta(hours=3)).timestamp())
+    times = [start + 3600 * h for h in range(7)]
+    return {"hourly": {"time": times, "cloud_cover": [cover] * len(times)}}
+
+
+@pytest.fixture
+def server():
+    """Local stand-in of the forecast service, counting its requests"""
+
+    class Handler(BaseHTTPRequestHandler):
+        body: dict = hourly(100)
+        status = 200
+        requests: ClassVar[list[str]] = []
+
+        def do_GET(self):
+            Handler.requests.append(self.path)
+            payload = json.dumps(Handler.body).encode()
+            self.send_response(Handler.status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    Handler.url = f"http://127.0.0.1:{httpd.server_address[1]}/v1/forecast"
+    yield Handler
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return StateStore(tmp_path / "weather.json")
+
+
+def forecast(server, store, breaker=None, ttl=3600.0) -> CloudForecast:
+    return CloudForecast(48.85, 2.35, store, breaker, ttl, server.url)
+
+
+# ─── fetch_cloud_cover ────────────────────────────────────────────────────────
+
+
+class TestFetch:
+    def test_parses_hourly_cover(self, server):
+        server.body = hourly(80)
+        hours = fetch_cloud_cover(48.85, 2.35, server.url)
+        assert len(hours) == 7
+        assert hours[3] == (SUNSET.timestamp(), 80.0)
+        assert "hourly=cloud_cover" in server.requests[0]
+        assert "latitude=48.85" in server.requests[0]
+
+    def test_missing_values_are_skipped(self, server):
+        server.body = {"hourly": {"time": [1, 2], "cloud_cover": [None, 10]}}
+        assert fetch_cloud_cover(0, 0, server.url) == [(2.0, 10.0)]
+
+
+# ─── CloudForecast ────────────────────────────────────────────────────────────
+
+
+class TestCloudForecast:
+    def test_cached_within_ttl(self, server, store):
+        clouds = forecast(server, store)
+        clouds.hours(now=1000.0)
+        clouds.hours(now=1000.0 + 3599)
+        assert len(server.requests) == 1
+
+    def test_fetched_again_after_ttl(self, server, store):
+        clouds = forecast(server, store)
+        clouds.hours(now=1000.0)
+        clouds.hours(now=1000.0 + 3601)
+        assert len(server.requests) == 2
+
+    def test_cache_survives_restarts(self, server, store, tmp_path):
+        forecast(server, store).hours(now=1000.0)
+        restarted = forecast(server, StateStore(tmp_path / "weather.json"))
+        assert len(restarted.hours(now=1001.0)) == 7
+        assert len(server.requests) == 1
+
+    def test_other_location_is_not_reused(self, server, store):
+        forecast(server, store).hours(now=1000.0)
+        CloudForecast(40.0, -3.7, store, None, 3600.0, server.url).hours(now=1001.0)
+        assert len(server.requests) == 2
+
+    def test_stale_forecast_on_error(self, server, store):
+        clouds = forecast(server, store)
+        clouds.hours(now=1000.0)
+        server.status = 503
+        assert len(clouds.hours(now=99999.0)) == 7
+
+    def test_error_opens_the_circuit(self, server, store):
+        server.status = 500
+        breaker = CircuitBreaker()
+        assert forecast(server, store, breaker).hours() == []
+        assert breaker.allow() is False
+
+    def test_open_circuit_skips_the_request(self, server, store):
+        breaker = CircuitBreaker()
+        breaker.record_failure()
+        assert forecast(server, store, breaker).hours() == []
+        assert server.requests == []
+
+    def test_cover_around_an_instant(self, server, store):
+        server.body = {
+            "hourly": {
+                "time": [int(SUNSET.timestamp()) + 3600 * h for h in (-2, -1, 0, 1)],
+                "cloud_cover": [0, 60, 80, 100],
+            }
+        }
+        assert forecast(server, store).cover(SUNSET) == 80.0
+
+    def test_cover_outside_the_forecast(self, server, store):
+        assert forecast(server, store).cover(SUNSET + timedelta(days=3)) is None
+
+
+# ─── Model ────────────────────────────────────────────────────────────────────
+
+
+class TestCloudModel:
+    @pytest.mark.parametrize(
+        ("cover", "minutes"), [(0, 0), (50, 0), (80, 27), (100, 45)]
+    )
+    def test_linear_above_threshold(self, cover, minutes):
+        offset = CloudModel(50, 45).offset(cover)
+        assert offset == timedelta(minutes=minutes)
+
+    def test_full_threshold_never_shifts(self):
+        assert CloudModel(100, 45).offset(100) == timedelta(0)
+
+
+class TestWeatherShift:
+    def _shift(self, cover):
+        clouds = MagicMock()
+        clouds.cover.return_value = cover
+        return WeatherShift(clouds, CloudModel(50, 60))
+
+    def test_dark_earlier_light_later(self):
+        shift = self._shift(100)
+        assert shift.shift("dark", SUNSET) == SUNSET - timedelta(hours=1)
+        assert shift.shift("light", SUNSET) == SUNSET + timedelta(hours=1)
+
+    def test_unknown_cover_keeps_the_instant(self):
+        assert self._shift(None).shift("dark", SUNSET) == SUNSET
+
+    def test_lead_exceeds_the_largest_shift(self):
+        assert self._shift(0).lead > timedelta(minutes=60)
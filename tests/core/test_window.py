@@ -0,0 +1,108 @@
+import threading
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from src.core.ephemeris import day_ephemeris
+from src.core.window import EphemerisWindow
+
+
+TODAY = date(2024, 6, 15)
+
+
+@pytest.fixture
+def window():
+    window = EphemerisWindow(48.8333, 2.33333, "Europe/Paris", days=3)
+    yield window
+    window.stop()
+
+
+# ─── extend ──────────────────────────────────────────────────────────────────
+
+
+class TestExtend:
+    def test_fills_the_window_from_today(self, window):
+        assert window.extend(TODAY) == 3
+        assert [window.get(TODAY + timedelta(days=k)).day for k in range(3)] == [
+            TODAY + timedelta(days=k) for k in range(3)
+        ]
+
+    def test_matches_day_ephemeris(self, window):
+        window.extend(TODAY)
+        assert window.get(TODAY) == day_ephemeris(
+            48.8333, 2.33333, "Europe/Paris", TODAY
+        )
+
+    def test_computes_only_the_new_day(self, window):
+        window.extend(TODAY)
+        with patch("src.core.window.day_ephemeris", wraps=day_ephemeris) as mock_eph:
+            assert window.extend(TODAY + timedelta(days=1)) == 1
+
+        assert mock_eph.call_args.args[3] == TODAY + timedelta(days=3)
+        assert len(window) == 3
+
+    def test_full_window_computes_nothing(self, window):
+        window.extend(TODAY)
+        assert window.extend(TODAY) == 0
+
+
+# ─── get ─────────────────────────────────────────────────────────────────────
+
+
+class TestGet:
+    def test_empty_window_misses(self, window):
+        assert window.get(TODAY) is None
+
+    def test_advancing_drops_past_days(self, window):
+        window.extend(TODAY)
+        window.get(TODAY + timedelta(days=1))
+        assert len(window) == 2
+        assert window.get(TODAY) is None
+
+    def test_day_after_window_misses(self, window):
+        window.extend(TODAY)
+        assert window.get(TODAY + timedelta(days=5)) is None
+        assert len(window) == 0
+
+
+class TestUpcoming:
+    def test_days_from_the_given_one(self, window):
+        window.extend(TODAY)
+        days = window.upcoming(TODAY + timedelta(days=1))
+        assert [e.day for e in days] == [TODAY + timedelta(days=k) for k in (1, 2)]
+
+    def test_day_outside_window_is_empty(self, window):
+        assert window.upcoming(TODAY) == []
+        window.extend(TODAY)
+        assert window.upcoming(TODAY + timedelta(days=5)) == []
+
+
+# ─── worker ──────────────────────────────────────────────────────────────────
+
+
+class TestWorker:
+    def test_start_fills_in_background(self, window):
+        filled = threading.Event()
+        extend = window.extend
+
+        def tracked_extend(today=None):
+            computed = extend(TODAY)
+            filled.set()
+            return computed
+
+        with (
+            patch.object(window, "extend", side_effect=tracked_extend),
+            patch("src.core.window.lower_thread_priority", return_value=True) as mock_p,
+        ):
+            window.start()
+            assert filled.wait(5)
+
+        mock_p.assert_called_once()
+        assert window.get(TODAY) is not None
+
+    def test_stop_joins_the_worker(self, window):
+        with patch("src.core.window.lower_thread_priority", return_value=True):
+            window.start()
+            window.stop()
+        assert window._thread is None
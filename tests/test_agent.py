@@ -0,0 +1,86 @@
+import subprocess
+import sys
+from configparser import ConfigParser
+from unittest.mock import MagicMock, patch
+
+from src.agent import agent_thread, saved_location
+
+
+def _config(latitude=48.8333, longitude=2.33333, timezone="Europe/Paris"):
+    """Return a configuration holding a saved location."""
+    config = ConfigParser()
+    config.read_dict(
+        {
+            "location": {
+                "city": "Paris",
+                "region": "France",
+                "timezone": timezone,
+                "latitude": str(latitude),
+                "longitude": str(longitude),
+            },
+        }
+    )
+    return config
+
+
+# ─── Location ─────────────────────────────────────────────────────────────────
+
+
+class TestSavedLocation:
+    def test_uses_the_saved_location(self):
+        with patch("src.agent.configurator", _config()):
+            city = saved_location()
+        assert (city.name, city.latitude, city.timezone) == (
+            "Paris",
+            48.8333,
+            "Europe/Paris",
+        )
+
+    def test_estimates_from_the_timezone_when_nothing_saved(self):
+        with patch("src.agent.configurator", _config(0.0, 0.0, "Europe/Paris")):
+            city = saved_location()
+        assert city.timezone == "Europe/Paris"
+        assert city.latitude != 0.0
+
+
+# ─── Agent ────────────────────────────────────────────────────────────────────
+
+
+class TestAgentThread:
+    def test_skips_network_and_scheduling(self):
+        switch = MagicMock()
+        tray_app = MagicMock()
+        tray_app.running = False
+
+        with (
+            patch("requests.get") as mock_get,
+            patch("src.agent.Switch", return_value=switch),
+            patch("src.agent.Subscriber") as mock_subscriber,
+            patch("src.agent.configurator", _config()),
+            patch("src.session.configurator", _config()),
+        ):
+            agent_thread(tray_app)
+
+        mock_get.assert_not_called()
+        switch.update_sun_hours.assert_not_called()
+        assert mock_subscriber.call_args.args[0] == switch.apply_service_event
+        mock_subscriber.return_value.start.assert_called_once()
+        mock_subscriber.return_value.stop.assert_called_once()
+
+    def test_does_not_import_the_scheduling_side(self):
+        scheduling = (
+            "src.app",
+            "src.core.geolocation",
+            "src.core.weather",
+            "src.core.runtime",
+            "requests",
+            "csv",
+        )
+        code = (
+            f"import sys, src.agent; "
+            f"print([m for m in {scheduling!r} if m in sys.modules])"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        assert result.stdout.strip() == "[]"
@@ -0,0 +1,340 @@
+from configparser import ConfigParser
+from datetime import datetime, time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from requests import ConnectionError as RequestsConnectionError
+
+from src.utils.breaker import CircuitBreaker
+
+
+@pytest.fixture(autouse=True)
+def network():
+    """Fresh in-memory circuit breaker, so failures never leak between tests."""
+    breaker = CircuitBreaker()
+    with patch("src.app.network", breaker):
+        yield breaker
+
+
+def _make_tray_app(switch_instance):
+    """Return a MagicMock TrayApp whose running flag stops the scheduler loop."""
+    tray_app = MagicMock()
+    tray_app.running = False
+    tray_app.theme_monitor = switch_instance
+    switch_instance.restore_override.return_value = False
+    return tray_app
+
+
+def _config(latitude=48.8333, longitude=2.33333, timezone="Europe/Paris", **location):
+    """Return a configuration holding a saved location."""
+    config = ConfigParser()
+    config.read_dict(
+        {
+            "location": {
+                "city": "Paris",
+                "region": "France",
+                "timezone": timezone,
+                "latitude": str(latitude),
+                "longitude": str(longitude),
+                **location,
+            },
+            "switch": {"light_elevation": "-0.833", "dark_elevation": "-0.833"},
+        }
+    )
+    return config
+
+
+def _run_main_thread(
+    switch_instance, now_time: time, online: bool = False, config=None
+):
+    """
+    Helper: run main_thread with controlled time and connectivity.
+
+    The Switch mock's sun_hours must already be set by the caller.
+    """
+    from src.app import main_thread
+
+    tray_app = _make_tray_app(switch_instance)
+
+    get_side_effect = MagicMock() if online else RequestsConnectionError("no internet")
+
+    with (
+        patch("src.app.scheduler"),
+        patch("src.app.release_modules"),
+        patch("requests.get", side_effect=get_side_effect),
+        patch("src.app.Switch", return_value=switch_instance),
+        patch("src.app.configurator", config or _config()),
+        patch("src.session.configurator", config or _config()),
+        patch("src.app.save_location"),
+        patch("src.app.datetime") as mock_dt,
+    ):
+        mock_dt.now.return_value.time.return_value = now_time
+        mock_dt.strptime = datetime.strptime
+        main_thread(tray_app)
+
+    return switch_instance
+
+
+def _ipinfo_response():
+    response = MagicMock()
+    response.json.return_value = {
+        "city": "Lyon",
+        "region": "Auvergne-Rhône-Alpes",
+        "timezone": "Europe/Paris",
+        "loc": "45.7485,4.8467",
+    }
+    return response
+
+
+# ─── Connectivity ─────────────────────────────────────────────────────────────
+
+
+class TestConnectivity:
+    def test_continues_when_no_internet(self):
+        switch = MagicMock()
+        switch.sun_hours = {"sunrise": "07:00", "sunset": "20:00"}
+
+        # Should not raise even with no network
+        _run_main_thread(switch, now_time=time(12, 0), online=False)
+
+    def test_failure_opens_the_circuit(self, network):
+        switch = MagicMock()
+        switch.sun_hours = {"sunrise": "07:00", "sunset": "20:00"}
+        _run_main_thread(switch, now_time=time(12, 0), online=False)
+        assert network.failures == 1
+        assert network.allow() is False
+
+    def test_open_circuit_skips_requests(self, network):
+        from src.app import load_location
+
+        network.record_failure()
+        with (
+            patch("src.app.configurator", _config()),
+            patch("requests.get") as mock_get,
+        ):
+            city = load_location()
+        mock_get.assert_not_called()
+        assert city.name == "Paris"
+
+    def test_success_closes_the_circuit_and_saves(self, network):
+        from src.app import load_location
+
+        network.failures = 3
+        config = _config()
+        with (
+            patch("src.app.configurator", config),
+            patch("requests.get", return_value=_ipinfo_response()),
+            patch("src.app.open", MagicMock()),
+        ):
+            city = load_location()
+
+        assert network.failures == 0
+        assert city.name == "Lyon"
+        assert config.getfloat("location", "latitude") == 45.7485
+
+    def test_runs_with_internet_connected(self):
+        switch = MagicMock()
+        switch.sun_hours = {"sunrise": "07:00", "sunset": "20:00"}
+
+        from src.app import main_thread
+
+        tray_app = _make_tray_app(switch)
+
+        with (
+            patch("src.app.scheduler"),
+            patch("src.app.release_modules"),
+            patch("requests.get", return_value=_ipinfo_response()),
+            patch("src.app.Switch", return_value=switch) as mock_switch,
+            patch("src.app.configurator", _config()),
+            patch("src.session.configurator", _config()),
+            patch("src.app.open", MagicMock()),
+            patch("src.app.datetime") as mock_dt,
+        ):
+            mock_dt.now.return_value.time.return_value = time(12, 0)
+            mock_dt.strptime = datetime.strptime
+            main_thread(tray_app)
+
+        assert mock_switch.call_args.args[0].name == "Lyon"
+
+
+# ─── Location providers ───────────────────────────────────────────────────────
+
+
+class TestLocationProviders:
+    def test_pinned_location_skips_the_network(self):
+        from src.app import location_providers
+
+        with patch("src.app.configurator", _config(pinned="true")):
+            providers = location_providers(online=True)
+        assert [p.name for p in providers] == ["pinned"]
+
+    def test_saved_location_estimate_and_http_providers(self):
+        from src.app import location_providers
+
+        with patch("src.app.configurator", _config()):
+            providers = location_providers(online=True)
+        assert [p.name for p in providers] == ["estimate", "cached", "ipinfo", "ipapi"]
+
+    def test_configured_providers(self):
+        from src.app import location_providers
+
+        with patch("src.app.configurator", _config(providers="ip-api, bogus")):
+            providers = location_providers(online=True)
+        assert [p.name for p in providers] == ["estimate", "cached", "ip-api"]
+
+    def test_offline_uses_local_sources_only(self):
+        from src.app import location_providers
+
+        with patch("src.app.configurator", _config()):
+            providers = location_providers(online=False)
+        assert [p.name for p in providers] == ["estimate", "cached"]
+
+    def test_nothing_saved(self):
+        from src.app import location_providers
+
+        with patch("src.app.configurator", _config(0.0, 0.0, "")):
+            providers = location_providers(online=False)
+        assert [p.name for p in providers] == ["estimate"]
+
+
+# ─── Weather ──────────────────────────────────────────────────────────────────
+
+
+class TestWeatherShift:
+    def test_forecast_has_its_own_circuit(self, network):
+        from src.app import forecast_circuit, weather_shift
+
+        config = _config()
+        config.read_dict({"weather": {"enabled": "true"}})
+        with patch("src.app.configurator", config):
+            shift = weather_shift(MagicMock(latitude=48.8, longitude=2.3))
+
+        assert shift is not None
+        assert shift.forecast.breaker is forecast_circuit
+        assert forecast_circuit.name != network.name
+
+
+class TestReleaseNetwork:
+    def test_releases_the_stack_without_weather(self):
+        from src.app import release_network
+
+        with (
+            patch("src.app.settle", return_value=True),
+            patch("src.app.release_modules") as mock_release,
+        ):
+            release_network(None)
+        mock_release.assert_called_once()
+
+    def test_keeps_the_stack_for_the_forecast(self):
+        from src.app import release_network
+
+        with (
+            patch("src.app.settle", return_value=True),
+            patch("src.app.release_modules") as mock_release,
+        ):
+            release_network(MagicMock())
+        mock_release.assert_not_called()
+
+
+# ─── Location fallback ────────────────────────────────────────────────────────
+
+
+class TestLocationFallback:
+    def test_uses_paris_defaults_without_any_answer(self):
+        from src.app import load_location
+
+        with (
+            patch("src.app.configurator", _config(0.0, 0.0, "")),
+            patch("src.app.locate", return_value=None),
+        ):
+            city = load_location(online=False)
+        assert (city.name, city.latitude) == ("Paris", 48.8333)
+
+    def test_estimates_from_timezone_when_nothing_saved(self):
+        from src.app import load_location
+
+        with patch("src.app.configurator", _config(0.0, 0.0, "")):
+            city = load_location(online=False)
+        assert city.timezone.startswith("Etc/GMT")
+
+    def test_uses_configured_location_when_offline(self):
+        from src.app import load_location
+
+        config = _config(43.2965, 5.3698, city="Marseille", region="PACA")
+        with patch("src.app.configurator", config):
+            city = load_location(online=False)
+        assert (city.name, city.latitude) == ("Marseille", 43.2965)
+
+
+# ─── Theme switching at startup ───────────────────────────────────────────────
+
+
+class TestThemeSwitchAtStartup:
+    def test_switches_to_light_during_daytime(self):
+        switch = MagicMock()
+        switch.sun_hours = {"sunrise": "07:00", "sunset": "20:00"}
+
+        _run_main_thread(switch, now_time=time(12, 0))
+
+        switch.switch_to_light_theme.assert_called_once()
+        switch.switch_to_dark_theme.assert_not_called()
+
+    def test_switches_to_dark_during_nighttime(self):
+        switch = MagicMock()
+        switch.sun_hours = {"sunrise": "07:00", "sunset": "20:00"}
+
+        _run_main_thread(switch, now_time=time(23, 0))
+
+        switch.switch_to_dark_theme.assert_called_once()
+        switch.switch_to_light_theme.assert_not_called()
+
+    def test_switches_to_dark_before_sunrise(self):
+        switch = MagicMock()
+        switch.sun_hours = {"sunrise": "07:00", "sunset": "20:00"}
+
+        _run_main_thread(switch, now_time=time(5, 30))
+
+        switch.switch_to_dark_theme.assert_called_once()
+
+    def test_switches_to_light_exactly_at_sunrise(self):
+        switch = MagicMock()
+        switch.sun_hours = {"sunrise": "07:00", "sunset": "20:00"}
+
+        _run_main_thread(switch, now_time=time(7, 0))
+
+        switch.switch_to_light_theme.assert_called_once()
+
+    def test_switches_to_light_exactly_at_sunset(self):
+        # At sunset (inclusive boundary): 07:00 <= 20:00 <= 20:00 → light
+        switch = MagicMock()
+        switch.sun_hours = {"sunrise": "07:00", "sunset": "20:00"}
+
+        _run_main_thread(switch, now_time=time(20, 0))
+
+        switch.switch_to_light_theme.assert_called_once()
+
+    def test_switches_to_dark_after_sunset(self):
+        switch = MagicMock()
+        switch.sun_hours = {"sunrise": "07:00", "sunset": "20:00"}
+
+        _run_main_thread(switch, now_time=time(20, 1))
+
+        switch.switch_to_dark_theme.assert_called_once()
+
+
+# ─── Service mode ─────────────────────────────────────────────────────────────
+
+
+class TestServiceMode:
+    def test_second_service_exits(self, tmp_path):
+        from src.app import run_service
+
+        with (
+            patch("src.app.Paths.get_data_dir", return_value=tmp_path),
+            patch("src.app.FileLock") as mock_lock,
+            patch("src.app.load_location") as mock_location,
+        ):
+            mock_lock.return_value.acquire.return_value = False
+            assert run_service() == 1
+
+        mock_location.assert_not_called()
@@ -0,0 +1,271 @@
+import json
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from src.cli import (
+    BATCH_FORMATS,
+    EXPORT_FORMATS,
+    build_parser,
+    build_request,
+    format_response,
+    main,
+)
+from src.core.batch import WRITERS as BATCH_WRITERS
+from src.core.export import WRITERS as EXPORT_WRITERS
+from src.utils.path import Paths
+
+
+class TestBuildParser:
+    def test_force_requires_valid_theme(self):
+        with pytest.raises(SystemExit):
+            build_parser().parse_args(["force", "blue"])
+
+    def test_parses_force_theme(self):
+        args = build_parser().parse_args(["force", "dark"])
+        assert (args.cmd, args.theme) == ("force", "dark")
+
+    def test_force_for_minutes(self):
+        args = build_parser().parse_args(["force", "dark", "--minutes", "30"])
+        assert build_request(args) == {"cmd": "force", "args": ["dark", "duration", 30]}
+
+    def test_force_until_tomorrow(self):
+        args = build_parser().parse_args(["force", "light", "--tomorrow"])
+        assert build_request(args) == {"cmd": "force", "args": ["light", "tomorrow"]}
+
+
+class TestFormatResponse:
+    def test_error(self):
+        assert format_response("status", {"ok": False, "error": "x"}) == "Error: x"
+
+    def test_next_without_schedule(self):
+        response = {"ok": True, "at": None, "theme": None}
+        assert format_response("next", response) == "No switch scheduled"
+
+    def test_status_with_hooks(self):
+        response = {
+            "ok": True,
+            "theme": "dark",
+            "sunrise": "07:00",
+            "sunset": "20:00",
+            "override": None,
+            "hooks": {
+                "editor": {
+                    "runs": 2,
+                    "mean": 0.5,
+                    "max": 0.8,
+                    "failures": 0,
+                    "timeouts": 1,
+                }
+            },
+        }
+        assert format_response("status", response).endswith(
+            "Hook editor: 2 runs, mean 0.5s, max 0.8s, 0 failed, 1 timed out"
+        )
+
+    def test_status_with_actor(self):
+        response = {
+            "ok": True,
+            "theme": "dark",
+            "sunrise": "07:00",
+            "sunset": "20:00",
+            "override": None,
+            "actor": {
+                "runs": 5,
+                "collapsed": 1,
+                "depth": 0,
+                "max_depth": 2,
+                "mean": 0.01,
+                "max": 0.2,
+            },
+        }
+        assert format_response("status", response).endswith(
+            "Commands: 5 run, 1 collapsed, queue 0 (max 2), "
+            "latency mean 0.01s, max 0.2s"
+        )
+
+
+class TestMain:
+    def test_not_running_exit_code(self, capsys):
+        with patch("src.cli.send_request", return_value=None):
+            assert main(["status"]) == 2
+
+    def test_sends_force_request(self):
+        with patch(
+            "src.cli.send_request", return_value={"ok": True, "theme": "dark"}
+        ) as mock_send:
+            assert main(["force", "dark"]) == 0
+        mock_send.assert_called_once_with({"cmd": "force", "args": ["dark"]})
+
+    def test_error_exit_code(self):
+        with patch("src.cli.send_request", return_value={"ok": False, "error": "x"}):
+            assert main(["resume"]) == 1
+
+    def test_formats_match_the_writers(self):
+        assert tuple(sorted(EXPORT_WRITERS)) == EXPORT_FORMATS
+        assert tuple(sorted(BATCH_WRITERS)) == BATCH_FORMATS
+
+    def test_does_not_import_heavy_modules(self):
+        heavy = (
+            "pystray",
+            "PIL",
+            "astral",
+            "requests",
+            "src.core.batch",
+            "src.core.export",
+            "src.core.stats",
+            "src.core.ephemeris",
+            "concurrent.futures.process",
+            "csv",
+            "gzip",
+        )
+        code = f"import sys, src.cli; print([m for m in {heavy!r} if m in sys.modules])"
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        assert result.stdout.strip() == "[]"
+
+
+class TestBatch:
+    def test_format_from_output_suffix(self, tmp_path, capsys):
+        locations = tmp_path / "offices.csv"
+        locations.write_text(
+            "name,latitude,longitude,timezone\nParis,48.8333,2.33333,Europe/Paris\n"
+        )
+        output = tmp_path / "plan.jsonl"
+
+        args = ["batch", str(locations), "--start", "2024-06-20", "--days", "3"]
+
+        assert main([*args, "-o", str(output)]) == 0
+        lines = output.read_text().splitlines()
+        assert [json.loads(line)["date"] for line in lines] == [
+            "2024-06-20",
+            "2024-06-21",
+            "2024-06-22",
+        ]
+        assert "3 rows written" in capsys.readouterr().err
+
+    def test_streams_csv_to_stdout(self, tmp_path, capsys):
+        locations = tmp_path / "offices.json"
+        locations.write_text(
+            '[{"name": "Paris", "latitude": 48.8, "longitude": 2.3,'
+            ' "timezone": "Europe/Paris"}]'
+        )
+
+        assert main(["batch", str(locations), "--days", "2"]) == 0
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[0] == "location,date,kind,light,dark"
+        assert len(lines) == 3
+
+    def test_unknown_timezone_is_reported(self, tmp_path, capsys):
+        locations = tmp_path / "offices.csv"
+        locations.write_text(
+            "name,latitude,longitude,timezone\nParis,48.8333,2.33333,Europe/Pariss\n"
+        )
+
+        assert main(["batch", str(locations), "--days", "2"]) == 1
+        assert "Invalid location" in capsys.readouterr().err
+
+    def test_late_invalid_location_writes_nothing(self, tmp_path, capsys):
+        locations = tmp_path / "offices.csv"
+        locations.write_text(
+            "name,latitude,longitude,timezone\n"
+            "Paris,48.8333,2.33333,Europe/Paris\n"
+            "Lyon,45.75,4.85,Europe/Lyonn\n"
+        )
+        output = tmp_path / "plan.csv"
+
+        assert main(["batch", str(locations), "--days", "2"]) == 1
+        assert main(["batch", str(locations), "-o", str(output)]) == 1
+        captured = capsys.readouterr()
+        assert captured.out == ""
+        assert "Europe/Lyonn" in captured.err
+        assert not output.exists()
+
+    def test_invalid_location_file(self, tmp_path, capsys):
+        locations = tmp_path / "offices.csv"
+        locations.write_text("name,latitude\nParis,north\n")
+
+        assert main(["batch", str(locations)]) == 1
+        assert "Invalid location" in capsys.readouterr().err
+
+    def test_does_not_contact_the_app(self, tmp_path):
+        locations = tmp_path / "offices.csv"
+        locations.write_text("name,latitude,longitude,timezone\n")
+        with patch("src.cli.send_request") as mock_send:
+            assert main(["batch", str(locations)]) == 0
+        mock_send.assert_not_called()
+
+
+LOCATION = {
+    "ok": True,
+    "latitude": 48.8333,
+    "longitude": 2.33333,
+    "timezone": "Europe/Paris",
+    "light_elevation": -0.833,
+    "dark_elevation": -0.833,
+}
+
+
+class TestExport:
+    def test_streams_calendar_to_stdout(self, capsys):
+        with patch("src.cli.send_request", return_value=LOCATION) as mock_send:
+            assert main(["export", "--start", "2024-06-15", "--days", "2"]) == 0
+
+        mock_send.assert_called_once_with({"cmd": "location", "args": []})
+        out = capsys.readouterr().out
+        assert out.startswith("BEGIN:VCALENDAR\r\n")
+        assert out.count("BEGIN:VEVENT") == 4
+        # Hash of the location and thresholds, as in the tray export
+        assert "UID:2024-06-15-light-" in out
+
+    def test_csv_from_output_suffix(self, tmp_path):
+        output = tmp_path / "plan.csv"
+        with patch("src.cli.send_request", return_value=LOCATION):
+            assert main(["export", "--days", "3", "-o", str(output)]) == 0
+        assert len(output.read_text().splitlines()) == 1 + 6
+
+    def test_not_running(self):
+        with patch("src.cli.send_request", return_value=None):
+            assert main(["export"]) == 2
+
+    def test_error_response(self):
+        error = {"ok": False, "error": "Theme monitor not ready"}
+        with patch("src.cli.send_request", return_value=error):
+            assert main(["export"]) == 1
+
+
+class TestPaths:
+    def test_prints_the_resolved_layout(self, tmp_path, capsys):
+        saved = Paths._layout
+        try:
+            assert main(["--json", "--data-dir", str(tmp_path), "paths"]) == 0
+        finally:
+            Paths._layout = saved
+        layout = json.loads(capsys.readouterr().out)
+        assert layout["mode"] == "custom"
+        assert layout["config"] == str(tmp_path / "config" / "settings.ini")
+
+
+class TestStats:
+    def test_prints_summary_of_event_log(self, tmp_path, capsys):
+        log = tmp_path / "events.jsonl"
+        log.write_text(
+            '{"event": "switch", "theme": "dark", "source": "schedule"}\n'
+            '{"event": "override", "mode": "next"}\n'
+        )
+        assert main(["stats", "--log", str(log)]) == 0
+        out = capsys.readouterr().out
+        assert "Switches: 1 (dark: 1)" in out
+        assert "Overrides: 1 (next: 1)" in out
+
+    def test_json_output(self, tmp_path, capsys):
+        log = tmp_path / "events.jsonl"
+        log.write_text('{"event": "resume"}\n')
+        assert main(["--json", "stats", "--log", str(log)]) == 0
+        assert json.loads(capsys.readouterr().out)["resumed"] == 1
+
+    def test_missing_log(self, tmp_path):
+        assert main(["stats", "--log", str(tmp_path / "events.jsonl")]) == 1
@@ -0,0 +1,105 @@
+import pytest
+
+from src.utils.breaker import (
+    BASE_DELAY,
+    CLOSED,
+    HALF_OPEN,
+    JITTER,
+    MAX_DELAY,
+    OPEN,
+    CircuitBreaker,
+)
+from src.utils.state import StateStore
+
+
+@pytest.fixture
+def breaker():
+    return CircuitBreaker()
+
+
+class TestState:
+    def test_starts_closed(self, breaker):
+        assert breaker.state() == CLOSED
+        assert breaker.allow() is True
+
+    def test_failure_opens_until_retry(self, breaker):
+        breaker.record_failure(now=1000.0)
+        assert breaker.state(now=1001.0) == OPEN
+        assert breaker.allow(now=1001.0) is False
+        assert breaker.state(now=breaker.retry_at) == HALF_OPEN
+
+    def test_half_open_lets_a_single_probe_through(self, breaker):
+        breaker.record_failure(now=1000.0)
+        retry_at = breaker.retry_at
+        assert breaker.allow(now=retry_at) is True
+        assert breaker.allow(now=retry_at) is False
+        assert breaker.allow(now=retry_at + BASE_DELAY - 1) is False
+        # The probe never reported: another one is let through
+        assert breaker.allow(now=retry_at + BASE_DELAY) is True
+
+    def test_failed_probe_opens_for_longer(self, breaker):
+        breaker.record_failure(now=1000.0)
+        breaker.allow(now=breaker.retry_at)
+        breaker.record_failure(now=breaker.retry_at)
+        assert breaker.failures == 2
+        assert breaker.state(now=breaker.retry_at - 1) == OPEN
+
+    def test_success_closes(self, breaker):
+        breaker.record_failure()
+        breaker.record_success()
+        assert breaker.state() == CLOSED
+        assert breaker.failures == 0
+
+
+class TestBackoff:
+    def test_delay_doubles_with_jitter(self, breaker):
+        delays = []
+        for _ in range(4):
+            breaker.record_failure(now=0.0)
+            delays.append(breaker.retry_at)
+        for k, delay in enumerate(delays):
+            expected = BASE_DELAY * 2**k
+            assert expected * (1 - JITTER) <= delay <= expected * (1 + JITTER)
+
+    def test_delay_is_capped(self, breaker):
+        for _ in range(30):
+            breaker.record_failure(now=0.0)
+        assert breaker.retry_at <= MAX_DELAY * (1 + JITTER)
+
+    def test_jitter_spreads_retries(self):
+        retries = set()
+        for _ in range(20):
+            breaker = CircuitBreaker()
+            breaker.record_failure(now=0.0)
+            retries.add(breaker.retry_at)
+        assert len(retries) > 1
+
+
+class TestPersistence:
+    def test_state_survives_restart(self, tmp_path):
+        store = StateStore(tmp_path / "network.json")
+        first = CircuitBreaker(store)
+        first.record_failure()
+
+        second = CircuitBreaker(StateStore(tmp_path / "network.json"))
+        assert second.failures == 1
+        assert second.retry_at == first.retry_at
+        assert second.allow() is False
+
+    def test_success_clears_persisted_state(self, tmp_path):
+        store = StateStore(tmp_path / "network.json")
+        breaker = CircuitBreaker(store)
+        breaker.record_failure()
+        breaker.record_success()
+        assert store.get("network") is None
+
+
+class TestStatus:
+    def test_closed(self, breaker):
+        assert breaker.status() == {"state": CLOSED, "failures": 0, "retry_at": None}
+        assert breaker.describe() == "online"
+
+    def test_open(self, breaker):
+        breaker.record_failure()
+        assert breaker.status()["retry_at"] is not None
+        assert breaker.describe().startswith("retry at ")
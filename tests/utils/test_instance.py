@@ -0,0 +1,55 @@
+from unittest.mock import patch
+
+import pytest
+
+from src.utils.instance import SingleInstance
+from src.utils.path import Paths
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    with patch.object(Paths, "get_data_dir", return_value=tmp_path):
+        yield tmp_path
+
+
+class TestSingleInstance:
+    def test_first_instance_acquires(self, data_dir):
+        instance = SingleInstance("test")
+        assert instance.acquire() is True
+        instance.release()
+
+    def test_second_instance_is_refused(self, data_dir):
+        first = SingleInstance("test")
+        second = SingleInstance("test")
+        first.acquire()
+        assert second.acquire() is False
+        first.release()
+
+    def test_forward_reaches_primary_instance(self, data_dir):
+        received = []
+
+        def handler(request):
+            received.append(request)
+            return {"ok": True}
+
+        first = SingleInstance("test")
+        first.acquire()
+        first.serve(handler)
+        try:
+            response = SingleInstance("test").forward(["--flag"])
+        finally:
+            first.release()
+
+        assert response == {"ok": True}
+        assert received == [{"cmd": "activate", "args": ["--flag"]}]
+
+    def test_forward_gives_up_without_primary(self, data_dir):
+        assert SingleInstance("test").forward([], timeout=0.1) is None
+
+    def test_release_frees_the_lock(self, data_dir):
+        first = SingleInstance("test")
+        first.acquire()
+        first.release()
+        second = SingleInstance("test")
+        assert second.acquire() is True
+        second.release()
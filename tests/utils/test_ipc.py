@@ -0,0 +1,247 @@
+import os
+import queue
+import stat
+import sys
+import time
+from getpass import getuser
+from multiprocessing.connection import Client
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.utils.ipc import (
+    IPCServer,
+    PublishServer,
+    Subscriber,
+    decode,
+    encode,
+    get_address,
+    send_request,
+)
+from src.utils.path import Paths
+
+
+@pytest.fixture
+def address(tmp_path):
+    with patch.object(Paths, "get_data_dir", return_value=tmp_path):
+        yield get_address("test")
+
+
+@pytest.fixture
+def server(address):
+    server = IPCServer(lambda request: {"ok": True, "echo": request}, address)
+    server.start()
+    yield server
+    server.stop()
+
+
+class TestEncoding:
+    def test_round_trip(self):
+        message = {"cmd": "status", "args": ["a", 1]}
+        assert decode(encode(message)) == message
+
+    def test_encoding_is_compact(self):
+        assert encode({"cmd": "status"}) == b'{"cmd":"status"}'
+
+
+class TestGetAddress:
+    def test_unix_socket_in_data_dir(self, tmp_path, address):
+        path, family = address
+        assert family == "AF_UNIX"
+        assert path.startswith(str(tmp_path))
+
+    def test_shared_channel_has_no_user(self, tmp_path):
+        with (
+            patch.object(Paths, "get_data_dir", return_value=tmp_path),
+            patch("src.utils.ipc.getuser", return_value="alice"),
+        ):
+            assert get_address("test")[0].endswith("test-alice.sock")
+            assert get_address("test", shared=True)[0].endswith("test.sock")
+
+
+class TestSendRequest:
+    def test_returns_none_without_server(self, address):
+        assert send_request({"cmd": "status"}, address) is None
+
+    def test_returns_handler_response(self, server, address):
+        response = send_request({"cmd": "status"}, address)
+        assert response == {"ok": True, "echo": {"cmd": "status"}}
+
+    def test_handler_error_is_reported(self, address):
+        def handler(request):
+            raise RuntimeError("boom")
+
+        server = IPCServer(handler, address)
+        server.start()
+        try:
+            response = send_request({"cmd": "status"}, address)
+        finally:
+            server.stop()
+
+        assert response == {"ok": False, "error": "boom"}
+
+
+class TestIPCServer:
+    def test_stop_releases_address(self, server, address):
+        server.stop()
+        assert send_request({"cmd": "status"}, address) is None
+
+    def test_silent_client_does_not_block_the_others(self, server, address):
+        silent = Client(*address)
+        try:
+            response = send_request({"cmd": "status"}, address, timeout=5)
+        finally:
+            silent.close()
+        assert response == {"ok": True, "echo": {"cmd": "status"}}
+
+    def test_start_replaces_stale_socket(self, address):
+        path, _ = address
+        open(path, "w").close()
+
+        server = IPCServer(lambda request: {"ok": True}, address)
+        server.start()
+        try:
+            assert send_request({"cmd": "status"}, address) == {"ok": True}
+        finally:
+            server.stop()
+
+
+# ─── publish / subscribe ─────────────────────────────────────────────────────
+
+
+@pytest.fixture
+def publisher(address):
+    state = {"event": "theme", "theme": "light"}
+    server = PublishServer(lambda request: {"ok": True}, lambda: dict(state), address)
+    server.start()
+    yield server
+    server.stop()
+
+
+def subscribe(address, retry=0.05):
+    events = queue.Queue()
+    subscriber = Subscriber(events.put, address, retry=retry)
+    subscriber.start()
+    return subscriber, events
+
+
+class TestPublishServer:
+    def test_requests_are_still_answered(self, publisher, address):
+        assert send_request({"cmd": "status"}, address) == {"ok": True}
+
+    def test_shared_socket_is_open_to_every_user(self, publisher, address):
+        mode = stat.S_IMODE(os.stat(address[0]).st_mode)
+        assert mode == 0o666
+
+    def test_shared_pipe_has_its_own_security_descriptor(self):
+        pipe = MagicMock()
+        channel = (r"\\.\pipe\AutoSwitchTheme-test", "AF_PIPE")
+        server = PublishServer(lambda request: {"ok": True}, dict, channel)
+        with patch.dict(sys.modules, {"src.utils.pipe": pipe}):
+            listener = server._listen()
+
+        assert listener is pipe.SharedPipeListener.return_value
+        pipe.SharedPipeListener.assert_called_once_with(channel[0])
+
+    def test_subscriber_receives_snapshot_then_events(self, publisher, address):
+        subscriber, events = subscribe(address)
+        try:
+            assert events.get(timeout=5) == {"event": "theme", "theme": "light"}
+            publisher.publish({"event": "theme", "theme": "dark"})
+            assert events.get(timeout=5) == {"event": "theme", "theme": "dark"}
+        finally:
+            subscriber.stop()
+
+    def test_events_reach_every_subscriber(self, publisher, address):
+        sessions = [subscribe(address) for _ in range(3)]
+        try:
+            for _, events in sessions:
+                events.get(timeout=5)
+            publisher.publish({"event": "ping"})
+            for _, events in sessions:
+                assert events.get(timeout=5) == {"event": "ping"}
+        finally:
+            for subscriber, _ in sessions:
+                subscriber.stop()
+
+    def test_disconnected_subscriber_is_dropped(self, publisher, address):
+        subscriber, events = subscribe(address)
+        events.get(timeout=5)
+        subscriber.stop()
+
+        # The first write may still be buffered by the kernel, and the
+        # failure is only seen by the sender thread of the subscriber
+        for _ in range(100):
+            publisher.publish({"event": "ping"})
+            if not publisher.subscribers:
+                break
+            time.sleep(0.02)
+        assert publisher.subscribers == []
+
+    def test_stalled_subscriber_never_blocks_the_publisher(self, publisher, address):
+        stalled = Client(*address)
+        stalled.send_bytes(encode({"cmd": "subscribe", "user": "stalled"}))
+        subscriber, events = subscribe(address)
+        try:
+            events.get(timeout=5)
+            # Far more than the pipe buffer, never read by the stalled session
+            payload = "x" * 65536
+            started = time.monotonic()
+            for n in range(200):
+                publisher.publish({"event": "ping", "n": n, "payload": payload})
+                time.sleep(0.002)
+            assert time.monotonic() - started < 5
+            assert [s.user for s in publisher.subscribers] == [getuser()]
+
+            # The live session still receives every event
+            received = [events.get(timeout=5)["n"] for _ in range(200)]
+            assert received == list(range(200))
+        finally:
+            subscriber.stop()
+            stalled.close()
+
+
+class TestSubscriber:
+    def test_connects_once_the_server_starts(self, address):
+        subscriber, events = subscribe(address)
+        server = PublishServer(lambda r: {"ok": True}, lambda: {"n": 1}, address)
+        try:
+            server.start()
+            assert events.get(timeout=5) == {"n": 1}
+        finally:
+            subscriber.stop()
+            server.stop()
+
+    def test_reconnects_after_server_restart(self, address):
+        first = PublishServer(lambda r: {"ok": True}, lambda: {"n": 1}, address)
+        first.start()
+        subscriber, events = subscribe(address)
+        try:
+            assert events.get(timeout=5) == {"n": 1}
+            first.stop()
+
+            second = PublishServer(lambda r: {"ok": True}, lambda: {"n": 2}, address)
+            second.start()
+            try:
+                assert events.get(timeout=5) == {"n": 2}
+            finally:
+                second.stop()
+        finally:
+            subscriber.stop()
+
+    def test_handler_error_keeps_listening(self, publisher, address):
+        received = queue.Queue()
+
+        def on_event(event):
+            received.put(event)
+            if event.get("theme") == "light":
+                raise RuntimeError("boom")
+
+        subscriber = Subscriber(on_event, address, retry=0.05)
+        subscriber.start()
+        try:
+            received.get(timeout=5)
+            publisher.publish({"event": "theme", "theme": "dark"})
+            assert received.get(timeout=5)["theme"] == "dark"
+        finally:
+            subscriber.stop()
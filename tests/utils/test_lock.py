@@ -0,0 +1,39 @@
+from src.utils.lock import FileLock
+
+
+class TestFileLock:
+    def test_acquire_creates_lock_file(self, tmp_path):
+        lock = FileLock(tmp_path / "test.lock")
+        assert lock.acquire(timeout=0) is True
+        assert (tmp_path / "test.lock").exists()
+        lock.release()
+
+    def test_second_lock_on_same_file_fails(self, tmp_path):
+        first = FileLock(tmp_path / "test.lock")
+        second = FileLock(tmp_path / "test.lock")
+        assert first.acquire(timeout=0) is True
+        assert second.acquire(timeout=0) is False
+        first.release()
+
+    def test_lock_available_after_release(self, tmp_path):
+        first = FileLock(tmp_path / "test.lock")
+        second = FileLock(tmp_path / "test.lock")
+        first.acquire(timeout=0)
+        first.release()
+        assert second.acquire(timeout=0) is True
+        second.release()
+
+    def test_acquire_is_reentrant_for_same_object(self, tmp_path):
+        lock = FileLock(tmp_path / "test.lock")
+        lock.acquire(timeout=0)
+        assert lock.acquire(timeout=0) is True
+        lock.release()
+
+    def test_context_manager_releases(self, tmp_path):
+        lock = FileLock(tmp_path / "test.lock")
+        with lock:
+            assert lock.locked is True
+        assert lock.locked is False
+
+    def test_release_without_acquire_does_nothing(self, tmp_path):
+        FileLock(tmp_path / "test.lock").release()  # Must not raise
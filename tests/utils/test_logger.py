@@ -1,6 +1,15 @@
+import gzip
+import json
 import logging
+import os
+import threading
+from datetime import UTC, datetime, timedelta
+from time import time
+from unittest.mock import patch
 
-from src.utils.logger import Logger
+import pytest
+
+from src.utils.logger import BoundedRotatingFileHandler, Logger, log_event
 
 
 class TestSetupLogger:
@@ -50,3 +59,162 @@ class TestFormatter:
     def test_returns_logging_formatter_instance(self, tmp_path):
         formatter = Logger(tmp_path / "test.log")._formatter()
         assert isinstance(formatter, logging.Formatter)
+
+
+# ─── BoundedRotatingFileHandler ──────────────────────────────────────────────
+
+
+def make_logger(name: str, handler: BoundedRotatingFileHandler) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+class TestBoundedRotatingFileHandler:
+    def test_rolls_over_at_max_size(self, tmp_path):
+        handler = BoundedRotatingFileHandler(tmp_path / "app.log", max_bytes=200)
+        logger = make_logger("size_logger", handler)
+        for k in range(10):
+            logger.info(f"message {k:02d} " + "x" * 40)
+        handler.wait()
+        handler.close()
+
+        assert (tmp_path / "app.log").stat().st_size <= 200
+        backups = handler.backups()
+        assert backups
+        assert all(b.suffix == ".gz" for b in backups)
+        with gzip.open(backups[0], "rt") as f:
+            assert "message 00" in f.read()
+
+    def test_rolls_over_at_max_age(self, tmp_path):
+        handler = BoundedRotatingFileHandler(
+            tmp_path / "app.log", max_age=timedelta(days=1)
+        )
+        logger = make_logger("age_logger", handler)
+        logger.info("before")
+        handler.rollover_at = time() - 1
+        logger.info("after")
+        handler.wait()
+        handler.close()
+
+        assert (tmp_path / "app.log").read_text() == "after\n"
+        assert len(handler.backups()) == 1
+
+    def test_rollover_does_not_compress_inline(self, tmp_path):
+        handler = BoundedRotatingFileHandler(tmp_path / "app.log", max_bytes=10)
+        logger = make_logger("inline_logger", handler)
+        threads = []
+        with patch.object(handler, "compress") as mock_compress:
+            mock_compress.side_effect = lambda backup: threads.append(
+                threading.current_thread().name
+            )
+            logger.info("a long enough message")
+            logger.info("another long message")
+            handler.wait()
+        handler.close()
+
+        assert threads == ["log-compress"]
+
+    def test_prunes_beyond_count_and_total_size(self, tmp_path):
+        for k in range(5):
+            with gzip.open(tmp_path / f"app.log.2024010{k}-000000.gz", "wb") as f:
+                f.write(os.urandom(1000))
+
+        handler = BoundedRotatingFileHandler(
+            tmp_path / "app.log", backup_count=3, max_total_bytes=2500
+        )
+        handler.prune()
+        handler.close()
+
+        assert [b.name for b in handler.backups()] == [
+            "app.log.20240103-000000.gz",
+            "app.log.20240104-000000.gz",
+        ]
+
+    def test_uncompressed_backups_count_in_the_caps(self, tmp_path):
+        for k in range(3):
+            with gzip.open(tmp_path / f"app.log.2024010{k}-000000.gz", "wb") as f:
+                f.write(os.urandom(1000))
+        (tmp_path / "app.log.20240103-000000").write_bytes(os.urandom(2000))
+
+        # Left uncompressed, as if pending on the background thread
+        with patch.object(BoundedRotatingFileHandler, "submit"):
+            handler = BoundedRotatingFileHandler(
+                tmp_path / "app.log", backup_count=3, max_total_bytes=3500
+            )
+        handler.prune()
+        handler.close()
+
+        assert [b.name for b in handler.backups()] == [
+            "app.log.20240102-000000.gz",
+            "app.log.20240103-000000",
+        ]
+
+    def test_compresses_leftovers_on_start(self, tmp_path):
+        leftover = tmp_path / "app.log.20240101-000000"
+        leftover.write_text("old\n")
+
+        handler = BoundedRotatingFileHandler(tmp_path / "app.log")
+        handler.wait()
+        handler.close()
+
+        assert not leftover.exists()
+        assert (tmp_path / "app.log.20240101-000000.gz").exists()
+
+    def test_age_starts_at_last_rollover(self, tmp_path):
+        (tmp_path / "app.log.20240101-000000.gz").write_bytes(b"")
+        handler = BoundedRotatingFileHandler(
+            tmp_path / "app.log", max_age=timedelta(days=30)
+        )
+        handler.close()
+        assert handler.rollover_at < time()
+
+    def test_failed_rename_is_retried_later(self, tmp_path):
+        handler = BoundedRotatingFileHandler(tmp_path / "app.log", max_bytes=10)
+        logger = make_logger("locked_logger", handler)
+        logger.info("first message")
+        with patch("src.utils.logger.os.replace", side_effect=PermissionError):
+            logger.info("second message")
+        logger.info("third message")
+        handler.close()
+
+        assert handler.retry_at > time()
+        assert (tmp_path / "app.log").read_text().count("message") == 3
+
+
+# ─── structured events ───────────────────────────────────────────────────────
+
+
+class TestEventLog:
+    @pytest.fixture
+    def event_log(self, tmp_path):
+        logger = Logger(tmp_path / "events.jsonl").setup_event_log()
+        yield tmp_path / "events.jsonl"
+        for handler in logger.handlers:
+            handler.close()
+        logger.handlers = []
+        logger.setLevel(logging.NOTSET)
+
+    def test_writes_one_json_object_per_event(self, event_log):
+        log_event("switch", theme="dark", source="schedule")
+        log_event("resume")
+
+        lines = [json.loads(line) for line in event_log.read_text().splitlines()]
+        assert [e["event"] for e in lines] == ["switch", "resume"]
+        assert lines[0]["theme"] == "dark"
+        assert lines[0]["source"] == "schedule"
+        assert datetime.fromisoformat(lines[0]["ts"]).tzinfo is not None
+
+    def test_datetimes_are_iso_formatted(self, event_log):
+        at = datetime(2024, 6, 15, 21, 0, tzinfo=UTC)
+        log_event("switch", scheduled=at, actual=None)
+        event = json.loads(event_log.read_text())
+        assert event["scheduled"] == "2024-06-15T21:00:00+00:00"
+        assert event["actual"] is None
+
+    def test_disabled_without_setup(self):
+        with patch("src.utils.logger.logging.Logger.info") as mock_info:
+            log_event("switch", theme="dark")
+        mock_info.assert_not_called()
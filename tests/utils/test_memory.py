@@ -0,0 +1,85 @@
+import subprocess
+import sys
+import tracemalloc
+import types
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.core.scheduler import Scheduler
+from src.utils.memory import RSS_BUDGET, release_modules, rss_bytes
+
+
+# ─── release_modules ─────────────────────────────────────────────────────────
+
+
+class TestReleaseModules:
+    def test_releases_package_and_submodules(self, monkeypatch):
+        for name in ("fakenet", "fakenet.adapters", "fakenetwork"):
+            monkeypatch.setitem(sys.modules, name, types.ModuleType(name))
+
+        assert release_modules("fakenet") == 2
+        assert "fakenet" not in sys.modules
+        assert "fakenet.adapters" not in sys.modules
+        assert "fakenetwork" in sys.modules
+
+    def test_missing_modules_are_ignored(self):
+        assert release_modules("not_an_imported_module") == 0
+
+
+# ─── rss_bytes ───────────────────────────────────────────────────────────────
+
+
+class TestRssBytes:
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="procfs")
+    def test_reports_resident_size(self):
+        rss = rss_bytes()
+        assert isinstance(rss, int)
+        assert rss > 0
+
+
+# ─── footprint ───────────────────────────────────────────────────────────────
+
+
+class TestFootprint:
+    def test_daily_rescheduling_does_not_grow(self):
+        scheduler = Scheduler(jump_threshold=float("inf"))
+        start = datetime(2024, 1, 1, 12, 0)
+
+        def simulate(days):
+            for day in range(days):
+                now = start + timedelta(days=day)
+                scheduler.clear("theme")
+                scheduler.at(now + timedelta(hours=6), lambda: None, tag="theme")
+                scheduler.at(now + timedelta(hours=18), lambda: None, tag="theme")
+                scheduler.run_pending(now.timestamp())
+
+        simulate(30)
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            simulate(3650)
+            after = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+
+        assert after - before < 64 * 1024
+
+    def test_startup_stays_under_budget(self):
+        script = (
+            "import src.app\n"
+            "from src.utils.memory import NETWORK_MODULES, release_modules, rss_bytes\n"
+            "release_modules(*NETWORK_MODULES)\n"
+            "print(rss_bytes())\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            text=True,
+            timeout=60,
+            check=True,
+        )
+        rss = result.stdout.strip().splitlines()[-1]
+        if rss == "None":
+            pytest.skip("Resident size not available on this platform")
+        assert int(rss) < RSS_BUDGET
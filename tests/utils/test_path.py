@@ -1,8 +1,24 @@
-import os
+import sys
 from pathlib import Path
 from unittest.mock import patch
 
-from src.utils.path import Paths
+import pytest
+
+from src.utils.path import (
+    CUSTOM,
+    ENV_DATA_DIR,
+    ENV_PORTABLE,
+    ENV_USER_DIR,
+    INSTALLED,
+    PER_USER,
+    PORTABLE,
+    Layout,
+    Paths,
+    executable_dir,
+    provision,
+    resolve_layout,
+    writable,
+)
 
 
 class TestGetAppDir:
@@ -23,50 +39,141 @@ class TestGetAssetsDir:
         assert Paths.get_assets_dir().parent == Paths.get_app_dir()
 
 
-class TestGetDataDir:
-    def test_uses_programdata_env_var(self, tmp_path):
-        with patch.dict(os.environ, {"PROGRAMDATA": str(tmp_path)}):
-            result = Paths.get_data_dir()
-        assert result == tmp_path / "AutoSwitchTheme"
-
-    def test_creates_directory_if_missing(self, tmp_path):
-        with patch.dict(os.environ, {"PROGRAMDATA": str(tmp_path)}):
-            result = Paths.get_data_dir()
-        assert result.is_dir()
+@pytest.fixture
+def registry():
+    """Restore the process-wide layout after the test."""
+    saved = Paths._layout
+    yield
+    Paths._layout = saved
 
-    def test_returns_path_containing_app_name(self):
-        result = Paths.get_data_dir()
-        assert "AutoSwitchTheme" in str(result)
 
-    def test_fallback_when_programdata_missing(self, tmp_path):
-        env = {k: v for k, v in os.environ.items() if k != "PROGRAMDATA"}
-        with patch.dict(os.environ, env, clear=True):
-            result = Paths.get_data_dir()
-        assert "AutoSwitchTheme" in str(result)
+class TestResolveLayout:
+    def test_installed_defaults(self, tmp_path):
+        layout = resolve_layout([], {}, tmp_path)
+        assert layout.mode == INSTALLED
+        assert layout.data_dir.name == "AutoSwitchTheme"
+        assert layout.user_dir.name == "AutoSwitchTheme"
 
+    def test_uses_programdata_env_var(self, tmp_path):
+        with patch("src.utils.path.os_name", "nt"):
+            layout = resolve_layout(
+                [], {"PROGRAMDATA": str(tmp_path), "APPDATA": str(tmp_path)}, tmp_path
+            )
+        assert layout.data_dir == tmp_path / "AutoSwitchTheme"
 
-class TestGetUserDataDir:
     def test_uses_appdata_env_var(self, tmp_path):
-        with patch.dict(os.environ, {"APPDATA": str(tmp_path)}):
-            result = Paths.get_user_data_dir()
-        assert result == tmp_path / "AutoSwitchTheme"
-
-    def test_creates_directory_if_missing(self, tmp_path):
-        with patch.dict(os.environ, {"APPDATA": str(tmp_path)}):
-            result = Paths.get_user_data_dir()
-        assert result.is_dir()
+        with patch("src.utils.path.os_name", "nt"):
+            layout = resolve_layout([], {"APPDATA": str(tmp_path)}, tmp_path)
+        assert layout.user_dir == tmp_path / "AutoSwitchTheme"
 
     def test_fallback_uses_getlogin(self, tmp_path):
-        env = {k: v for k, v in os.environ.items() if k != "APPDATA"}
         with (
-            patch.dict(os.environ, env, clear=True),
+            patch("src.utils.path.os_name", "nt"),
             patch("src.utils.path.getlogin", return_value="testuser"),
-            patch.object(
-                Path, "mkdir"
-            ),  # Prevent actual mkdir on the protected C:\Users\testuser path
         ):
-            result = Paths.get_user_data_dir()
-        assert "AutoSwitchTheme" in str(result)
+            layout = resolve_layout([], {}, tmp_path)
+        assert layout.user_dir == Path("C:/Users/testuser/AppData/AutoSwitchTheme")
+        assert layout.data_dir == Path("C:/ProgramData/AutoSwitchTheme")
+
+    def test_env_overrides(self, tmp_path):
+        environ = {ENV_DATA_DIR: str(tmp_path / "d"), ENV_USER_DIR: str(tmp_path / "u")}
+        layout = resolve_layout([], environ, tmp_path)
+        assert (layout.mode, layout.data_dir, layout.user_dir) == (
+            CUSTOM,
+            tmp_path / "d",
+            tmp_path / "u",
+        )
+
+    def test_command_line_wins_over_env(self, tmp_path):
+        argv = ["--data-dir", str(tmp_path / "cli"), f"--user-dir={tmp_path / 'u'}"]
+        layout = resolve_layout(argv, {ENV_DATA_DIR: str(tmp_path / "env")}, tmp_path)
+        assert layout.data_dir == tmp_path / "cli"
+        assert layout.user_dir == tmp_path / "u"
+
+    def test_portable_flag(self, tmp_path):
+        layout = resolve_layout(["--portable"], {}, tmp_path)
+        assert layout.mode == PORTABLE
+        assert layout.data_dir == layout.user_dir == tmp_path / "data"
+
+    def test_portable_env_var(self, tmp_path):
+        layout = resolve_layout([], {ENV_PORTABLE: "1"}, tmp_path)
+        assert layout.mode == PORTABLE
+
+    def test_portable_marker_next_to_the_app(self, tmp_path):
+        (tmp_path / "portable").touch()
+        layout = resolve_layout([], {ENV_DATA_DIR: "/elsewhere"}, tmp_path)
+        assert layout.data_dir == tmp_path / "data"
+
+    def test_compiled_app_dir_is_the_executable_folder(self, tmp_path):
+        (tmp_path / "portable").touch()
+        exe = tmp_path / "AutoSwitchTheme.exe"
+        with (
+            patch.object(sys, "frozen", True, create=True),
+            patch.object(sys, "argv", [str(exe)]),
+        ):
+            assert executable_dir() == tmp_path.resolve()
+            layout = resolve_layout([], {})
+        assert layout.mode == PORTABLE
+        assert layout.data_dir == tmp_path.resolve() / "data"
+
+    def test_source_app_dir_is_the_project_root(self):
+        assert executable_dir() == Paths.get_app_dir()
+
+    def test_does_not_touch_the_disk(self, tmp_path):
+        resolve_layout([], {ENV_DATA_DIR: str(tmp_path / "d")}, tmp_path)
+        assert not (tmp_path / "d").exists()
+
+
+class TestProvision:
+    def test_creates_directories(self, tmp_path):
+        layout = provision(
+            Layout(CUSTOM, tmp_path, tmp_path / "data", tmp_path / "user")
+        )
+        assert layout.mode == CUSTOM
+        assert (tmp_path / "data" / "config").is_dir()
+        assert (tmp_path / "data" / "logs").is_dir()
+        assert (tmp_path / "user").is_dir()
+
+    def test_per_user_fallback_when_data_dir_not_writable(self, tmp_path):
+        with patch("src.utils.path.writable", return_value=False):
+            layout = provision(
+                Layout(INSTALLED, tmp_path, tmp_path / "data", tmp_path / "user")
+            )
+        assert (layout.mode, layout.data_dir) == (PER_USER, tmp_path / "user")
+        assert (tmp_path / "user" / "config").is_dir()
+
+    def test_writable(self, tmp_path):
+        assert writable(tmp_path / "new")
+        assert list((tmp_path / "new").iterdir()) == []
+
+    def test_not_writable_when_blocked_by_a_file(self, tmp_path):
+        (tmp_path / "file").touch()
+        assert not writable(tmp_path / "file" / "dir")
+
+
+class TestRegistry:
+    def test_resolved_once(self, tmp_path, registry):
+        Paths.configure([], {ENV_DATA_DIR: str(tmp_path / "d")})
+        with patch("src.utils.path.resolve_layout") as mock_resolve:
+            Paths.get_data_dir()
+            Paths.get_config_file()
+            Paths.get_log_file()
+        mock_resolve.assert_not_called()
+
+    def test_files_in_the_resolved_layout(self, tmp_path, registry):
+        Paths.configure(
+            [], {ENV_DATA_DIR: str(tmp_path / "d"), ENV_USER_DIR: str(tmp_path / "u")}
+        )
+        assert Paths.get_config_file() == tmp_path / "d" / "config" / "settings.ini"
+        assert Paths.get_log_file() == tmp_path / "d" / "logs" / "app.log"
+        assert Paths.get_state_file() == tmp_path / "u" / "state.json"
+        assert Paths.get_config_file().parent.is_dir()
+
+    def test_describe(self, tmp_path, registry):
+        Paths.configure(["--data-dir", str(tmp_path)], {})
+        described = Paths.layout().describe()
+        assert described["mode"] == CUSTOM
+        assert described["logs"] == str(tmp_path / "logs")
 
 
 class TestGetConfigFile:
@@ -80,11 +187,6 @@ class TestGetConfigFile:
             result = Paths.get_config_file()
         assert result.parent.name == "config"
 
-    def test_creates_config_directory(self, tmp_path):
-        with patch.object(Paths, "get_data_dir", return_value=tmp_path):
-            result = Paths.get_config_file()
-        assert result.parent.is_dir()
-
 
 class TestGetLogFile:
     def test_filename_is_app_log(self, tmp_path):
@@ -97,7 +199,37 @@ class TestGetLogFile:
             result = Paths.get_log_file()
         assert result.parent.name == "logs"
 
-    def test_creates_logs_directory(self, tmp_path):
+
+class TestGetEventLogFile:
+    def test_next_to_app_log(self, tmp_path):
         with patch.object(Paths, "get_data_dir", return_value=tmp_path):
-            result = Paths.get_log_file()
-        assert result.parent.is_dir()
+            result = Paths.get_event_log_file()
+        assert result == tmp_path / "logs" / "events.jsonl"
+
+
+class TestGetStateFile:
+    def test_filename_is_state_json(self, tmp_path):
+        with patch.object(Paths, "get_user_data_dir", return_value=tmp_path):
+            result = Paths.get_state_file()
+        assert result == tmp_path / "state.json"
+
+
+class TestGetWallpaperDir:
+    def test_in_user_data_dir(self, tmp_path):
+        with patch.object(Paths, "get_user_data_dir", return_value=tmp_path):
+            result = Paths.get_wallpaper_dir()
+        assert result == tmp_path / "wallpapers"
+
+
+class TestGetWeatherFile:
+    def test_in_data_dir(self, tmp_path):
+        with patch.object(Paths, "get_data_dir", return_value=tmp_path):
+            result = Paths.get_weather_file()
+        assert result == tmp_path / "weather.json"
+
+
+class TestGetScheduleFile:
+    def test_filename_is_schedule_ics(self, tmp_path):
+        with patch.object(Paths, "get_user_data_dir", return_value=tmp_path):
+            result = Paths.get_schedule_file()
+        assert result == tmp_path / "schedule.ics"
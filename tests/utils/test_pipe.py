@@ -0,0 +1,58 @@
+import ctypes
+import os
+from ctypes import wintypes
+from multiprocessing.connection import Client
+
+import pytest
+
+
+# Named pipes and their security descriptors only exist on Windows
+pipe = pytest.importorskip("src.utils.pipe")
+
+SE_FILE_OBJECT = 1
+DACL_SECURITY_INFORMATION = 4
+
+
+@pytest.fixture
+def listener():
+    listener = pipe.SharedPipeListener(rf"\\.\pipe\AutoSwitchTheme-test-{os.getpid()}")
+    yield listener
+    listener.close()
+
+
+def read_dacl(address: str) -> str:
+    """DACL of a named object, in SDDL"""
+    advapi32 = ctypes.WinDLL("advapi32")
+    descriptor, text = wintypes.LPVOID(), wintypes.LPWSTR()
+    assert not advapi32.GetNamedSecurityInfoW(
+        address,
+        SE_FILE_OBJECT,
+        DACL_SECURITY_INFORMATION,
+        None,
+        None,
+        None,
+        None,
+        ctypes.byref(descriptor),
+    )
+    try:
+        assert advapi32.ConvertSecurityDescriptorToStringSecurityDescriptorW(
+            descriptor, 1, DACL_SECURITY_INFORMATION, ctypes.byref(text), None
+        )
+        return text.value or ""
+    finally:
+        ctypes.windll.kernel32.LocalFree(descriptor)
+
+
+class TestSharedPipeListener:
+    def test_authenticated_users_can_read_and_write(self, listener):
+        dacl = read_dacl(listener.address)
+        assert ";;;AU)" in dacl
+        assert ";;;WD)" not in dacl
+
+    def test_messages_round_trip(self, listener):
+        with Client(listener.address, "AF_PIPE") as client:
+            client.send_bytes(b"ping")
+            with listener.accept() as conn:
+                assert conn.recv_bytes() == b"ping"
+                conn.send_bytes(b"pong")
+                assert client.recv_bytes() == b"pong"
@@ -0,0 +1,38 @@
+import sys
+from unittest.mock import MagicMock, patch
+
+from src.utils.priority import NICE_LOWEST, lower_thread_priority
+
+
+class TestLowerThreadPriority:
+    def test_posix_lowers_calling_thread(self):
+        with (
+            patch.object(sys, "platform", "linux"),
+            patch("src.utils.priority.os.setpriority", create=True) as mock_set,
+            patch("src.utils.priority.threading.get_native_id", return_value=42),
+        ):
+            assert lower_thread_priority() is True
+
+        assert mock_set.call_args.args[1:] == (42, NICE_LOWEST)
+
+    def test_posix_failure_is_reported(self):
+        with (
+            patch.object(sys, "platform", "linux"),
+            patch(
+                "src.utils.priority.os.setpriority",
+                side_effect=PermissionError,
+                create=True,
+            ),
+        ):
+            assert lower_thread_priority() is False
+
+    def test_windows_uses_idle_priority(self):
+        windll = MagicMock()
+        windll.kernel32.SetThreadPriority.return_value = 1
+        with (
+            patch.object(sys, "platform", "win32"),
+            patch("ctypes.windll", windll, create=True),
+        ):
+            assert lower_thread_priority() is True
+
+        assert windll.kernel32.SetThreadPriority.call_args.args[1] == -15
@@ -0,0 +1,27 @@
+from src.utils.state import StateStore
+
+
+class TestStateStore:
+    def test_missing_file_is_empty(self, tmp_path):
+        assert StateStore(tmp_path / "state.json").get("key") is None
+
+    def test_get_default(self, tmp_path):
+        assert StateStore(tmp_path / "state.json").get("key", 1) == 1
+
+    def test_set_is_persisted(self, tmp_path):
+        StateStore(tmp_path / "state.json").set("key", {"a": 1})
+        assert StateStore(tmp_path / "state.json").get("key") == {"a": 1}
+
+    def test_set_none_removes_key(self, tmp_path):
+        store = StateStore(tmp_path / "state.json")
+        store.set("key", 1)
+        store.set("key", None)
+        assert StateStore(tmp_path / "state.json").get("key") is None
+
+    def test_corrupted_file_is_ignored(self, tmp_path):
+        (tmp_path / "state.json").write_text("{not json")
+        assert StateStore(tmp_path / "state.json").get("key") is None
+
+    def test_no_temporary_file_left(self, tmp_path):
+        StateStore(tmp_path / "state.json").set("key", 1)
+        assert [p.name for p in tmp_path.iterdir()] == ["state.json"]